@@ -10,13 +10,28 @@ from . import steering
 from . import random
 from . import I
 from . import event_tape
+from . import event_tape_tools
 from . import testing
 from . import collect_version_information
 from . import calibration_light_source
 from . import particles
 from . import cherenkov
+from . import eventio
 from . import cherenkov_bunches
 from . import configfile
+from . import sandbox
+from . import scratch
+from . import timing
+from . import watchdog
+from . import stdout_monitor
+from . import primary_stream
+from . import server
+from . import parallel
+from . import sharding
+from . import resume
+from . import resimulation
+from . import asynchronous
+from .asynchronous import AsyncCorsikaPrimary
 
 MAX_THETA_RAD = np.deg2rad(70.0)
 MAX_ZENITH_DISTANCE_RAD = MAX_THETA_RAD
@@ -33,6 +48,10 @@ def corsika_primary(
     stderr_path=None,
     tmp_dir_prefix="corsika_primary_",
     corsika_path=None,
+    run_dir_mode="copy",
+    timing_path=None,
+    limits=None,
+    scratch=None,
 ):
     """
     Call CORSIKA-primary and write Cherenkov-photons to cherenkov_output_path.
@@ -59,8 +78,26 @@ def corsika_primary(
         This is the modified corsika-primary executable.
         If None, the path is looked up in the user's configfile
         ~/.corsika_primary.json
+    run_dir_mode : str (default: 'copy')
+        How the temporary copy of CORSIKA's run-directory is populated.
+        One of 'copy', 'hardlink', or 'symlink'. See sandbox.make_run_dir.
+        Use sandbox.stage to link to a node-local staged copy.
+    timing_path : str (default: None)
+        If not None, the wall-time of the run's phases and CORSIKA's
+        resource-usage are written to timing_path as json.
+    limits : dict (default: None)
+        Timeouts, memory-cap, cpu-affinity, and nice-level of CORSIKA.
+        See watchdog.make_limits. Raises a TimeoutError when CORSIKA was
+        killed for exceeding a timeout.
+    scratch : scratch.Scratch (default: None)
+        Where to put the temporary directory. Waits until the run's
+        estimated footprint is available. If None, the temporary directory
+        is in tempfile's default location.
     """
     op = os.path
+    timer = timing.Timing()
+    limits = limits if limits else watchdog.default_limits()
+    watchdog.assert_limits(limits)
     if corsika_path is None:
         corsika_path = configfile.read()["corsika_primary"]
 
@@ -81,7 +118,21 @@ def corsika_primary(
 
     corsika_run_dir = op.dirname(corsika_path)
 
-    with tempfile.TemporaryDirectory(prefix=tmp_dir_prefix) as tmp_dir:
+    if scratch is None:
+        tmp_dir_context = tempfile.TemporaryDirectory(prefix=tmp_dir_prefix)
+    else:
+        timer.begin("scratch")
+        tmp_dir_context = scratch.temporary_directory(
+            reservation=scratch.reserve_run(
+                steering_dict=steering_dict,
+                corsika_run_dir=corsika_run_dir,
+                run_dir_mode=run_dir_mode,
+            ),
+            prefix=tmp_dir_prefix,
+        )
+
+    with tmp_dir_context as tmp_dir:
+        timer.begin("steering")
         steering_card = steering.make_steering_card_str(
             steering_dict=steering_dict,
             output_path=cherenkov_output_path,
@@ -91,8 +142,13 @@ def corsika_primary(
             primary_dicts=steering_dict["primaries"]
         )
 
+        timer.begin("run_dir")
         tmp_corsika_run_dir = op.join(tmp_dir, "run")
-        shutil.copytree(corsika_run_dir, tmp_corsika_run_dir, symlinks=False)
+        sandbox.make_run_dir(
+            src_run_dir=corsika_run_dir,
+            dst_run_dir=tmp_corsika_run_dir,
+            mode=run_dir_mode,
+        )
         tmp_corsika_path = op.join(
             tmp_corsika_run_dir, op.basename(corsika_path)
         )
@@ -100,6 +156,7 @@ def corsika_primary(
             tmp_corsika_run_dir,
             steering.PRIMARY_BYTES_FILENAME_IN_CORSIKA_RUN_DIR,
         )
+        timer.begin("steering")
         with open(primary_path, "wb") as f:
             f.write(primary_bytes)
 
@@ -107,17 +164,36 @@ def corsika_primary(
         os.write(pwrite, str.encode(steering_card))
         os.close(pwrite)
 
-        with open(stdout_path, "w") as stdout, open(
-            stderr_path, "w"
-        ) as stderr:
-            rc = subprocess.call(
+        monitor = stdout_monitor.StdoutMonitor()
+        stdout_pipe, stdout_pwrite = os.pipe()
+        tee = stdout_monitor.StdoutTee(
+            fd=stdout_pipe, path=stdout_path, monitor=monitor
+        )
+        with open(stderr_path, "w") as stderr:
+            timer.begin("spawn")
+            corsika_process = subprocess.Popen(
                 tmp_corsika_path,
                 stdin=steering_card_pipe,
-                stdout=stdout,
+                stdout=stdout_pwrite,
                 stderr=stderr,
                 cwd=tmp_corsika_run_dir,
+                preexec_fn=watchdog.make_preexec_fn(limits=limits),
             )
+            os.close(steering_card_pipe)
+            os.close(stdout_pwrite)
+            dog = watchdog.Watchdog(
+                process=corsika_process,
+                limits=limits,
+                stall_clock=watchdog.FileGrowthClock(cherenkov_output_path),
+            )
+            timer.begin("corsika")
+            rc, timer.rusage = timing.wait(
+                corsika_process, before_reap=dog.stop
+            )
+            tee.join()
+        dog.raise_if_expired()
 
+        timer.begin("particle_output")
         if op.isfile(cherenkov_output_path):
             os.chmod(cherenkov_output_path, 0o664)
 
@@ -125,10 +201,13 @@ def corsika_primary(
             runnr=steering_dict["run"]["run_id"]
         )
         shutil.copy(os.path.join(tmp_dir, datfilename), particle_output_path)
+        timer.begin("cleanup")
+    timer.end()
 
-    with open(stdout_path, "rt") as f:
-        stdout_txt = f.read()
-    assert testing.stdout_ends_with_end_of_run_marker(stdout_txt)
+    assert monitor.ends_with_end_of_run_marker()
+
+    if timing_path is not None:
+        timing.write(path=timing_path, timing=timer)
 
     return rc
 
@@ -140,6 +219,7 @@ def corsika_vanilla(
     stderr_path=None,
     tmp_dir_prefix="corsika_primary_",
     corsika_path=None,
+    run_dir_mode="copy",
 ):
     """
     Call vanilla CORSIKA-7.56 and write Cherenkov-photons to cherenkov_output_path.
@@ -164,6 +244,10 @@ def corsika_vanilla(
         This is the vanilla corsika executable.
         If None, the path is looked up in the user's configfile
         ~/.corsika_primary.json
+    run_dir_mode : str (default: 'copy')
+        How the temporary copy of CORSIKA's run-directory is populated.
+        One of 'copy', 'hardlink', or 'symlink'. See sandbox.make_run_dir.
+        Use sandbox.stage to link to a node-local staged copy.
     """
     op = os.path
     if corsika_path is None:
@@ -186,7 +270,11 @@ def corsika_vanilla(
     corsika_run_dir = op.dirname(corsika_path)
     with tempfile.TemporaryDirectory(prefix=tmp_dir_prefix) as tmp_dir:
         tmp_corsika_run_dir = op.join(tmp_dir, "run")
-        shutil.copytree(corsika_run_dir, tmp_corsika_run_dir, symlinks=False)
+        sandbox.make_run_dir(
+            src_run_dir=corsika_run_dir,
+            dst_run_dir=tmp_corsika_run_dir,
+            mode=run_dir_mode,
+        )
         tmp_corsika_path = op.join(
             tmp_corsika_run_dir, op.basename(corsika_path)
         )
@@ -224,6 +312,11 @@ class CorsikaPrimary:
         particle_output_path,
         tmp_dir_prefix="corsika_primary_",
         corsika_path=None,
+        run_dir_mode="copy",
+        max_num_primaries=None,
+        timing_path=None,
+        limits=None,
+        scratch=None,
     ):
         """
         Inits a run-handle which can return the next event on demand.
@@ -237,7 +330,8 @@ class CorsikaPrimary:
         steering_dict : dict
             The steering for the run and for each primary particle.
         stdout_path : str
-            Path to write CORSIKA's std-out to.
+            Path to write CORSIKA's std-out to. The std-out is parsed while
+            CORSIKA writes it, see self.stdout_monitor.
         stderr_path : str
             Path to write CORSIKA's std-error to.
         particle_output_path : str
@@ -247,8 +341,38 @@ class CorsikaPrimary:
             This is the modified corsika-primary executable.
             If None, the path is looked up in the user's configfile
             ~/.corsika_primary.json
+        run_dir_mode : str (default: 'copy')
+            How the temporary copy of CORSIKA's run-directory is populated.
+            One of 'copy', 'hardlink', or 'symlink'.
+            See sandbox.make_run_dir.
+        limits : dict (default: None)
+            Timeouts, memory-cap, cpu-affinity, and nice-level of CORSIKA.
+            See watchdog.make_limits. When CORSIKA is killed for exceeding
+            a timeout, the next call to __next__ raises a TimeoutError.
+        scratch : scratch.Scratch (default: None)
+            Where to put the temporary directory. Waits until the run's
+            estimated footprint is available. If None, the temporary
+            directory is in tempfile's default location.
+        max_num_primaries : int (default: None)
+            If None, CORSIKA simulates the primaries in the steering_dict.
+            Else, the primary-file is a FIFO and CORSIKA simulates up to
+            max_num_primaries showers. The primaries in the steering_dict
+            are pushed first. More primaries can be pushed with
+            push_primary() while the run is live.
+            CORSIKA ends each event with an EVTE in its Cherenkov-output,
+            so an event can be read completely before the next primary is
+            pushed. When fewer than max_num_primaries are pushed until
+            close(), CORSIKA does not end its run cleanly.
+        timing_path : str (default: None)
+            If not None, the timing is written to timing_path as json on
+            close(). The timing is always available in self.timing after
+            close(). The wall-time of an event is measured between the
+            returns of __next__() and thus includes the user's processing.
         """
         op = os.path
+        self.timer = timing.Timing()
+        self.timing = None
+        self.timing_path = timing_path
         if corsika_path is None:
             corsika_path = configfile.read()["corsika_primary"]
 
@@ -257,33 +381,59 @@ class CorsikaPrimary:
         self.stdout_path = op.abspath(stdout_path)
         self.stderr_path = op.abspath(stderr_path)
         self.tmp_dir_prefix = str(tmp_dir_prefix)
+        self.run_dir_mode = str(run_dir_mode)
         self.particle_output_path = str(particle_output_path)
         self.exit_ok = None
+        self.max_num_primaries = max_num_primaries
+        self.num_events = 0
+        self.limits = limits if limits else watchdog.default_limits()
+        watchdog.assert_limits(self.limits)
 
         steering.assert_values(steering_dict=self.steering_dict)
 
+        self.corsika_run_dir = op.dirname(self.corsika_path)
+        self.scratch_reservation = None
+        if scratch is not None:
+            self.timer.begin("scratch")
+            self.scratch_reservation = scratch.reserve_run(
+                steering_dict=self.steering_dict,
+                corsika_run_dir=self.corsika_run_dir,
+                run_dir_mode=self.run_dir_mode,
+            )
+
+        self.timer.begin("run_dir")
         self.tmp_dir_handle = tempfile.TemporaryDirectory(
-            prefix=self.tmp_dir_prefix
+            prefix=self.tmp_dir_prefix,
+            dir=(
+                self.scratch_reservation.location
+                if self.scratch_reservation
+                else None
+            ),
         )
         self.tmp_dir = self.tmp_dir_handle.name
+        if self.scratch_reservation is not None:
+            self.scratch_reservation.set_path(self.tmp_dir)
 
         self.cer_fifo_path = op.join(self.tmp_dir, "cer_fifo.tar")
         os.mkfifo(self.cer_fifo_path)
 
         self.tmp_corsika_run_dir = op.join(self.tmp_dir, "run")
-        self.corsika_run_dir = op.dirname(self.corsika_path)
 
-        shutil.copytree(
-            self.corsika_run_dir, self.tmp_corsika_run_dir, symlinks=False
+        sandbox.make_run_dir(
+            src_run_dir=self.corsika_run_dir,
+            dst_run_dir=self.tmp_corsika_run_dir,
+            mode=self.run_dir_mode,
         )
         self.tmp_corsika_path = op.join(
             self.tmp_corsika_run_dir, op.basename(self.corsika_path)
         )
 
+        self.timer.begin("steering")
         self.steering_card = steering.make_steering_card_str(
             steering_dict=self.steering_dict,
             output_path=self.cer_fifo_path,
             parout_direct=self.tmp_dir,
+            num_showers=self.max_num_primaries,
         )
         assert self.steering_card[-1] == "\n", "Need newline to mark ending."
 
@@ -294,51 +444,145 @@ class CorsikaPrimary:
             self.tmp_dir, self.tmp_particle_filename
         )
 
-        self.primary_bytes = steering.primary_dicts_to_bytes(
-            primary_dicts=self.steering_dict["primaries"],
-        )
-
         self.primary_path = op.join(
             self.tmp_corsika_run_dir,
             steering.PRIMARY_BYTES_FILENAME_IN_CORSIKA_RUN_DIR,
         )
-        with open(self.primary_path, "wb") as f:
-            f.write(self.primary_bytes)
+        if self.max_num_primaries is None:
+            self.primary_stream = None
+            self.primary_bytes = steering.primary_dicts_to_bytes(
+                primary_dicts=self.steering_dict["primaries"],
+            )
+            with open(self.primary_path, "wb") as f:
+                f.write(self.primary_bytes)
+        else:
+            os.mkfifo(self.primary_path)
+            self.primary_stream = primary_stream.PrimaryStreamWriter(
+                path=self.primary_path,
+                max_num_primaries=self.max_num_primaries,
+            )
+            for primary_dict in self.steering_dict["primaries"]:
+                self.primary_stream.push(primary_dict)
 
-        self.stdout = open(self.stdout_path, "w")
+        self.stdout_monitor = stdout_monitor.StdoutMonitor()
+        stdout_pipe, stdout_pwrite = os.pipe()
+        self.stdout_tee = stdout_monitor.StdoutTee(
+            fd=stdout_pipe, path=self.stdout_path, monitor=self.stdout_monitor
+        )
         self.stderr = open(self.stderr_path, "w")
 
+        self.timer.begin("spawn")
         self.corsika_process = subprocess.Popen(
             self.tmp_corsika_path,
-            stdout=self.stdout,
+            stdout=stdout_pwrite,
             stderr=self.stderr,
             stdin=subprocess.PIPE,
             cwd=self.tmp_corsika_run_dir,
+            preexec_fn=watchdog.make_preexec_fn(limits=self.limits),
+        )
+        os.close(stdout_pwrite)
+        self.timer.milestone("spawn")
+        self.stall_clock = watchdog.FifoReadClock()
+        self.watchdog = watchdog.Watchdog(
+            process=self.corsika_process,
+            limits=self.limits,
+            stall_clock=self.stall_clock,
+            fifo_paths=[self.cer_fifo_path],
         )
         self.corsika_process.stdin.write(str.encode(self.steering_card))
         self.corsika_process.stdin.flush()
 
-        self.cherenkov_reader = cherenkov.CherenkovEventTapeReader(
-            path=self.cer_fifo_path
-        )
+        self.timer.begin("runh")
+        try:
+            self.cherenkov_reader = cherenkov.CherenkovEventTapeReader(
+                path=self.cer_fifo_path,
+                fileobj=watchdog.FifoReader(
+                    path=self.cer_fifo_path, clock=self.stall_clock
+                ),
+            )
+        except Exception:
+            if self.watchdog.reason is not None:
+                self._abort()
+                self.watchdog.raise_if_expired()
+            raise
         self.runh = self.cherenkov_reader.runh
+        self.timer.milestone("runh")
+        self.timer.end()
+
+    def push_primary(self, primary_dict):
+        """
+        Pushes the primary particle of the next shower into the live run.
+        Only when the run was started with max_num_primaries.
+        """
+        assert self.primary_stream is not None, "Expected max_num_primaries."
+        steering.assert_dtypes_primary_dict(primary_dict)
+        steering.assert_primary_in_energy_range(
+            primary_dict=primary_dict, run_dict=self.steering_dict["run"]
+        )
+        self.primary_stream.push(primary_dict)
 
     def close(self):
+        self.timer.begin("corsika")
+        if self.primary_stream is not None:
+            self.primary_stream.close()
         self.cherenkov_reader.close()
-        self.stdout.close()
+        _, self.timer.rusage = timing.wait(
+            self.corsika_process, before_reap=self.watchdog.stop
+        )
+        if self.primary_stream is not None:
+            # CORSIKA exited, maybe before it opened its primary-file.
+            self.primary_stream.abort()
+            self.primary_stream.join()
+        self.stdout_tee.join()
         self.stderr.close()
-        shutil.copy(self.tmp_particle_path, self.particle_output_path)
+        self.timer.begin("particle_output")
+        if self.watchdog.reason is None:
+            shutil.copy(self.tmp_particle_path, self.particle_output_path)
 
         if self.exit_ok is None:
-            with open(self.stdout_path, "rt") as f:
-                stdout = f.read()
-            self.exit_ok = testing.stdout_ends_with_end_of_run_marker(stdout)
+            self.exit_ok = self.stdout_monitor.ends_with_end_of_run_marker()
+
+        self.timer.begin("cleanup")
+        self._cleanup_tmp_dir()
+        self.timer.end()
+
+        self.timing = self.timer.to_dict()
+        if self.timing_path is not None:
+            timing.write(path=self.timing_path, timing=self.timer)
+        self.watchdog.raise_if_expired()
+
+    def _abort(self):
+        timing.wait(self.corsika_process, before_reap=self.watchdog.stop)
+        if self.primary_stream is not None:
+            self.primary_stream.abort()
+        self.stdout_tee.join()
+        self.stderr.close()
+        self.exit_ok = False
+        self._cleanup_tmp_dir()
 
+    def _cleanup_tmp_dir(self):
         self.tmp_dir_handle.cleanup()
+        if self.scratch_reservation is not None:
+            self.scratch_reservation.release()
 
     def __next__(self):
-        cer_evth, cer_bunches = self.cherenkov_reader.__next__()
-        return (cer_evth, cer_bunches)
+        if self.primary_stream is not None:
+            if self.num_events == self.primary_stream.num_pushed:
+                if self.primary_stream.is_exhausted():
+                    raise StopIteration
+                raise RuntimeError(
+                    "Push the primary of the next shower before "
+                    "asking for its event. Else this would block forever."
+                )
+        try:
+            event = self.cherenkov_reader.__next__()
+        except Exception:
+            self.watchdog.raise_if_expired()
+            raise
+        self.num_events += 1
+        self.timer.event()
+        self.timer.milestone("evth")
+        return event
 
     def __iter__(self):
         return self
@@ -356,16 +600,17 @@ class CorsikaPrimary:
         return out
 
 
-def bunches_to_si_units(bunches):
-    b = copy.deepcopy(bunches)
-    b[:, I.BUNCH.X_CM] *= CM2M  # cm -> m
-    b[:, I.BUNCH.Y_CM] *= CM2M  # cm -> m
-    # b[:, I.BUNCH.UX_1]
-    # b[:, I.BUNCH.VY_1]
-    b[:, I.BUNCH.TIME_NS] *= 1e-9  # ns -> s
-    b[:, I.BUNCH.EMISSOION_ALTITUDE_ASL_CM] *= CM2M  # cm -> m
-    # b[:, I.BUNCH.BUNCH_SIZE_1] = bunches[:, I.BUNCH.BUNCH_SIZE_1]
-    b[:, I.BUNCH.WAVELENGTH_NM] = (
-        np.abs(b[:, I.BUNCH.WAVELENGTH_NM]) * 1e-9
-    )  # nm -> m
-    return b
+def bunches_to_si_units(bunches, inplace=False):
+    """
+    Returns the Cherenkov-bunches in SI-units, i.e. m, s, and m for the
+    wavelength. See cherenkov_bunches.SiUnitsView to convert only the
+    columns needed.
+
+    Parameters
+    ----------
+    bunches : numpy.array, shape = (N, 8), dtype = float32
+        Cherenkov-bunches with the columns of I.BUNCH.
+    inplace : bool (default: False)
+        If True, bunches is converted and returned without a copy.
+    """
+    return cherenkov_bunches.to_si_units(bunches=bunches, inplace=inplace)
@@ -0,0 +1,312 @@
+"""
+Drive CORSIKA-primary from an asyncio event-loop.
+
+A single event-loop can multiplex many concurrent runs without one thread
+per run. The Cherenkov-output is read from CORSIKA's FIFO without blocking.
+"""
+
+import asyncio
+import copy
+import os
+import shutil
+import tarfile
+import tempfile
+import numpy as np
+from . import configfile
+from . import event_tape
+from . import cherenkov
+from . import I
+from . import particles
+from . import sandbox
+from . import steering
+from . import testing
+from . import watchdog
+
+
+class AsyncCorsikaPrimary:
+    def __init__(
+        self,
+        steering_dict,
+        stdout_path,
+        stderr_path,
+        particle_output_path,
+        tmp_dir_prefix="corsika_primary_",
+        corsika_path=None,
+        run_dir_mode="copy",
+    ):
+        """
+        Inits a run-handle which can return the next event on demand.
+        Same as CorsikaPrimary, but for asyncio. CORSIKA is only started
+        when the run is entered.
+
+        async with AsyncCorsikaPrimary(...) as run:
+            async for evth, bunches in run:
+                ...
+
+        Parameters
+        ----------
+        steering_dict : dict
+            The steering for the run and for each primary particle.
+        stdout_path : str
+            Path to write CORSIKA's std-out to.
+        stderr_path : str
+            Path to write CORSIKA's std-error to.
+        particle_output_path : str
+            Path to write the particle output to.
+        corsika_path : str (default: None)
+            Path to corsika's executable in its 'run' directory.
+            This is the modified corsika-primary executable.
+            If None, the path is looked up in the user's configfile
+            ~/.corsika_primary.json
+        run_dir_mode : str (default: 'copy')
+            How the temporary copy of CORSIKA's run-directory is populated.
+            One of 'copy', 'hardlink', or 'symlink'.
+            See sandbox.make_run_dir.
+        """
+        op = os.path
+        if corsika_path is None:
+            corsika_path = configfile.read()["corsika_primary"]
+
+        self.corsika_path = op.abspath(corsika_path)
+        self.steering_dict = copy.deepcopy(steering_dict)
+        self.stdout_path = op.abspath(stdout_path)
+        self.stderr_path = op.abspath(stderr_path)
+        self.tmp_dir_prefix = str(tmp_dir_prefix)
+        self.run_dir_mode = str(run_dir_mode)
+        self.particle_output_path = str(particle_output_path)
+        self.exit_ok = None
+        self.tmp_dir = None
+        self.runh = None
+
+        steering.assert_values(steering_dict=self.steering_dict)
+
+    async def start(self):
+        op = os.path
+        loop = asyncio.get_running_loop()
+
+        self.tmp_dir_handle = tempfile.TemporaryDirectory(
+            prefix=self.tmp_dir_prefix
+        )
+        self.tmp_dir = self.tmp_dir_handle.name
+
+        self.cer_fifo_path = op.join(self.tmp_dir, "cer_fifo.tar")
+        os.mkfifo(self.cer_fifo_path)
+
+        self.tmp_corsika_run_dir = op.join(self.tmp_dir, "run")
+        self.corsika_run_dir = op.dirname(self.corsika_path)
+
+        await loop.run_in_executor(
+            None,
+            sandbox.make_run_dir,
+            self.corsika_run_dir,
+            self.tmp_corsika_run_dir,
+            self.run_dir_mode,
+        )
+        self.tmp_corsika_path = op.join(
+            self.tmp_corsika_run_dir, op.basename(self.corsika_path)
+        )
+
+        self.steering_card = steering.make_steering_card_str(
+            steering_dict=self.steering_dict,
+            output_path=self.cer_fifo_path,
+            parout_direct=self.tmp_dir,
+        )
+        assert self.steering_card[-1] == "\n", "Need newline to mark ending."
+
+        self.tmp_particle_filename = particles.dat.DAT_FILE_TEMPLATE.format(
+            runnr=self.steering_dict["run"]["run_id"]
+        )
+        self.tmp_particle_path = op.join(
+            self.tmp_dir, self.tmp_particle_filename
+        )
+
+        self.primary_bytes = steering.primary_dicts_to_bytes(
+            primary_dicts=self.steering_dict["primaries"],
+        )
+        self.primary_path = op.join(
+            self.tmp_corsika_run_dir,
+            steering.PRIMARY_BYTES_FILENAME_IN_CORSIKA_RUN_DIR,
+        )
+        with open(self.primary_path, "wb") as f:
+            f.write(self.primary_bytes)
+
+        # Opening the FIFO non-blocking does not wait for CORSIKA.
+        # The end-of-file is only reported after CORSIKA opened it.
+        cer_fifo_fd = os.open(self.cer_fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+        self.cer_fifo = os.fdopen(cer_fifo_fd, "rb", buffering=0)
+        self.cer_stream = asyncio.StreamReader(limit=2**20)
+        self.cer_transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(self.cer_stream),
+            self.cer_fifo,
+        )
+
+        self.stdout = open(self.stdout_path, "w")
+        self.stderr = open(self.stderr_path, "w")
+
+        self.corsika_process = await asyncio.create_subprocess_exec(
+            self.tmp_corsika_path,
+            stdout=self.stdout,
+            stderr=self.stderr,
+            stdin=asyncio.subprocess.PIPE,
+            cwd=self.tmp_corsika_run_dir,
+        )
+        self.corsika_process.stdin.write(str.encode(self.steering_card))
+        await self.corsika_process.stdin.drain()
+        self.corsika_process.stdin.close()
+
+        self.cer_fifo_release = asyncio.ensure_future(
+            self._release_cer_fifo_on_exit()
+        )
+
+        self.cherenkov_reader = AsyncTarStreamReader(stream=self.cer_stream)
+        try:
+            runh_member = await self.cherenkov_reader.next_member()
+            if runh_member is None:
+                raise RuntimeError(
+                    "CORSIKA ended before it wrote the RUNH. "
+                    "See its std-error in '{:s}'.".format(self.stderr_path)
+                )
+            runh_info, runh_bin = runh_member
+            self.runh = event_tape.parse_runh(
+                runh_bin=runh_bin, path=runh_info.name
+            )
+        except Exception:
+            # __aexit__ is not called when __aenter__ raises.
+            await self._abort()
+            raise
+        self.next_member = await self.cherenkov_reader.next_member()
+        return self
+
+    async def _release_cer_fifo_on_exit(self):
+        await self.corsika_process.wait()
+        # When CORSIKA exited before it opened its Cherenkov-output, the
+        # reader would never see the end-of-file.
+        watchdog.release_fifo_readers(self.cer_fifo_path)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        self.cer_transport.close()
+        await self.corsika_process.wait()
+        await self.cer_fifo_release
+        self.stdout.close()
+        self.stderr.close()
+        await loop.run_in_executor(
+            None,
+            shutil.copy,
+            self.tmp_particle_path,
+            self.particle_output_path,
+        )
+
+        if self.exit_ok is None:
+            stdout = await loop.run_in_executor(
+                None, _read_text, self.stdout_path
+            )
+            self.exit_ok = testing.stdout_ends_with_end_of_run_marker(stdout)
+
+        await loop.run_in_executor(None, self.tmp_dir_handle.cleanup)
+
+    async def _abort(self):
+        loop = asyncio.get_running_loop()
+        self.cer_transport.close()
+        if self.corsika_process.returncode is None:
+            try:
+                self.corsika_process.kill()
+            except ProcessLookupError:
+                pass
+        await self.corsika_process.wait()
+        await self.cer_fifo_release
+        self.stdout.close()
+        self.stderr.close()
+        self.exit_ok = False
+        await loop.run_in_executor(None, self.tmp_dir_handle.cleanup)
+
+    async def __anext__(self):
+        if self.next_member is None:
+            raise StopAsyncIteration
+
+        evth_info, evth_bin = self.next_member
+        if not event_tape.is_evth_path(evth_info.name):
+            raise StopAsyncIteration
+        evth = event_tape.parse_evth(evth_bin=evth_bin, path=evth_info.name)
+        event_number = event_tape.parse_event_number(evth_info.name)
+
+        blocks = []
+        while True:
+            self.next_member = await self.cherenkov_reader.next_member()
+            if self.next_member is None:
+                break
+            info, payload_bin = self.next_member
+            if not event_tape.is_payload_block_path(
+                path=info.name, suffix=cherenkov.CHERENKOV_SUFFIX
+            ):
+                break
+            assert event_number == event_tape.parse_event_number(info.name)
+            assert len(blocks) + 1 == event_tape.parse_block_number(info.name)
+            blocks.append(
+                event_tape.parse_payload_block(
+                    payload_bin=payload_bin, shape_1=I.BUNCH.NUM_FLOAT32
+                )
+            )
+
+        if len(blocks) > 0:
+            bunches = np.concatenate(blocks)
+        else:
+            bunches = np.zeros(
+                shape=(0, I.BUNCH.NUM_FLOAT32), dtype=np.float32
+            )
+        return evth, bunches
+
+    def __aiter__(self):
+        return self
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, type, value, traceback):
+        await self.close()
+
+    def __repr__(self):
+        out = "{:s}(path='{:s}', tmp_dir='{:s}')".format(
+            self.__class__.__name__, self.corsika_path, str(self.tmp_dir)
+        )
+        return out
+
+
+def _read_text(path):
+    with open(path, "rt") as f:
+        return f.read()
+
+
+class AsyncTarStreamReader:
+    """
+    Reads the members of a tape-archive from an asyncio.StreamReader.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    async def next_member(self):
+        """
+        Returns the next member's (tarinfo, payload_bytes), or None at the
+        end of the tape-archive.
+        """
+        try:
+            header = await self.stream.readexactly(tarfile.BLOCKSIZE)
+        except asyncio.IncompleteReadError:
+            return None
+
+        try:
+            tarinfo = tarfile.TarInfo.frombuf(
+                header, tarfile.ENCODING, "surrogateescape"
+            )
+        except tarfile.EOFHeaderError:
+            return None
+
+        payload = await self.stream.readexactly(tarinfo.size)
+        _, remainder = divmod(tarinfo.size, tarfile.BLOCKSIZE)
+        if remainder > 0:
+            await self.stream.readexactly(tarfile.BLOCKSIZE - remainder)
+        return tarinfo, payload
+
+    def __repr__(self):
+        return "{:s}()".format(self.__class__.__name__)
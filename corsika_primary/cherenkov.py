@@ -1,12 +1,14 @@
 from . import event_tape
 import numpy as np
 
-
 NUM_CHERENKOV_BUNCHES_IN_BUFFER = 1048576
 
 
 def CherenkovEventTapeWriter(
-    path, buffer_capacity=NUM_CHERENKOV_BUNCHES_IN_BUFFER
+    path,
+    buffer_capacity=NUM_CHERENKOV_BUNCHES_IN_BUFFER,
+    write_toc=False,
+    num_buffers=1,
 ):
     """
     Write an EventTape. Add RUNH, EVTH, and cherenkov-bunches.
@@ -15,20 +17,77 @@ def CherenkovEventTapeWriter(
         Path to event-tape file.
     buffer_capacity : int
         Buffer-size in cherenkov-bunches.
+    write_toc : bool
+        Write the table-of-contents, see event_tape.toc_path.
+    num_buffers : int
+        If larger than 1, a background-thread compresses and writes.
     """
     return event_tape.EventTapeWriter(
         path=path,
         payload_shape_1=8,
         payload_block_suffix=CHERENKOV_SUFFIX,
         buffer_capacity=buffer_capacity,
+        write_toc=write_toc,
+        num_buffers=num_buffers,
     )
 
 
-def CherenkovEventTapeReader(path):
+def CherenkovEventTapeReader(
+    path, memory_map=False, num_threads=None, evth_filter=None, fileobj=None
+):
+    """
+    Read an EventTape.
+
+    path : str
+        Path to event-tape file.
+    memory_map : bool
+        If True, the payload-blocks are read-only views into the
+        memory-mapped tape. Only for uncompressed tapes.
+    num_threads : int
+        Threads to decompress the blocks of block-compressed tapes.
+    evth_filter : function
+        Events for which evth_filter(evth) is False are skipped.
+    fileobj : file-like
+        Read the tape as a stream from fileobj instead of opening path.
+    """
     return event_tape.EventTapeReader(
         path=path,
         payload_block_suffix=CHERENKOV_SUFFIX,
         func_read_payload_block=read_cherenkov_bunch_block,
+        payload_shape_1=8,
+        memory_map=memory_map,
+        num_threads=num_threads,
+        evth_filter=evth_filter,
+        fileobj=fileobj,
+    )
+
+
+def CherenkovMultiRunEventTapeReader(
+    path, memory_map=False, num_threads=None, evth_filter=None
+):
+    """
+    Read an EventTape with one or more runs.
+    Yields (runh, evth, payload_reader).
+
+    See CherenkovEventTapeReader for the parameters.
+    """
+    return event_tape.MultiRunEventTapeReader(
+        path=path,
+        payload_block_suffix=CHERENKOV_SUFFIX,
+        func_read_payload_block=read_cherenkov_bunch_block,
+        payload_shape_1=8,
+        memory_map=memory_map,
+        num_threads=num_threads,
+        evth_filter=evth_filter,
+    )
+
+
+def CherenkovEventTapeRandomAccessReader(path, num_threads=None):
+    return event_tape.EventTapeRandomAccessReader(
+        path=path,
+        payload_block_suffix=CHERENKOV_SUFFIX,
+        payload_shape_1=8,
+        num_threads=num_threads,
     )
 
 
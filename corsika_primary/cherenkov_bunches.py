@@ -86,3 +86,132 @@ def momentum(ux, vy):
     z = spherical_coordinates.restore_cz(cx=ux, cy=vy)
     TOWARDS_XY_PLANE = -1.0
     return np.array([ux, vy, TOWARDS_XY_PLANE * z])
+
+
+# Scale of each column in I.BUNCH to SI-units.
+SI_UNITS_SCALE = np.ones(BUNCH.NUM_FLOAT32, dtype=np.float32)
+SI_UNITS_SCALE[BUNCH.X_CM] = 1e-2  # cm -> m
+SI_UNITS_SCALE[BUNCH.Y_CM] = 1e-2  # cm -> m
+SI_UNITS_SCALE[BUNCH.TIME_NS] = 1e-9  # ns -> s
+SI_UNITS_SCALE[BUNCH.EMISSOION_ALTITUDE_ASL_CM] = 1e-2  # cm -> m
+SI_UNITS_SCALE[BUNCH.WAVELENGTH_NM] = 1e-9  # nm -> m
+
+NUM_BUNCHES_IN_CHUNK = 65536
+
+
+def to_si_units(bunches, inplace=False, chunk_size=NUM_BUNCHES_IN_CHUNK):
+    """
+    Returns the bunches in SI-units. The absolute value of the wavelength
+    is taken.
+
+    parameters
+    ----------
+    bunches : np.array, shape = (N, 8), dtype = float32
+        Cherenkov-bunches with the columns of I.BUNCH.
+    inplace : bool
+        If True, bunches is converted and returned without a copy.
+    chunk_size : int
+        Bunches are converted in chunks of this many rows which fit into
+        the cache, so each chunk is touched once.
+    """
+    assert bunches.ndim == 2 and bunches.shape[1] == BUNCH.NUM_FLOAT32
+    assert chunk_size > 0
+    if inplace:
+        b = bunches
+    else:
+        b = np.array(bunches, copy=True)
+
+    wl = BUNCH.WAVELENGTH_NM
+    for start in range(0, b.shape[0], chunk_size):
+        chunk = b[start : start + chunk_size]
+        np.multiply(chunk, SI_UNITS_SCALE, out=chunk)
+        np.abs(chunk[:, wl], out=chunk[:, wl])
+    return b
+
+
+class SiUnitsView:
+    def __init__(self, bunches, chunk_size=NUM_BUNCHES_IN_CHUNK):
+        """
+        A lazy view of Cherenkov-bunches in SI-units. A column is only
+        converted when it is accessed for the first time. The bunches
+        are neither copied nor modified.
+
+        parameters
+        ----------
+        bunches : np.array, shape = (N, 8), dtype = float32
+            Cherenkov-bunches with the columns of I.BUNCH, e.g. a block
+            read from an event-tape.
+        chunk_size : int
+            A column is converted in chunks of this many rows.
+        """
+        assert bunches.ndim == 2 and bunches.shape[1] == BUNCH.NUM_FLOAT32
+        assert chunk_size > 0
+        self.bunches = bunches
+        self.chunk_size = chunk_size
+        self._columns = {}
+
+    def column(self, index):
+        """
+        Returns the column of I.BUNCH with index in SI-units.
+        Columns without a unit are views of the bunches.
+        """
+        if SI_UNITS_SCALE[index] == 1.0 and index != BUNCH.WAVELENGTH_NM:
+            return self.bunches[:, index]
+        if index not in self._columns:
+            self._columns[index] = self._convert(index)
+        return self._columns[index]
+
+    def _convert(self, index):
+        num = self.bunches.shape[0]
+        out = np.empty(num, dtype=np.float32)
+        for start in range(0, num, self.chunk_size):
+            stop = min([start + self.chunk_size, num])
+            np.multiply(
+                self.bunches[start:stop, index],
+                SI_UNITS_SCALE[index],
+                out=out[start:stop],
+            )
+            if index == BUNCH.WAVELENGTH_NM:
+                np.abs(out[start:stop], out=out[start:stop])
+        return out
+
+    @property
+    def x_m(self):
+        return self.column(BUNCH.X_CM)
+
+    @property
+    def y_m(self):
+        return self.column(BUNCH.Y_CM)
+
+    @property
+    def ux_1(self):
+        return self.column(BUNCH.UX_1)
+
+    @property
+    def vy_1(self):
+        return self.column(BUNCH.VY_1)
+
+    @property
+    def time_s(self):
+        return self.column(BUNCH.TIME_NS)
+
+    @property
+    def emission_altitude_asl_m(self):
+        return self.column(BUNCH.EMISSOION_ALTITUDE_ASL_CM)
+
+    @property
+    def bunch_size_1(self):
+        return self.column(BUNCH.BUNCH_SIZE_1)
+
+    @property
+    def wavelength_m(self):
+        return self.column(BUNCH.WAVELENGTH_NM)
+
+    def __len__(self):
+        return self.bunches.shape[0]
+
+    def __repr__(self):
+        out = "{:s}(num_bunches={:d})".format(
+            self.__class__.__name__, len(self)
+        )
+        return out
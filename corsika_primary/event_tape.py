@@ -1,6 +1,13 @@
 import tarfile
 import numpy as np
-import io
+import os
+import collections
+import mmap
+import gzip
+import zlib
+import concurrent.futures
+import queue
+import threading
 import re as regex
 from . import I
 
@@ -12,18 +19,41 @@ class EventTapeWriter:
         payload_shape_1,
         payload_block_suffix,
         buffer_capacity,
+        write_toc=False,
+        num_buffers=1,
     ):
         """
-        Write a Tape. Add RUNH, EVTH, and payload.
+        Write a Tape. Add RUNH, EVTH, and payload. A tape can have many
+        runs, add the RUNH of the next run after the events of the last
+        run. See MultiRunEventTapeReader.
 
         path : str
             Path to event-tape file.
         buffer_capacity : int
             Buffer-size.
+        write_toc : bool (default: False)
+            If True, the table-of-contents is written to toc_path(path)
+            on close. Not for '.gz' tapes.
+        num_buffers : int (default: 1)
+            If 1, the buffer is compressed and written in the caller's
+            thread. If larger, a background-thread compresses and writes
+            while the caller fills the next buffer. At most num_buffers
+            buffers are in memory, the caller waits when all are full.
+            Errors in the background-thread are raised in the caller's next
+            call.
+
+        When path ends with BLOCK_COMPRESSED_SUFFIX, each payload-block is
+        compressed on its own, see is_block_compressed.
         """
         self.path = str(path)
         self.mode = "w|gz" if str.endswith(self.path, ".gz") else "w|"
         self.tar = tarfile.open(name=self.path, mode=self.mode)
+        self.block_compressed = is_block_compressed(self.path)
+        if write_toc:
+            assert self.mode == "w|", "Expected uncompressed tape for toc."
+            self.toc = []
+        else:
+            self.toc = None
 
         self.run_number = None
         self.event_number = None
@@ -39,10 +69,61 @@ class EventTapeWriter:
 
         self.payload_block_suffix = str(payload_block_suffix)
 
+        assert num_buffers >= 1
+        self.num_buffers = int(num_buffers)
+        self.error = None
+        self.thread = None
+        if self.num_buffers > 1:
+            # The buffer being filled is not in the queue.
+            self.queue = queue.Queue(maxsize=self.num_buffers - 1)
+            self.thread = threading.Thread(target=self._work, daemon=True)
+            self.thread.start()
+
+    def _work(self):
+        while True:
+            task = self.queue.get()
+            if task is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                func, kwargs = task
+                func(**kwargs)
+            except Exception as err:
+                self.error = err
+
+    def _raise_if_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def _do(self, func, **kwargs):
+        if self.thread is None:
+            func(**kwargs)
+        else:
+            self._raise_if_error()
+            self.queue.put((func, kwargs))
+
     def write_runh(self, runh):
-        self.run_number = int(runh[I.RUNH.RUN_NUMBER])
-        assert self.run_number > 0
-        write_runh(self.tar, runh, self.run_number)
+        run_number = int(runh[I.RUNH.RUN_NUMBER])
+        assert run_number > 0
+        if self.run_number is not None:
+            assert self.toc is None, "The toc supports only one run."
+            assert (
+                run_number > self.run_number
+            ), "Expected run_number larger than {:d}.".format(self.run_number)
+            self._flush_buffer()
+            self.event_number = None
+            self.block_number = None
+        self.run_number = run_number
+        self._do(
+            self._write_runh,
+            runh=np.array(runh, copy=True),
+            run_number=self.run_number,
+        )
+
+    def _write_runh(self, runh, run_number):
+        write_runh(self.tar, runh, run_number)
+        self._append_toc(event_number=0, block_number=0, size=runh.nbytes)
 
     def write_evth(self, evth):
         assert self.run_number is not None, "Expected RUNH before EVTH."
@@ -50,7 +131,18 @@ class EventTapeWriter:
             self._flush_buffer()
         self.event_number = int(evth[I.EVTH.EVENT_NUMBER])
         self.block_number = 1
-        write_evth(self.tar, evth, self.run_number, self.event_number)
+        self._do(
+            self._write_evth,
+            evth=np.array(evth, copy=True),
+            run_number=self.run_number,
+            event_number=self.event_number,
+        )
+
+    def _write_evth(self, evth, run_number, event_number):
+        write_evth(self.tar, evth, run_number, event_number)
+        self._append_toc(
+            event_number=event_number, block_number=0, size=evth.nbytes
+        )
 
     def write_payload(self, payload):
         assert self.event_number is not None, "Expected EVTH before payload."
@@ -60,6 +152,19 @@ class EventTapeWriter:
 
         bunches_at = 0
         while remaining != 0:
+            if (
+                self.buffer_size == 0
+                and remaining >= self.buffer.shape[0]
+                and payload.flags.c_contiguous
+            ):
+                # A full block straight from the payload. Same layout as
+                # if it had been buffered.
+                stop_payload = bunches_at + self.buffer.shape[0]
+                self._write_part(payload[bunches_at:stop_payload])
+                remaining -= self.buffer.shape[0]
+                bunches_at = stop_payload
+                continue
+
             buffer_remaining = self.buffer.shape[0] - self.buffer_size
             num_to_buffer = min([buffer_remaining, remaining])
 
@@ -82,27 +187,71 @@ class EventTapeWriter:
     def _flush_buffer(self):
         if self.block_number is None:
             return
-        part = self.buffer[0 : self.buffer_size].copy()
+        self._write_part(self.buffer[0 : self.buffer_size])
+        self.buffer_size = 0
+
+    def _write_part(self, part):
+        if self.thread is not None:
+            # The caller continues to modify the buffer and the payload.
+            part = part.copy()
+        self._do(
+            self._write_block,
+            part=part,
+            run_number=self.run_number,
+            event_number=self.event_number,
+            block_number=self.block_number,
+        )
+        self.block_number += 1
 
+    def _write_block(self, part, run_number, event_number, block_number):
         block_filename_template = payload_block_path_template(
             suffix=self.payload_block_suffix
         )
 
+        filebytes = memoryview(part.view(np.uint8).reshape(-1))
+        if self.block_compressed:
+            filebytes = compress_payload_block(filebytes)
+
         tar_write(
             tar=self.tar,
             filename=block_filename_template.format(
-                run_number=self.run_number,
-                event_number=self.event_number,
-                block_number=self.block_number,
+                run_number=run_number,
+                event_number=event_number,
+                block_number=block_number,
             ),
-            filebytes=part.tobytes(),
+            filebytes=filebytes,
         )
-        self.block_number += 1
-        self.buffer_size = 0
+        self._append_toc(
+            event_number=event_number,
+            block_number=block_number,
+            size=len(filebytes),
+        )
+
+    def _append_toc(self, event_number, block_number, size):
+        if self.toc is None:
+            return
+        # The member's data is the last thing written, padded to full blocks.
+        num_blocks = -(-size // tarfile.BLOCKSIZE)
+        offset = self.tar.offset - num_blocks * tarfile.BLOCKSIZE
+        self.toc.append((event_number, block_number, offset, size))
 
     def close(self):
-        self._flush_buffer()
-        self.tar.close()
+        try:
+            # Raises when the background-thread failed before.
+            self._flush_buffer()
+        finally:
+            if self.thread is not None:
+                self.queue.put(None)
+                self.thread.join()
+            self.tar.close()
+        self._raise_if_error()
+        if self.toc is not None:
+            write_toc(
+                path=toc_path(self.path),
+                toc=np.array(self.toc, dtype=np.uint64).reshape(
+                    (len(self.toc), TOC_NUM_COLUMNS)
+                ),
+            )
 
     def __enter__(self):
         return self
@@ -121,48 +270,192 @@ class EventTapeReader:
         path,
         payload_block_suffix,
         func_read_payload_block,
+        payload_shape_1=None,
+        memory_map=False,
+        num_threads=None,
+        evth_filter=None,
+        fileobj=None,
     ):
         """
         Read an event-tape written by the CORSIKA-primary-mod.
+        Payload-blocks which are not read are skipped when the next event
+        is read.
 
         parameters
         ----------
         path : str
             Path to the event-tape written by the CORSIKA-primary-mod.
+        payload_shape_1 : int (default: None)
+            Number of float32 in a row of the payload. Needed for
+            memory_map and for block-compressed tapes.
+        memory_map : bool (default: False)
+            If True, the uncompressed tape is memory-mapped and the payload
+            blocks are read-only views into the mapping. The data of the
+            payload is neither read nor copied until it is accessed.
+        num_threads : int (default: None)
+            Only for block-compressed tapes. The number of threads which
+            decompress the payload-blocks of an event in parallel.
+            If None, os.cpu_count() is used.
+        evth_filter : function (default: None)
+            Called with the EVTH of each event. Events for which it returns
+            False are skipped without reading their payload-blocks.
+            Uncompressed tapes in regular files are seeked. See
+            make_evth_filter.
+        fileobj : file-like (default: None)
+            If not None, the tape is read as a stream from fileobj, e.g. a
+            watchdog.FifoReader, and path only names the tape. The fileobj
+            is closed on close().
         """
         self.path = str(path)
-        self.mode = "r|gz" if str.endswith(self.path, ".gz") else "r|"
-        self.tar = tarfile.open(name=path, mode=self.mode)
-        self.next_info = self.tar.next()
+        self.block_compressed = is_block_compressed(self.path)
+        self.pool = None
+        if self.block_compressed:
+            assert not memory_map, "Can not memory-map compressed blocks."
+            assert payload_shape_1 is not None
+            self.pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=num_threads
+            )
+        if memory_map:
+            assert not str.endswith(self.path, ".gz"), "Expected uncompressed."
+            assert payload_shape_1 is not None
+            self.mode = "r:"
+            self.file = open(self.path, "rb")
+            self.mmap = mmap.mmap(
+                self.file.fileno(), length=0, access=mmap.ACCESS_READ
+            )
+            self.tar = tarfile.open(fileobj=self.file, mode=self.mode)
+        elif fileobj is not None:
+            self.mode = "r|gz" if str.endswith(self.path, ".gz") else "r|"
+            self.file = fileobj
+            self.mmap = None
+            self.tar = tarfile.open(fileobj=self.file, mode=self.mode)
+        else:
+            if str.endswith(self.path, ".gz"):
+                self.mode = "r|gz"
+            elif os.path.isfile(self.path):
+                # Seekable, so unread payload-blocks are skipped by seeking.
+                self.mode = "r:"
+            else:
+                # e.g. a fifo
+                self.mode = "r|"
+            self.file = None
+            self.mmap = None
+            self.tar = tarfile.open(name=path, mode=self.mode)
+        self.payload_shape_1 = payload_shape_1
+        self.evth_filter = evth_filter
+        self.next_info = self._tar_next()
         self.runh = read_runh(tar=self.tar, tarinfo=self.next_info)
         self.run_number = int(self.runh[I.RUNH.RUN_NUMBER])
-        self.next_info = self.tar.next()
+        self.next_info = self._tar_next()
 
         self.func_read_payload_block = func_read_payload_block
         self.payload_block_suffix = str(payload_block_suffix)
+        self.payload_reader = None
+        self.payload_buffer = None
 
-    def __next__(self):
-        if self.next_info is None:
-            raise StopIteration
+    def next_run(self):
+        """
+        Moves on to the next run in the tape, skipping the remaining
+        events of the current run. Returns False when there is no next run.
+        """
+        while True:
+            self._skip_rest_of_event()
+            if self.next_info is None:
+                return False
+            if is_runh_path(self.next_info.name):
+                break
+            # The EVTH of a remaining event.
+            self.next_info = self._tar_next()
 
-        try:
-            evth = read_evth(tar=self.tar, tarinfo=self.next_info)
-        except AssertionError as e:
-            raise StopIteration
+        self.runh = read_runh(tar=self.tar, tarinfo=self.next_info)
+        self.run_number = int(self.runh[I.RUNH.RUN_NUMBER])
+        self.payload_reader = None
+        self.next_info = self._tar_next()
+        return True
+
+    def _tar_next(self):
+        info = self.tar.next()
+        if self.mode == "r:":
+            # The members are only needed once. Do not collect them.
+            self.tar.members.clear()
+        return info
+
+    def _skip_rest_of_event(self):
+        # The payload-blocks which were not read, and the EVTE.
+        while self.next_info is not None and (
+            is_payload_block_path(
+                path=self.next_info.name, suffix=self.payload_block_suffix
+            )
+            or is_evte_path(self.next_info.name)
+        ):
+            self.next_info = self._tar_next()
 
-        self.event_number = int(evth[I.EVTH.EVENT_NUMBER])
-        self.next_info = self.tar.next()
-        return (
-            evth,
-            PayloadReader(
-                run=self,
-                payload_block_suffix=self.payload_block_suffix,
-                func_read_payload_block=self.func_read_payload_block,
-            ),
+    def __next__(self):
+        while True:
+            self._skip_rest_of_event()
+            if self.next_info is None:
+                raise StopIteration
+
+            try:
+                evth = read_evth(tar=self.tar, tarinfo=self.next_info)
+            except AssertionError as e:
+                raise StopIteration
+
+            self.event_number = int(evth[I.EVTH.EVENT_NUMBER])
+            self.next_info = self._tar_next()
+            if self.evth_filter is None or self.evth_filter(evth):
+                break
+
+        self.payload_reader = PayloadReader(
+            run=self,
+            payload_block_suffix=self.payload_block_suffix,
+            func_read_payload_block=self.func_read_payload_block,
         )
+        return evth, self.payload_reader
+
+    def read_event_payload(self, out=None, reuse_buffer=False):
+        """
+        Returns the remaining payload of the current event, i.e. of the
+        event last returned by next(), in one contiguous array. This is
+        instead of concatenating the blocks of the PayloadReader.
+
+        Parameters
+        ----------
+        out : numpy.array (default: None)
+            Of dtype float32 and shape (N, payload_shape_1). If large
+            enough, the payload is read into out and a view of its first
+            rows is returned.
+        reuse_buffer : bool (default: False)
+            If True, and out is None, the payload is read into a buffer of
+            the reader which is reused and only grows for larger events.
+            The returned view is valid until the next call.
+
+        Returns
+        -------
+        payload : numpy.array
+            Of dtype float32 and shape (num_rows, payload_shape_1).
+        """
+        assert self.payload_reader is not None, "Expected EVTH first."
+        if out is None and reuse_buffer:
+            out = self.payload_buffer
+        payload, out = self.payload_reader.read_all(out=out)
+        if reuse_buffer:
+            self.payload_buffer = out
+        return payload
 
     def close(self):
         self.tar.close()
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:
+                # Views of payload-blocks are still alive. The mapping is
+                # released when the last view is gone.
+                pass
+        if self.file is not None:
+            self.file.close()
 
     def __iter__(self):
         return self
@@ -178,6 +471,112 @@ class EventTapeReader:
         return out
 
 
+class MultiRunEventTapeReader:
+    def __init__(
+        self,
+        path,
+        payload_block_suffix,
+        func_read_payload_block,
+        payload_shape_1=None,
+        memory_map=False,
+        num_threads=None,
+        evth_filter=None,
+    ):
+        """
+        Read an event-tape with one or more runs, e.g. written by an
+        EventTapeWriter with more than one RUNH or by
+        event_tape_tools.concatenate. Yields (runh, evth, payload_reader).
+        The parameters are the same as for EventTapeReader.
+        """
+        self.run = EventTapeReader(
+            path=path,
+            payload_block_suffix=payload_block_suffix,
+            func_read_payload_block=func_read_payload_block,
+            payload_shape_1=payload_shape_1,
+            memory_map=memory_map,
+            num_threads=num_threads,
+            evth_filter=evth_filter,
+        )
+        self.path = self.run.path
+
+    @property
+    def runh(self):
+        return self.run.runh
+
+    @property
+    def run_number(self):
+        return self.run.run_number
+
+    def read_event_payload(self, out=None, reuse_buffer=False):
+        """
+        See EventTapeReader.read_event_payload.
+        """
+        return self.run.read_event_payload(out=out, reuse_buffer=reuse_buffer)
+
+    def __next__(self):
+        while True:
+            try:
+                evth, payload_reader = next(self.run)
+                return self.run.runh, evth, payload_reader
+            except StopIteration:
+                if not self.run.next_run():
+                    raise
+
+    def close(self):
+        self.run.close()
+
+    def __iter__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __repr__(self):
+        out = "{:s}(path='{:s}')".format(self.__class__.__name__, self.path)
+        return out
+
+
+def make_evth_filter(
+    particle_ids=None,
+    energy_range_GeV=None,
+    theta_range_rad=None,
+):
+    """
+    Returns an evth_filter for the EventTapeReader which accepts an event
+    when its EVTH matches all the given conditions.
+
+    Parameters
+    ----------
+    particle_ids : list of int (default: None)
+        CORSIKA's ids of the accepted primary particles.
+    energy_range_GeV : (float, float) (default: None)
+        Start and stop of the accepted total energy of the primary.
+    theta_range_rad : (float, float) (default: None)
+        Start and stop of the accepted I.EVTH.THETA_RAD of the primary.
+    """
+    if particle_ids is not None:
+        particle_ids = set([int(i) for i in particle_ids])
+
+    def evth_filter(evth):
+        if particle_ids is not None:
+            if int(evth[I.EVTH.PARTICLE_ID]) not in particle_ids:
+                return False
+        for column, column_range in [
+            (I.EVTH.TOTAL_ENERGY_GEV, energy_range_GeV),
+            (I.EVTH.THETA_RAD, theta_range_rad),
+        ]:
+            if column_range is not None:
+                start, stop = column_range
+                if not (start <= evth[column] <= stop):
+                    return False
+        return True
+
+    return evth_filter
+
+
 class PayloadReader:
     def __init__(
         self,
@@ -186,32 +585,161 @@ class PayloadReader:
         func_read_payload_block,
     ):
         self.run = run
+        self.event_number = run.event_number
         self.block_number = 1
         self.payload_block_suffix = payload_block_suffix
         self.func_read_payload_block = func_read_payload_block
+        self.decompressing = None
 
-    def __next__(self):
+    def _is_next_payload_block(self):
         if self.run.next_info is None:
-            raise StopIteration
+            return False
         if not is_payload_block_path(
             path=self.run.next_info.name, suffix=self.payload_block_suffix
         ):
-            raise StopIteration
+            return False
+        # The run might have skipped to the next event already.
+        return self.event_number == parse_event_number(
+            path=self.run.next_info.name
+        )
 
-        assert self.run.event_number == parse_event_number(
+    def _submit_all_blocks_of_event(self):
+        # The compressed blocks are read in sequence and decompressed in
+        # parallel.
+        self.decompressing = collections.deque()
+        while self._is_next_payload_block():
+            self._assert_next_block_numbers()
+            payload_bin = self.run.tar.extractfile(self.run.next_info).read()
+            self.decompressing.append(
+                self.run.pool.submit(
+                    decompress_payload_block,
+                    payload_bin,
+                    self.run.payload_shape_1,
+                )
+            )
+            self.block_number += 1
+            self.run.next_info = self.run._tar_next()
+
+    def _assert_next_block_numbers(self):
+        assert self.event_number == parse_event_number(
             path=self.run.next_info.name
         )
         assert self.block_number == parse_block_number(
             path=self.run.next_info.name
         )
-        payload_block = self.func_read_payload_block(
-            tar=self.run.tar,
-            tarinfo=self.run.next_info,
-        )
+
+    def __next__(self):
+        if self.run.pool is not None:
+            if self.decompressing is None:
+                self._submit_all_blocks_of_event()
+            if len(self.decompressing) == 0:
+                raise StopIteration
+            return self.decompressing.popleft().result()
+
+        if not self._is_next_payload_block():
+            raise StopIteration
+
+        self._assert_next_block_numbers()
+        if self.run.mmap is not None:
+            payload_block = view_payload_block(
+                buffer=self.run.mmap,
+                tarinfo=self.run.next_info,
+                shape_1=self.run.payload_shape_1,
+            )
+        else:
+            payload_block = self.func_read_payload_block(
+                tar=self.run.tar,
+                tarinfo=self.run.next_info,
+            )
         self.block_number += 1
-        self.run.next_info = self.run.tar.next()
+        self.run.next_info = self.run._tar_next()
         return payload_block
 
+    def read_all(self, out=None):
+        """
+        Reads the remaining blocks of the event into out.
+        Blocks of uncompressed tapes are read directly into out with
+        readinto. Out grows when it is too small for the event.
+        When out is None, it is allocated with the exact size of the event.
+        Seekable tapes sum the sizes of the event's blocks from their
+        tar-headers first, so out is allocated once.
+
+        Returns
+        -------
+        (payload, out) : tuple
+            The payload is a view of the first rows of out. Out is either
+            the out given or a larger replacement.
+        """
+        shape_1 = self.run.payload_shape_1
+        assert shape_1 is not None, "Expected payload_shape_1."
+        exact = out is None
+        if out is None:
+            out = np.zeros(shape=(0, shape_1), dtype=np.float32)
+        assert out.dtype == np.float32
+        assert out.ndim == 2 and out.shape[1] == shape_1
+        assert out.flags.c_contiguous
+
+        if self.run.mode == "r:" and self.run.pool is None:
+            return self._read_all_seekable(out=out)
+
+        num_rows = 0
+        if self.run.pool is not None:
+            for block in self:
+                stop = num_rows + block.shape[0]
+                out = _reserve_rows(out=out, num_used=num_rows, num=stop)
+                out[num_rows:stop] = block
+                num_rows = stop
+        else:
+            num_bytes_row = 4 * shape_1
+            while self._is_next_payload_block():
+                self._assert_next_block_numbers()
+                info = self.run.next_info
+                assert info.size % num_bytes_row == 0
+                stop = num_rows + info.size // num_bytes_row
+                out = _reserve_rows(out=out, num_used=num_rows, num=stop)
+                target = out[num_rows:stop].view(np.uint8).reshape(-1)
+                member = self.run.tar.extractfile(info)
+                assert member.readinto(memoryview(target)) == info.size
+                num_rows = stop
+                self.block_number += 1
+                self.run.next_info = self.run._tar_next()
+
+        if exact and out.shape[0] != num_rows:
+            # Do not keep the geometric growth's spare rows alive.
+            out = out[0:num_rows].copy()
+        return out[0:num_rows], out
+
+    def _read_all_seekable(self, out):
+        # The data of the blocks is not read when moving on to the next
+        # tar-header, so the event's size is known before reading.
+        shape_1 = self.run.payload_shape_1
+        num_bytes_row = 4 * shape_1
+        infos = []
+        while self._is_next_payload_block():
+            self._assert_next_block_numbers()
+            assert self.run.next_info.size % num_bytes_row == 0
+            infos.append(self.run.next_info)
+            self.block_number += 1
+            self.run.next_info = self.run._tar_next()
+
+        num_rows = sum([info.size for info in infos]) // num_bytes_row
+        if out.shape[0] < num_rows:
+            out = np.empty(shape=(num_rows, shape_1), dtype=np.float32)
+
+        start = 0
+        for info in infos:
+            stop = start + info.size // num_bytes_row
+            if self.run.mmap is not None:
+                out[start:stop] = view_payload_block(
+                    buffer=self.run.mmap, tarinfo=info, shape_1=shape_1
+                )
+            else:
+                target = out[start:stop].view(np.uint8).reshape(-1)
+                member = self.run.tar.extractfile(info)
+                assert member.readinto(memoryview(target)) == info.size
+            start = stop
+        return out[0:num_rows], out
+
     def __iter__(self):
         return self
 
@@ -225,6 +753,181 @@ class PayloadReader:
         return out
 
 
+class EventTapeRandomAccessReader:
+    def __init__(
+        self, path, payload_block_suffix, payload_shape_1, num_threads=None
+    ):
+        """
+        Read any event of an uncompressed event-tape without reading the
+        events before it. Uses the table-of-contents in toc_path(path) if
+        it exists, else the toc is made on the fly, see make_toc.
+        The tape must have a single run.
+
+        parameters
+        ----------
+        path : str
+            Path to the uncompressed, or block-compressed event-tape.
+        num_threads : int (default: None)
+            Only for block-compressed tapes. The number of threads which
+            decompress the payload-blocks of an event in parallel.
+            If None, os.cpu_count() is used.
+        """
+        self.path = str(path)
+        assert not str.endswith(self.path, ".gz"), "Expected uncompressed."
+        self.payload_block_suffix = str(payload_block_suffix)
+        self.payload_shape_1 = int(payload_shape_1)
+        self.block_compressed = is_block_compressed(self.path)
+        self.pool = None
+        if self.block_compressed:
+            self.pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=num_threads
+            )
+
+        if os.path.exists(toc_path(self.path)):
+            self.toc = read_toc(path=toc_path(self.path))
+        else:
+            self.toc = make_toc(
+                path=self.path, payload_block_suffix=self.payload_block_suffix
+            )
+        assert (
+            np.sum(self.toc[:, 0] == 0) == 1
+        ), "Expected the toc of a single run."
+        self.file = open(self.path, "rb")
+
+        # row-ranges of each event in the toc
+        self._rows = {}
+        for row, (event_number, block_number, _, _) in enumerate(self.toc):
+            event_number = int(event_number)
+            if event_number not in self._rows:
+                self._rows[event_number] = [row, row + 1]
+            else:
+                self._rows[event_number][1] = row + 1
+        self.event_numbers = [e for e in self._rows if e != 0]
+
+        self.runh = np.frombuffer(self._pread(self.toc[0]), dtype=np.float32)
+        assert self.runh[I.RUNH.MARKER] == I.RUNH.MARKER_FLOAT32
+
+    def _pread(self, toc_row):
+        _, _, offset, size = toc_row
+        return os.pread(self.file.fileno(), int(size), int(offset))
+
+    def read_evth(self, event_number):
+        start, _ = self._rows[int(event_number)]
+        evth = np.frombuffer(self._pread(self.toc[start]), dtype=np.float32)
+        assert evth[I.EVTH.MARKER] == I.EVTH.MARKER_FLOAT32
+        assert int(evth[I.EVTH.EVENT_NUMBER]) == int(event_number)
+        return evth
+
+    def read_payload(self, event_number):
+        """
+        Returns the payload of the event as one matrix.
+        """
+        start, stop = self._rows[int(event_number)]
+        payload_bins = [
+            self._pread(self.toc[row]) for row in range(start + 1, stop)
+        ]
+        if self.pool is not None:
+            blocks = list(
+                self.pool.map(
+                    decompress_payload_block,
+                    payload_bins,
+                    [self.payload_shape_1] * len(payload_bins),
+                )
+            )
+        else:
+            blocks = [
+                parse_payload_block(
+                    payload_bin=payload_bin, shape_1=self.payload_shape_1
+                )
+                for payload_bin in payload_bins
+            ]
+        if len(blocks) == 0:
+            return np.zeros(shape=(0, self.payload_shape_1), dtype=np.float32)
+        return np.vstack(blocks)
+
+    def __getitem__(self, event_number):
+        return self.read_evth(event_number), self.read_payload(event_number)
+
+    def __len__(self):
+        return len(self.event_numbers)
+
+    def close(self):
+        self.file.close()
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __repr__(self):
+        out = "{:s}(path='{:s}')".format(self.__class__.__name__, self.path)
+        return out
+
+
+TOC_SUFFIX = ".toc.x4.uint64"
+TOC_NUM_COLUMNS = 4
+
+
+def toc_path(path):
+    """
+    Returns the path of the table-of-contents of the event-tape in path.
+    """
+    return str(path) + TOC_SUFFIX
+
+
+def make_toc(path, payload_block_suffix):
+    """
+    Returns the table-of-contents of the uncompressed event-tape in path.
+    Only the tar-headers are read, the data of the members is skipped.
+
+    Each row is (event_number, block_number, offset, size) of a member.
+    The offset is the byte-offset of the member's data in the tape.
+    The RUNH has event_number 0, an EVTH has block_number 0.
+    The toc has no run_number, so the tape must have a single run.
+    """
+    assert not str.endswith(path, ".gz"), "Expected uncompressed tape."
+    toc = []
+    num_runs = 0
+    with tarfile.open(name=path, mode="r:") as tar:
+        for tarinfo in tar:
+            if is_runh_path(tarinfo.name):
+                num_runs += 1
+                assert num_runs == 1, (
+                    "Expected a single run in '{:s}'. Use "
+                    "event_tape_tools.concatenate() with a run_number to "
+                    "merge its runs.".format(path)
+                )
+                event_number, block_number = 0, 0
+            elif is_evth_path(tarinfo.name):
+                event_number = parse_event_number(tarinfo.name)
+                block_number = 0
+            elif is_payload_block_path(tarinfo.name, payload_block_suffix):
+                event_number = parse_event_number(tarinfo.name)
+                block_number = parse_block_number(tarinfo.name)
+            else:
+                continue
+            toc.append(
+                (event_number, block_number, tarinfo.offset_data, tarinfo.size)
+            )
+    return np.array(toc, dtype=np.uint64).reshape((len(toc), TOC_NUM_COLUMNS))
+
+
+def write_toc(path, toc):
+    assert toc.dtype == np.uint64
+    assert toc.shape[1] == TOC_NUM_COLUMNS
+    with open(path, "wb") as f:
+        f.write(toc.astype("<u8").tobytes())
+
+
+def read_toc(path):
+    with open(path, "rb") as f:
+        toc = np.frombuffer(f.read(), dtype="<u8").astype(np.uint64)
+    return toc.reshape((toc.shape[0] // TOC_NUM_COLUMNS, TOC_NUM_COLUMNS))
+
+
 def is_match(template, path):
     """
     Returns true if a path matches a template, false if not.
@@ -257,6 +960,7 @@ RUNDIR = "{run_number:09d}/"
 EVENTDIR = RUNDIR + "{event_number:09d}/"
 RUNH_FILENAME = RUNDIR + "RUNH.float32"
 EVTH_FILENAME = EVENTDIR + "EVTH.float32"
+EVTE_FILENAME = EVENTDIR + "EVTE.float32"
 BLOCKBASE = EVENTDIR + "{block_number:09d}"
 
 
@@ -272,6 +976,14 @@ def is_runh_path(path):
     return is_match(RUNH_FILENAME, path)
 
 
+def is_evte_path(path):
+    """
+    The EVTE ends an event only when CORSIKA reads its primaries from a
+    FIFO. Then the event is complete without waiting for the next EVTH.
+    """
+    return is_match(EVTE_FILENAME, path)
+
+
 def is_payload_block_path(path, suffix):
     return is_match(payload_block_path_template(suffix), path)
 
@@ -291,10 +1003,15 @@ def parse_block_number(path):
 def read_runh(tar, tarinfo):
     assert is_runh_path(tarinfo.name)
     runh_bin = tar.extractfile(tarinfo).read()
+    return parse_runh(runh_bin=runh_bin, path=tarinfo.name)
+
+
+def parse_runh(runh_bin, path):
+    assert is_runh_path(path)
     runh = np.frombuffer(runh_bin, dtype=np.float32)
     assert runh.shape[0] == 273
     assert runh[I.RUNH.MARKER] == I.RUNH.MARKER_FLOAT32
-    assert runh[I.RUNH.RUN_NUMBER] == parse_run_number(tarinfo.name)
+    assert runh[I.RUNH.RUN_NUMBER] == parse_run_number(path)
     return runh
 
 
@@ -313,13 +1030,17 @@ def write_runh(tar, runh, run_number):
 
 def read_evth(tar, tarinfo):
     assert is_evth_path(tarinfo.name)
-    event_number_path = parse_event_number(tarinfo.name)
     evth_bin = tar.extractfile(tarinfo).read()
+    return parse_evth(evth_bin=evth_bin, path=tarinfo.name)
+
+
+def parse_evth(evth_bin, path):
+    assert is_evth_path(path)
     evth = np.frombuffer(evth_bin, dtype=np.float32)
     assert evth.shape[0] == 273
     assert evth[I.EVTH.MARKER] == I.EVTH.MARKER_FLOAT32
-    assert evth[I.EVTH.RUN_NUMBER] == parse_run_number(tarinfo.name)
-    assert evth[I.EVTH.EVENT_NUMBER] == parse_event_number(tarinfo.name)
+    assert evth[I.EVTH.RUN_NUMBER] == parse_run_number(path)
+    assert evth[I.EVTH.EVENT_NUMBER] == parse_event_number(path)
     return evth
 
 
@@ -340,16 +1061,124 @@ def write_evth(tar, evth, run_number, event_number):
 
 
 def read_payload_block(tar, tarinfo, shape_1):
-    assert shape_1 > 0
     bunches_bin = tar.extractfile(tarinfo).read()
-    bunches = np.frombuffer(bunches_bin, dtype=np.float32)
+    return parse_payload_block(payload_bin=bunches_bin, shape_1=shape_1)
+
+
+def parse_payload_block(payload_bin, shape_1):
+    assert shape_1 > 0
+    bunches = np.frombuffer(payload_bin, dtype=np.float32)
     num_bunches = bunches.shape[0] // (shape_1)
     return np.reshape(bunches, shape=(num_bunches, shape_1))
 
 
+BLOCK_COMPRESSED_SUFFIX = ".bgz.tar"
+BLOCK_COMPRESSION_LEVEL = 6
+
+
+def is_block_compressed(path):
+    """
+    Returns True if the tape in path is block-compressed.
+    A block-compressed tape is an uncompressed tar. Its RUNH and EVTHs are
+    not compressed, but each payload-block is gzip-compressed on its own.
+    The names of the members are the same as in other tapes. Blocks can be
+    decompressed in parallel, and the tape can be seeked with its toc.
+    """
+    return str.endswith(str(path), BLOCK_COMPRESSED_SUFFIX)
+
+
+def compress_payload_block(payload_bin):
+    return gzip.compress(
+        payload_bin, compresslevel=BLOCK_COMPRESSION_LEVEL, mtime=0
+    )
+
+
+def decompress_payload_block(payload_bin, shape_1):
+    # zlib releases the GIL while it decompresses.
+    return parse_payload_block(
+        payload_bin=zlib.decompress(payload_bin, wbits=16 + zlib.MAX_WBITS),
+        shape_1=shape_1,
+    )
+
+
+def convert(in_path, out_path, payload_block_suffix):
+    """
+    Copies the tape in in_path to out_path member by member and compresses
+    or decompresses the payload-blocks when one of the tapes is
+    block-compressed. E.g. to block-compress a tape written by CORSIKA.
+    """
+    in_block_compressed = is_block_compressed(in_path)
+    out_block_compressed = is_block_compressed(out_path)
+    in_mode = "r|gz" if str.endswith(in_path, ".gz") else "r|"
+    out_mode = "w|gz" if str.endswith(out_path, ".gz") else "w|"
+    with tarfile.open(name=in_path, mode=in_mode) as itar, tarfile.open(
+        name=out_path, mode=out_mode
+    ) as otar:
+        for tarinfo in itar:
+            filebytes = itar.extractfile(tarinfo).read()
+            if is_payload_block_path(tarinfo.name, payload_block_suffix):
+                if in_block_compressed and not out_block_compressed:
+                    filebytes = zlib.decompress(
+                        filebytes, wbits=16 + zlib.MAX_WBITS
+                    )
+                elif out_block_compressed and not in_block_compressed:
+                    filebytes = compress_payload_block(filebytes)
+            tar_write(tar=otar, filename=tarinfo.name, filebytes=filebytes)
+
+
+def _reserve_rows(out, num_used, num):
+    # Grows geometrically to keep the number of copies small.
+    if out.shape[0] >= num:
+        return out
+    num_capacity = max([num, 2 * out.shape[0]])
+    larger = np.empty(shape=(num_capacity, out.shape[1]), dtype=out.dtype)
+    larger[0:num_used] = out[0:num_used]
+    return larger
+
+
+def view_payload_block(buffer, tarinfo, shape_1):
+    """
+    Returns the payload-block of tarinfo as a view into buffer, which holds
+    the entire uncompressed tape. Nothing is copied.
+    """
+    assert shape_1 > 0
+    num_floats = tarinfo.size // 4
+    bunches = np.frombuffer(
+        buffer, dtype=np.float32, count=num_floats, offset=tarinfo.offset_data
+    )
+    return np.reshape(bunches, shape=(num_floats // shape_1, shape_1))
+
+
 def tar_write(tar, filename, filebytes):
-    with io.BytesIO() as buff:
-        info = tarfile.TarInfo(filename)
-        info.size = buff.write(filebytes)
-        buff.seek(0)
-        tar.addfile(info, buff)
+    """
+    Writes filebytes, which can be any contiguous bytes-like object, e.g. a
+    memoryview, to tar without copying it first.
+    """
+    info = tarfile.TarInfo(filename)
+    buff = _MemoryviewReader(filebytes)
+    info.size = len(buff)
+    tar.addfile(info, buff)
+
+
+class _MemoryviewReader:
+    """
+    A file-like object which reads slices of a memoryview, but no copies.
+    """
+
+    def __init__(self, buffer):
+        self.view = memoryview(buffer)
+        if self.view.format != "B" or self.view.ndim != 1:
+            self.view = self.view.cast("B")
+        self.pos = 0
+
+    def __len__(self):
+        return self.view.nbytes
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            stop = self.view.nbytes
+        else:
+            stop = min([self.pos + size, self.view.nbytes])
+        out = self.view[self.pos : stop]
+        self.pos = stop
+        return out
@@ -0,0 +1,353 @@
+"""
+Concatenate, split, and drop events of event-tapes member by member, and
+take their inventory from the headers of the tar.
+
+The members of the tar are copied as they are. The payload-blocks are
+neither decoded nor encoded, so this is limited by I/O and not by the CPU.
+Only the RUNH and the EVTHs are decoded when a run is renumbered.
+Block-compressed tapes stay block-compressed, use event_tape.convert() to
+change this. The table-of-contents is not copied, use
+event_tape.make_toc() to write a new one.
+"""
+
+import os
+import tarfile
+import multiprocessing
+import numpy as np
+from . import I
+from . import event_tape
+
+
+def rename(name, run_number):
+    """
+    Returns the name of a member with its run_number replaced. Only the
+    prefix '{run_number:09d}/' is changed, the rest of the name e.g. the
+    event_number and the block_number stays the same.
+    """
+    assert event_tape.is_match(event_tape.RUNDIR, name[0:10])
+    return event_tape.RUNDIR.format(run_number=run_number) + name[10:]
+
+
+_EVENTDIR_EXAMPLE = event_tape.EVENTDIR.format(run_number=1, event_number=1)
+
+
+def is_event_member(name):
+    """
+    Returns True if the member belongs to an event, i.e. it is the EVTH or
+    a payload-block.
+    """
+    prefix = name[0 : len(_EVENTDIR_EXAMPLE)]
+    return event_tape.is_match(event_tape.EVENTDIR, prefix) and len(
+        name
+    ) > len(_EVENTDIR_EXAMPLE)
+
+
+def copy_member(itar, otar, tarinfo, name=None):
+    """
+    Copies the member tarinfo from itar to otar without decoding it.
+    If name is not None, the member is renamed.
+    """
+    info = tarfile.TarInfo(tarinfo.name if name is None else name)
+    info.size = tarinfo.size
+    otar.addfile(info, itar.extractfile(tarinfo))
+
+
+def copy_header(itar, otar, tarinfo, run_number):
+    """
+    Copies the RUNH or EVTH in tarinfo from itar to otar and sets its
+    run_number. Its name is renamed accordingly.
+    """
+    header = np.frombuffer(
+        itar.extractfile(tarinfo).read(), dtype=np.float32
+    ).copy()
+    assert header.shape[0] == 273
+    if event_tape.is_runh_path(tarinfo.name):
+        header[I.RUNH.RUN_NUMBER] = np.float32(run_number)
+    else:
+        assert event_tape.is_evth_path(tarinfo.name)
+        header[I.EVTH.RUN_NUMBER] = np.float32(run_number)
+    event_tape.tar_write(
+        tar=otar,
+        filename=rename(tarinfo.name, run_number=run_number),
+        filebytes=header.tobytes(),
+    )
+
+
+def _read_mode(path):
+    return "r|gz" if str.endswith(path, ".gz") else "r|"
+
+
+def _write_mode(path):
+    return "w|gz" if str.endswith(path, ".gz") else "w|"
+
+
+def _assert_same_block_compression(in_path, out_path):
+    assert event_tape.is_block_compressed(
+        in_path
+    ) == event_tape.is_block_compressed(
+        out_path
+    ), "Use event_tape.convert() to change the block-compression."
+
+
+def concatenate(in_paths, out_path, run_number=None):
+    """
+    Concatenates the event-tapes in in_paths into one event-tape in
+    out_path. Runs with the same run_number are merged into one run which
+    keeps the RUNH of its first tape. The events must be in order.
+
+    Parameters
+    ----------
+    in_paths : list of str
+        Paths to the input event-tapes.
+    out_path : str
+        Path to the output event-tape.
+    run_number : int (default: None)
+        If not None, all runs are merged into one run with this run_number.
+        The RUN_NUMBER in the RUNH and in the EVTHs is set accordingly.
+    """
+    last = None
+    has_runh = set()
+    with tarfile.open(name=out_path, mode=_write_mode(out_path)) as otar:
+        for in_path in in_paths:
+            _assert_same_block_compression(in_path, out_path)
+            with tarfile.open(name=in_path, mode=_read_mode(in_path)) as itar:
+                for tarinfo in itar:
+                    in_run_number = event_tape.parse_run_number(tarinfo.name)
+                    out_run_number = (
+                        in_run_number if run_number is None else run_number
+                    )
+
+                    if event_tape.is_runh_path(tarinfo.name):
+                        if out_run_number in has_runh:
+                            continue
+                        has_runh.add(out_run_number)
+                    elif event_tape.is_evth_path(tarinfo.name):
+                        assert out_run_number in has_runh, "Expected RUNH."
+                        current = (
+                            out_run_number,
+                            event_tape.parse_event_number(tarinfo.name),
+                        )
+                        assert (
+                            last is None or current > last
+                        ), "Expected run and event {:s} after {:s}.".format(
+                            str(current), str(last)
+                        )
+                        last = current
+
+                    if out_run_number == in_run_number:
+                        copy_member(itar=itar, otar=otar, tarinfo=tarinfo)
+                    elif event_tape.is_runh_path(
+                        tarinfo.name
+                    ) or event_tape.is_evth_path(tarinfo.name):
+                        copy_header(
+                            itar=itar,
+                            otar=otar,
+                            tarinfo=tarinfo,
+                            run_number=out_run_number,
+                        )
+                    else:
+                        copy_member(
+                            itar=itar,
+                            otar=otar,
+                            tarinfo=tarinfo,
+                            name=rename(tarinfo.name, out_run_number),
+                        )
+
+
+def split(in_path, out_paths, event_ranges):
+    """
+    Splits the event-tape in in_path into event-tapes with ranges of events
+    in a single pass. Each output has the RUNH. Events in none of the
+    ranges are dropped.
+
+    Parameters
+    ----------
+    in_path : str
+        Path to the input event-tape.
+    out_paths : list of str
+        Path to the output event-tape of each range.
+    event_ranges : list of (int, int)
+        The first and the last event_number of each range. The ranges must
+        not overlap.
+    """
+    assert len(out_paths) == len(event_ranges)
+    ranges = sorted(event_ranges)
+    for i in range(len(ranges)):
+        assert ranges[i][0] <= ranges[i][1]
+        if i > 0:
+            assert ranges[i - 1][1] < ranges[i][0], "Expected no overlap."
+    for out_path in out_paths:
+        _assert_same_block_compression(in_path, out_path)
+
+    otars = [
+        tarfile.open(name=out_path, mode=_write_mode(out_path))
+        for out_path in out_paths
+    ]
+    try:
+        with tarfile.open(name=in_path, mode=_read_mode(in_path)) as itar:
+            for tarinfo in itar:
+                if not is_event_member(tarinfo.name):
+                    # e.g. the RUNH
+                    filebytes = itar.extractfile(tarinfo).read()
+                    for otar in otars:
+                        event_tape.tar_write(
+                            tar=otar,
+                            filename=tarinfo.name,
+                            filebytes=filebytes,
+                        )
+                    continue
+
+                event_number = event_tape.parse_event_number(tarinfo.name)
+                for i in range(len(event_ranges)):
+                    first, last = event_ranges[i]
+                    if first <= event_number <= last:
+                        copy_member(itar=itar, otar=otars[i], tarinfo=tarinfo)
+                        break
+    finally:
+        for otar in otars:
+            otar.close()
+
+
+def drop(in_path, out_path, event_numbers):
+    """
+    Copies the event-tape in in_path to out_path without the events in
+    event_numbers.
+    """
+    event_numbers = set(event_numbers)
+    _assert_same_block_compression(in_path, out_path)
+    with tarfile.open(
+        name=in_path, mode=_read_mode(in_path)
+    ) as itar, tarfile.open(name=out_path, mode=_write_mode(out_path)) as otar:
+        for tarinfo in itar:
+            if is_event_member(tarinfo.name):
+                event_number = event_tape.parse_event_number(tarinfo.name)
+                if event_number in event_numbers:
+                    continue
+            copy_member(itar=itar, otar=otar, tarinfo=tarinfo)
+
+
+INVENTORY_DTYPE = [
+    ("run_number", "<u8"),
+    ("event_number", "<u8"),
+    ("num_blocks", "<u8"),
+    ("num_rows", "<u8"),
+    ("num_bytes", "<u8"),
+]
+
+
+def inventory(path, payload_block_suffix, payload_shape_1):
+    """
+    Returns the number of payload-blocks, rows, and bytes of each event in
+    the event-tape in path. Only the headers of the tar are read, the
+    payload is not. Uncompressed tapes are seeked past the payload.
+    Of the blocks in block-compressed tapes, only the size of the
+    uncompressed block in the last 4 bytes of the gzip is read.
+
+    Parameters
+    ----------
+    path : str
+        Path to the event-tape.
+    payload_block_suffix : str
+        E.g. cherenkov.CHERENKOV_SUFFIX.
+    payload_shape_1 : int
+        Number of float32 in a row of the payload, e.g. 8 for the
+        Cherenkov-bunches, see I.BUNCH.NUM_FLOAT32.
+
+    Returns
+    -------
+    inventory : numpy.recarray
+        One row per event with the fields of INVENTORY_DTYPE. The rows of
+        an event are the bunches or particles.
+    """
+    path = str(path)
+    num_bytes_row = 4 * payload_shape_1
+    block_compressed = event_tape.is_block_compressed(path)
+    mode = "r|gz" if str.endswith(path, ".gz") else "r:"
+
+    events = []
+    with tarfile.open(name=path, mode=mode) as tar:
+        while True:
+            tarinfo = tar.next()
+            if tarinfo is None:
+                break
+            # Only the current member is needed. Do not collect them.
+            tar.members.clear()
+
+            if event_tape.is_evth_path(tarinfo.name):
+                events.append(
+                    [
+                        event_tape.parse_run_number(tarinfo.name),
+                        event_tape.parse_event_number(tarinfo.name),
+                        0,
+                        0,
+                        0,
+                    ]
+                )
+            elif event_tape.is_payload_block_path(
+                tarinfo.name, payload_block_suffix
+            ):
+                assert len(events) > 0, "Expected EVTH before payload."
+                if block_compressed:
+                    num_bytes = _read_gzip_isize(tar=tar, tarinfo=tarinfo)
+                else:
+                    num_bytes = tarinfo.size
+                assert num_bytes % num_bytes_row == 0
+                events[-1][2] += 1
+                events[-1][3] += num_bytes // num_bytes_row
+                events[-1][4] += num_bytes
+
+    out = np.array([tuple(e) for e in events], dtype=INVENTORY_DTYPE)
+    return out.view(np.recarray)
+
+
+def _read_gzip_isize(tar, tarinfo):
+    # The last 4 bytes of a gzip are the size of its uncompressed data
+    # modulo 2**32. The blocks are much smaller than this.
+    tar.fileobj.seek(tarinfo.offset_data + tarinfo.size - 4)
+    isize_bin = tar.fileobj.read(4)
+    assert len(isize_bin) == 4
+    return int(np.frombuffer(isize_bin, dtype="<u4")[0])
+
+
+def _inventory_job(job):
+    return inventory(**job)
+
+
+def inventory_many(
+    paths, payload_block_suffix, payload_shape_1, num_workers=None
+):
+    """
+    Returns the inventory of each event-tape in paths, see inventory().
+    The tapes are processed in parallel.
+
+    Parameters
+    ----------
+    paths : list of str
+        Paths to the event-tapes.
+    num_workers : int (default: None)
+        Number of processes. If None, os.cpu_count() is used.
+
+    Returns
+    -------
+    inventories : dict
+        The inventory of each tape with its path as key.
+    """
+    jobs = [
+        {
+            "path": str(path),
+            "payload_block_suffix": payload_block_suffix,
+            "payload_shape_1": payload_shape_1,
+        }
+        for path in paths
+    ]
+    inventories = {}
+    if len(jobs) == 0:
+        return inventories
+
+    num_workers = num_workers if num_workers else os.cpu_count()
+    num_workers = min([num_workers, len(jobs)])
+
+    with multiprocessing.Pool(processes=num_workers) as pool:
+        for job, inv in zip(jobs, pool.imap(_inventory_job, jobs)):
+            inventories[job["path"]] = inv
+    return inventories
@@ -0,0 +1,288 @@
+"""
+Read the eventio-files written by vanilla CORSIKA's IACT-option.
+
+An eventio-file is a sequence of objects. Each top-level object starts with
+the sync-marker, followed by the words for its type, its id, and its length.
+Objects can contain sub-objects which have the same header without the
+sync-marker. CORSIKA writes:
+
+1200 RUNH, 1201 telescope-positions, 1202 EVTH, 1203 array-offsets,
+1204 telescope-data containing 1205 photon-bunches per telescope,
+1209 EVTE, and 1210 RUNE.
+
+The RunReader yields (evth, reader) where the reader yields the blocks of
+bunches, the same way cherenkov.CherenkovEventTapeReader does. The bunches
+have the layout of I.BUNCH.
+"""
+
+import numpy as np
+from . import I
+
+SYNC_MARKER = 0xD41F8A37
+
+TYPE_RUNH = 1200
+TYPE_TELESCOPE_DEFINITION = 1201
+TYPE_EVTH = 1202
+TYPE_ARRAY_OFFSETS = 1203
+TYPE_TELESCOPE_DATA = 1204
+TYPE_PHOTON_BUNCHES = 1205
+TYPE_EVTE = 1209
+TYPE_RUNE = 1210
+
+NUM_BYTES_HEADER = 12
+NUM_BYTES_SYNC_MARKER = 4
+
+# Compact bunches are int16 with these scales.
+COMPACT_SCALE = np.array(
+    [0.1, 0.1, 1.0 / 30000.0, 1.0 / 30000.0, 0.1, 0.001, 0.01, 1.0],
+    dtype=np.float32,
+)
+
+
+def parse_header(header_bin):
+    """
+    Returns the header of an object parsed from its 12 bytes after the
+    sync-marker.
+    """
+    type_word, ident, length_word = np.frombuffer(
+        header_bin[0:NUM_BYTES_HEADER], dtype="<u4"
+    )
+    return {
+        "type": int(type_word & 0xFFFF),
+        "user_flag": bool((type_word >> 16) & 0x1),
+        "extended": bool((type_word >> 17) & 0x1),
+        "version": int((type_word >> 20) & 0xFFF),
+        "id": int(np.uint32(ident).view(np.int32)),
+        "only_subobjects": bool((length_word >> 30) & 0x1),
+        "length": int(length_word & 0x3FFFFFFF),
+    }
+
+
+def _extend_length(header, extension_bin):
+    extension = int(np.frombuffer(extension_bin, dtype="<u4")[0])
+    header["length"] |= (extension & 0xFFF) << 30
+    return header
+
+
+def read_toplevel_object(stream):
+    """
+    Returns (header, payload) of the next top-level object in stream, or
+    None at the end of the stream.
+    """
+    sync_bin = stream.read(NUM_BYTES_SYNC_MARKER)
+    if len(sync_bin) == 0:
+        return None
+    assert len(sync_bin) == NUM_BYTES_SYNC_MARKER, "Truncated sync-marker."
+    sync = int(np.frombuffer(sync_bin, dtype="<u4")[0])
+    assert sync == SYNC_MARKER, "Expected sync-marker, got {:x}.".format(sync)
+
+    header_bin = stream.read(NUM_BYTES_HEADER)
+    assert len(header_bin) == NUM_BYTES_HEADER, "Truncated header."
+    header = parse_header(header_bin)
+    if header["extended"]:
+        header = _extend_length(header, stream.read(4))
+
+    payload = stream.read(header["length"])
+    assert len(payload) == header["length"], "Truncated object."
+    return header, payload
+
+
+def iter_subobjects(payload):
+    """
+    Yields (header, payload) of the sub-objects in payload.
+    """
+    pos = 0
+    while pos + NUM_BYTES_HEADER <= len(payload):
+        header = parse_header(payload[pos : pos + NUM_BYTES_HEADER])
+        pos += NUM_BYTES_HEADER
+        if header["extended"]:
+            header = _extend_length(header, payload[pos : pos + 4])
+            pos += 4
+        stop = pos + header["length"]
+        assert stop <= len(payload), "Truncated sub-object."
+        yield header, payload[pos:stop]
+        pos = stop
+
+
+def parse_corsika_block(payload):
+    """
+    Returns the float32-block of RUNH, EVTH, EVTE, and RUNE.
+    The payload is the number of floats as int32 followed by the floats.
+    """
+    num = int(np.frombuffer(payload[0:4], dtype="<i4")[0])
+    block = np.frombuffer(payload[4 : 4 + 4 * num], dtype="<f4")
+    assert block.shape[0] == num
+    return block
+
+
+def parse_telescope_definition(payload):
+    """
+    Returns the positions x, y, z, and radii r of the telescopes in cm
+    as a matrix of shape (num_telescopes, 4).
+    """
+    num = int(np.frombuffer(payload[0:4], dtype="<i4")[0])
+    xyzr = np.frombuffer(payload[4 : 4 + 4 * 4 * num], dtype="<f4")
+    return np.reshape(xyzr, (4, num)).T.copy()
+
+
+def parse_array_offsets(payload):
+    """
+    Returns the time-offset in ns, and the offsets x, y in cm of the arrays
+    as a matrix of shape (num_arrays, 2).
+    """
+    num = int(np.frombuffer(payload[0:4], dtype="<i4")[0])
+    time_offset = float(np.frombuffer(payload[4:8], dtype="<f4")[0])
+    xy = np.frombuffer(payload[8 : 8 + 2 * 4 * num], dtype="<f4")
+    return time_offset, np.reshape(xy, (2, num)).T.copy()
+
+
+def parse_photon_bunches(header, payload):
+    """
+    Returns the photon-bunches of one telescope as a matrix of shape
+    (num_bunches, 8) with the layout of I.BUNCH.
+    """
+    # int16 array-id, int16 telescope-id, float32 number of photons
+    num_bunches = int(np.frombuffer(payload[8:12], dtype="<i4")[0])
+    data = payload[12:]
+
+    if header["version"] // 1000 == 1:
+        bunches = np.frombuffer(
+            data[0 : num_bunches * 8 * 2], dtype="<i2"
+        ).astype(np.float32)
+        bunches = np.reshape(bunches, (num_bunches, I.BUNCH.NUM_FLOAT32))
+        bunches = bunches * COMPACT_SCALE
+        bunches[:, I.BUNCH.EMISSOION_ALTITUDE_ASL_CM] = np.power(
+            np.float32(10.0), bunches[:, I.BUNCH.EMISSOION_ALTITUDE_ASL_CM]
+        )
+        return bunches
+
+    bunches = np.frombuffer(
+        data[0 : num_bunches * I.BUNCH.NUM_BYTES], dtype="<f4"
+    )
+    return np.reshape(bunches, (num_bunches, I.BUNCH.NUM_FLOAT32))
+
+
+class RunReader:
+    def __init__(self, path):
+        """
+        Read the eventio-file written by vanilla CORSIKA.
+
+        Parameters
+        ----------
+        path : str
+            Path to the eventio-file.
+        """
+        self.path = str(path)
+        self.stream = open(self.path, "rb")
+        self.telescope_positions = None
+        self.rune = None
+        self._next = None
+        self._event = None
+
+        while True:
+            obj = self._read()
+            assert obj is not None, "Expected RUNH in '{:s}'.".format(
+                self.path
+            )
+            header, payload = obj
+            if header["type"] == TYPE_RUNH:
+                self.runh = parse_corsika_block(payload)
+                break
+
+    def _read(self):
+        if self._next is not None:
+            obj = self._next
+            self._next = None
+            return obj
+        return read_toplevel_object(self.stream)
+
+    def _unread(self, obj):
+        self._next = obj
+
+    def __next__(self):
+        if self._event is not None:
+            for _ in self._event:
+                pass
+
+        while True:
+            obj = self._read()
+            if obj is None:
+                raise StopIteration
+            header, payload = obj
+
+            if header["type"] == TYPE_TELESCOPE_DEFINITION:
+                self.telescope_positions = parse_telescope_definition(payload)
+            elif header["type"] == TYPE_EVTH:
+                evth = parse_corsika_block(payload)
+                self._event = PhotonBunchReader(run=self)
+                return evth, self._event
+            elif header["type"] == TYPE_RUNE:
+                self.rune = parse_corsika_block(payload)
+                raise StopIteration
+
+    def close(self):
+        self.stream.close()
+
+    def __iter__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __repr__(self):
+        out = "{:s}(path='{:s}')".format(self.__class__.__name__, self.path)
+        return out
+
+
+class PhotonBunchReader:
+    def __init__(self, run):
+        """
+        Yields the blocks of bunches of one event, one block per telescope.
+        The bunches are relative to their telescope.
+        """
+        self.run = run
+        self.array_offsets = None
+        self.time_offset = None
+        self.evte = None
+        self._blocks = []
+        self._done = False
+
+    def __next__(self):
+        while len(self._blocks) == 0:
+            if self._done:
+                raise StopIteration
+            obj = self.run._read()
+            if obj is None:
+                self._done = True
+                continue
+            header, payload = obj
+
+            if header["type"] == TYPE_ARRAY_OFFSETS:
+                self.time_offset, self.array_offsets = parse_array_offsets(
+                    payload
+                )
+            elif header["type"] == TYPE_TELESCOPE_DATA:
+                for sub_header, sub_payload in iter_subobjects(payload):
+                    if sub_header["type"] == TYPE_PHOTON_BUNCHES:
+                        self._blocks.append(
+                            parse_photon_bunches(sub_header, sub_payload)
+                        )
+            elif header["type"] == TYPE_EVTE:
+                self.evte = parse_corsika_block(payload)
+                self._done = True
+            elif header["type"] in [TYPE_EVTH, TYPE_RUNE]:
+                self.run._unread((header, payload))
+                self._done = True
+        return self._blocks.pop(0)
+
+    def __iter__(self):
+        return self
+
+    def __repr__(self):
+        out = "{:s}(run.path='{:s}')".format(
+            self.__class__.__name__, self.run.path
+        )
+        return out
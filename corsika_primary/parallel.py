@@ -0,0 +1,196 @@
+"""
+Run the many runs of a steering-archive in parallel on one machine.
+"""
+
+import os
+import multiprocessing
+from . import steering
+from . import testing
+
+
+def estimate_cost(steering_dict):
+    """
+    Returns the expected cost of a run in arbitrary units.
+    The number of Cherenkov-photons, and thus the runtime, of a shower
+    scales roughly with the energy of its primary particle.
+
+    Parameters
+    ----------
+    steering_dict : dict
+        The steering for the run and for each primary particle.
+    """
+    cost = 0.0
+    for primary in steering_dict["primaries"]:
+        cost += float(primary["energy_GeV"])
+    return cost
+
+
+def make_output_paths(out_dir, run_id):
+    """
+    Returns the paths of the output written for run run_id.
+    """
+    base = os.path.join(out_dir, "{:09d}".format(run_id))
+    return {
+        "cherenkov_output_path": base + ".cer.tar",
+        "particle_output_path": base + ".par.dat",
+        "stdout_path": base + ".stdout",
+        "stderr_path": base + ".stderr",
+    }
+
+
+def make_jobs(steering_dicts, out_dir, corsika_path=None, **kwargs):
+    """
+    Returns the list of jobs sorted by their estimated cost, the longest
+    runs first.
+
+    Parameters
+    ----------
+    steering_dicts : dict
+        The steering-dicts with their run_id as key.
+        See steering.read_steerings.
+    out_dir : str
+        Directory to write the output of all runs to.
+    corsika_path : str (default: None)
+        Path to corsika's executable in its 'run' directory.
+    kwargs : dict
+        Passed on to corsika_primary.corsika_primary.
+    """
+    jobs = []
+    for run_id in steering_dicts:
+        job = {
+            "run_id": run_id,
+            "steering_dict": steering_dicts[run_id],
+            "corsika_path": corsika_path,
+            "kwargs": kwargs,
+            "cost": estimate_cost(steering_dicts[run_id]),
+        }
+        job.update(make_output_paths(out_dir=out_dir, run_id=run_id))
+        jobs.append(job)
+    return sorted(jobs, key=lambda job: job["cost"], reverse=True)
+
+
+def run_job(job):
+    """
+    Runs a single job created by make_jobs.
+    Never raises, the status is reported in the returned dict.
+    """
+    from . import corsika_primary
+
+    result = {
+        "run_id": job["run_id"],
+        "cherenkov_output_path": job["cherenkov_output_path"],
+        "particle_output_path": job["particle_output_path"],
+        "stdout_path": job["stdout_path"],
+        "stderr_path": job["stderr_path"],
+        "returncode": None,
+        "end_of_run": False,
+        "error": None,
+    }
+    try:
+        result["returncode"] = corsika_primary(
+            steering_dict=job["steering_dict"],
+            cherenkov_output_path=job["cherenkov_output_path"],
+            particle_output_path=job["particle_output_path"],
+            stdout_path=job["stdout_path"],
+            stderr_path=job["stderr_path"],
+            tmp_dir_prefix="corsika_primary_{:09d}_".format(job["run_id"]),
+            corsika_path=job["corsika_path"],
+            **job["kwargs"],
+        )
+    except Exception as err:
+        result["error"] = repr(err)
+
+    result["end_of_run"] = stdout_file_ends_with_end_of_run_marker(
+        path=job["stdout_path"]
+    )
+    return result
+
+
+def run_steerings(
+    steerings_path,
+    out_dir,
+    num_workers=None,
+    corsika_path=None,
+    **kwargs,
+):
+    """
+    Runs all the runs in a steering-archive in parallel.
+    The runs with the highest expected cost are started first to keep all
+    workers busy until the end.
+
+    Parameters
+    ----------
+    steerings_path : str
+        Path to the steering-archive. See steering.write_steerings.
+    out_dir : str
+        Directory to write the output of all runs to.
+    num_workers : int (default: None)
+        Number of runs executed in parallel. If None, os.cpu_count() is used.
+    corsika_path : str (default: None)
+        Path to corsika's executable in its 'run' directory.
+        If None, the path is looked up in the user's configfile
+        ~/.corsika_primary.json
+    kwargs : dict
+        Passed on to corsika_primary.corsika_primary,
+        e.g. run_dir_mode.
+
+    Returns
+    -------
+    results : dict
+        With the run_id as key. Each result has the output-paths, the
+        'returncode', the 'end_of_run' status, and the 'error' if any.
+    """
+    steering_dicts = steering.read_steerings(path=steerings_path)
+    return run_steering_dicts(
+        steering_dicts=steering_dicts,
+        out_dir=out_dir,
+        num_workers=num_workers,
+        corsika_path=corsika_path,
+        **kwargs,
+    )
+
+
+def run_steering_dicts(
+    steering_dicts,
+    out_dir,
+    num_workers=None,
+    corsika_path=None,
+    **kwargs,
+):
+    """
+    Same as run_steerings but for steering_dicts already in memory.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = make_jobs(
+        steering_dicts=steering_dicts,
+        out_dir=out_dir,
+        corsika_path=corsika_path,
+        **kwargs,
+    )
+
+    results = {}
+    if len(jobs) == 0:
+        return results
+
+    num_workers = num_workers if num_workers else os.cpu_count()
+    num_workers = min([num_workers, len(jobs)])
+
+    with multiprocessing.Pool(processes=num_workers) as pool:
+        for result in pool.imap_unordered(run_job, jobs, chunksize=1):
+            results[result["run_id"]] = result
+    return results
+
+
+def stdout_file_ends_with_end_of_run_marker(path, num_tail_bytes=4096):
+    """
+    Same as testing.stdout_ends_with_end_of_run_marker but only reads the
+    tail of the file.
+    """
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max([0, size - num_tail_bytes]))
+        tail = f.read().decode(errors="replace")
+    return testing.stdout_ends_with_end_of_run_marker(tail)
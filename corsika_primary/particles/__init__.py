@@ -5,7 +5,9 @@ from . import identification
 from .. import event_tape
 
 
-def ParticleEventTapeWriter(path, buffer_capacity=1000 * 1000):
+def ParticleEventTapeWriter(
+    path, buffer_capacity=1000 * 1000, write_toc=False, num_buffers=1
+):
     """
     Write a ParticleEventTape. Add RUNH, EVTH, and particles.
 
@@ -13,20 +15,74 @@ def ParticleEventTapeWriter(path, buffer_capacity=1000 * 1000):
         Path to event-tape file.
     buffer_capacity : int
         Buffer-size in num. particles.
+    write_toc : bool
+        Write the table-of-contents, see event_tape.toc_path.
+    num_buffers : int
+        If larger than 1, a background-thread compresses and writes.
     """
     return event_tape.EventTapeWriter(
         path=path,
         payload_shape_1=7,
         payload_block_suffix=PARTICLE_SUFFIX,
         buffer_capacity=buffer_capacity,
+        write_toc=write_toc,
+        num_buffers=num_buffers,
     )
 
 
-def ParticleEventTapeReader(path):
+def ParticleEventTapeReader(
+    path, memory_map=False, num_threads=None, evth_filter=None
+):
+    """
+    Read an EventTape.
+
+    path : str
+        Path to event-tape file.
+    memory_map : bool
+        If True, the payload-blocks are read-only views into the
+        memory-mapped tape. Only for uncompressed tapes.
+    num_threads : int
+        Threads to decompress the blocks of block-compressed tapes.
+    evth_filter : function
+        Events for which evth_filter(evth) is False are skipped.
+    """
     return event_tape.EventTapeReader(
         path=path,
         payload_block_suffix=PARTICLE_SUFFIX,
         func_read_payload_block=read_particle_block,
+        payload_shape_1=7,
+        memory_map=memory_map,
+        num_threads=num_threads,
+        evth_filter=evth_filter,
+    )
+
+
+def ParticleMultiRunEventTapeReader(
+    path, memory_map=False, num_threads=None, evth_filter=None
+):
+    """
+    Read an EventTape with one or more runs.
+    Yields (runh, evth, payload_reader).
+
+    See ParticleEventTapeReader for the parameters.
+    """
+    return event_tape.MultiRunEventTapeReader(
+        path=path,
+        payload_block_suffix=PARTICLE_SUFFIX,
+        func_read_payload_block=read_particle_block,
+        payload_shape_1=7,
+        memory_map=memory_map,
+        num_threads=num_threads,
+        evth_filter=evth_filter,
+    )
+
+
+def ParticleEventTapeRandomAccessReader(path, num_threads=None):
+    return event_tape.EventTapeRandomAccessReader(
+        path=path,
+        payload_block_suffix=PARTICLE_SUFFIX,
+        payload_shape_1=7,
+        num_threads=num_threads,
     )
 
 
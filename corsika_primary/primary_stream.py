@@ -0,0 +1,124 @@
+"""
+Stream primary particles into a running CORSIKA-primary.
+
+CORSIKA-primary reads the block of the next primary particle from its
+primary-file only when the next shower begins. When the primary-file is a
+FIFO, the primaries can be pushed while the run is live. CORSIKA then ends
+each event with an EVTE in its Cherenkov-output, so the reader does not
+wait for the next shower to know that an event is complete.
+"""
+
+import os
+import errno
+import queue
+import threading
+from . import steering
+
+
+class PrimaryStreamWriter:
+    def __init__(self, path, max_num_primaries, poll_interval_s=0.05):
+        """
+        Writes primary particles into the FIFO in path.
+        A background-thread writes into the FIFO so that pushing a primary
+        never blocks, not even when CORSIKA did not open the FIFO yet.
+
+        Parameters
+        ----------
+        path : str
+            Path to the FIFO. Must exist.
+        max_num_primaries : int
+            The number of showers CORSIKA was told to simulate (NSHOW).
+        poll_interval_s : float
+            Time between two attempts to open the FIFO while CORSIKA did
+            not open it yet.
+        """
+        self.path = str(path)
+        self.max_num_primaries = int(max_num_primaries)
+        assert self.max_num_primaries >= 0
+        self.poll_interval_s = float(poll_interval_s)
+        self.num_pushed = 0
+        self.closed = False
+        self.error = None
+        self._abort = threading.Event()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._write, daemon=True)
+        self.thread.start()
+
+    def push(self, primary_dict):
+        """
+        Pushes the primary_dict of the next shower.
+        """
+        assert not self.closed, "Primary-stream is already closed."
+        assert (
+            self.num_pushed < self.max_num_primaries
+        ), "Already pushed max_num_primaries={:d}.".format(
+            self.max_num_primaries
+        )
+        primary_bytes = steering.primary_dict_to_bytes(primary_dict)
+        self.num_pushed += 1
+        self.queue.put(primary_bytes)
+        if self.num_pushed == self.max_num_primaries:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+
+    def abort(self):
+        """
+        Stops the background-thread when CORSIKA is gone. Primaries which
+        were not written yet are dropped.
+        """
+        self._abort.set()
+        self.close()
+
+    def is_exhausted(self):
+        """
+        Returns True when all max_num_primaries were pushed.
+        """
+        return self.num_pushed == self.max_num_primaries
+
+    def join(self, timeout=None):
+        self.thread.join(timeout=timeout)
+
+    def _write(self):
+        try:
+            fd = self._open_fifo()
+            if fd is None:
+                self.error = RuntimeError(
+                    "Aborted before CORSIKA opened '{:s}'.".format(self.path)
+                )
+                return
+            os.set_blocking(fd, True)
+            with os.fdopen(fd, "wb", buffering=0) as fifo:
+                while True:
+                    primary_bytes = self.queue.get()
+                    if primary_bytes is None:
+                        break
+                    fifo.write(primary_bytes)
+        except OSError as err:
+            self.error = err
+
+    def _open_fifo(self):
+        # Opening the FIFO non-blocking does not wait for CORSIKA. It fails
+        # with ENXIO until CORSIKA opened the FIFO for reading. A blocking
+        # open() would wait forever when CORSIKA never opens it.
+        while True:
+            try:
+                return os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as err:
+                if err.errno != errno.ENXIO:
+                    raise
+            if self._abort.wait(timeout=self.poll_interval_s):
+                return None
+
+    def __repr__(self):
+        out = "{:s}(path='{:s}', pushed={:d}/{:d})".format(
+            self.__class__.__name__,
+            self.path,
+            self.num_pushed,
+            self.max_num_primaries,
+        )
+        return out
@@ -0,0 +1,300 @@
+"""
+Simulate selected events of existing runs again.
+
+Each EVTH in a Cherenkov event-tape carries the state of the
+random-number-generator at the begin of its event. Together with the run's
+steering_dict, an event is reproduced by a run with only the event's primary
+starting from this state, see tests/test_reproduce_events_modified.py.
+
+The requested events of a run are grouped into consecutive ranges. A range
+is simulated in a single run starting from the state in the EVTH of its
+first event, because CORSIKA continues the state from one event to the next.
+The primaries are taken from the steering_dict and not from the EVTH,
+because the EVTH has the primary only in float32. Its energy, direction,
+and starting-depth would differ slightly from the steering_dict's float64.
+"""
+
+import copy
+import os
+import tarfile
+import multiprocessing
+import numpy as np
+from . import I
+from . import cherenkov
+from . import event_tape
+from . import parallel
+from . import particles
+from . import random
+
+
+def read_headers(path, event_numbers=None):
+    """
+    Returns the RUNH and the EVTHs of the event-tape in path.
+    The payload is skipped.
+
+    Parameters
+    ----------
+    path : str
+        Path to the event-tape.
+    event_numbers : list of int (default: None)
+        Only the EVTHs of these events. If None, all EVTHs.
+
+    Returns
+    -------
+    (runh, evths) : tuple
+        evths is a dict with the event_number as key.
+    """
+    if event_numbers is not None:
+        event_numbers = set(event_numbers)
+    runh = None
+    evths = {}
+    mode = "r|gz" if str.endswith(path, ".gz") else "r|"
+    with tarfile.open(name=path, mode=mode) as tar:
+        for tarinfo in tar:
+            if event_tape.is_runh_path(tarinfo.name):
+                runh = event_tape.read_runh(tar=tar, tarinfo=tarinfo)
+            elif event_tape.is_evth_path(tarinfo.name):
+                event_number = event_tape.parse_event_number(tarinfo.name)
+                if event_numbers is None or event_number in event_numbers:
+                    evths[event_number] = event_tape.read_evth(
+                        tar=tar, tarinfo=tarinfo
+                    )
+    return runh, evths
+
+
+def group_event_numbers(event_numbers, max_gap=0):
+    """
+    Returns the sorted and unique event_numbers grouped into ranges of
+    (first, last) event_number.
+
+    Parameters
+    ----------
+    event_numbers : list of int
+        The events to be simulated again.
+    max_gap : int (default: 0)
+        Events in a range may be further apart by up to max_gap events.
+        The events in the gap are simulated again, too. This trades the
+        startup of CORSIKA against the simulation of unwanted events.
+    """
+    assert max_gap >= 0
+    ranges = []
+    for event_number in sorted(set(event_numbers)):
+        if len(ranges) > 0 and event_number - ranges[-1][1] <= max_gap + 1:
+            ranges[-1][1] = event_number
+        else:
+            ranges.append([event_number, event_number])
+    return [tuple(r) for r in ranges]
+
+
+def assert_evth_matches_primary(evth, primary):
+    assert evth[I.EVTH.PARTICLE_ID] == np.float32(primary["particle_id"])
+    assert np.isclose(
+        evth[I.EVTH.TOTAL_ENERGY_GEV], primary["energy_GeV"], rtol=1e-6
+    ), "Expected the primary's energy in EVTH."
+
+
+def make_jobs(
+    requests,
+    steering_dicts,
+    out_dir,
+    max_gap=0,
+    corsika_path=None,
+    **kwargs,
+):
+    """
+    Returns the list of jobs to simulate the requested events again, sorted
+    by their estimated cost, the longest first.
+
+    Parameters
+    ----------
+    requests : list of (str, int)
+        Pairs of (path to Cherenkov event-tape, event_number).
+    steering_dicts : dict
+        The steering_dicts of the original runs with their run_id as key.
+        See steering.read_steerings.
+    out_dir : str
+        Directory to write the output of all jobs to.
+    max_gap : int (default: 0)
+        See group_event_numbers.
+    corsika_path : str (default: None)
+        Path to corsika's executable in its 'run' directory.
+    kwargs : dict
+        Passed on to corsika_primary.corsika_primary.
+    """
+    event_numbers_by_path = {}
+    for path, event_number in requests:
+        if path not in event_numbers_by_path:
+            event_numbers_by_path[path] = set()
+        event_numbers_by_path[path].add(int(event_number))
+
+    jobs = []
+    for path in event_numbers_by_path:
+        event_numbers = event_numbers_by_path[path]
+        ranges = group_event_numbers(event_numbers, max_gap=max_gap)
+        runh, evths = read_headers(path=path, event_numbers=event_numbers)
+
+        run_id = int(runh[I.RUNH.RUN_NUMBER])
+        steering_dict = steering_dicts[run_id]
+        first = int(steering_dict["run"]["event_id_of_first_event"])
+
+        for event_number in event_numbers:
+            assert (
+                event_number in evths
+            ), "Event {:d} is not in '{:s}'.".format(event_number, path)
+
+        for first_event_number, last_event_number in ranges:
+            start = first_event_number - first
+            stop = last_event_number - first + 1
+            assert start >= 0
+
+            job_steering_dict = {"run": copy.deepcopy(steering_dict["run"])}
+            job_steering_dict["run"]["event_id_of_first_event"] = np.int64(
+                first_event_number
+            )
+            job_steering_dict["run"]["random_seed"] = (
+                random.seed.parse_seed_from_evth(evths[first_event_number])
+            )
+            job_steering_dict["primaries"] = copy.deepcopy(
+                steering_dict["primaries"][start:stop]
+            )
+            assert_evth_matches_primary(
+                evth=evths[first_event_number],
+                primary=job_steering_dict["primaries"][0],
+            )
+
+            job_id = len(jobs)
+            job = {
+                "run_id": job_id,
+                "steering_dict": job_steering_dict,
+                "corsika_path": corsika_path,
+                "kwargs": kwargs,
+                "cost": parallel.estimate_cost(job_steering_dict),
+                "tape_path": path,
+                "event_numbers": sorted(
+                    [
+                        e
+                        for e in event_numbers
+                        if first_event_number <= e <= last_event_number
+                    ]
+                ),
+            }
+            job.update(
+                parallel.make_output_paths(out_dir=out_dir, run_id=job_id)
+            )
+            jobs.append(job)
+    return sorted(jobs, key=lambda job: job["cost"], reverse=True)
+
+
+def run_job(job):
+    """
+    Same as parallel.run_job, but the result also has the 'tape_path' and
+    the requested 'event_numbers'.
+    """
+    result = parallel.run_job(job)
+    result["tape_path"] = job["tape_path"]
+    result["event_numbers"] = job["event_numbers"]
+    return result
+
+
+def run(
+    requests,
+    steering_dicts,
+    out_dir,
+    num_workers=None,
+    max_gap=0,
+    corsika_path=None,
+    **kwargs,
+):
+    """
+    Simulates the requested events again in parallel.
+
+    Parameters
+    ----------
+    requests : list of (str, int)
+        Pairs of (path to Cherenkov event-tape, event_number).
+    steering_dicts : dict
+        The steering_dicts of the original runs with their run_id as key.
+    out_dir : str
+        Directory to write the output of all jobs to.
+    num_workers : int (default: None)
+        Number of jobs executed in parallel. If None, os.cpu_count() is used.
+    max_gap : int (default: 0)
+        See group_event_numbers.
+    corsika_path : str (default: None)
+        Path to corsika's executable in its 'run' directory.
+    kwargs : dict
+        Passed on to corsika_primary.corsika_primary.
+
+    Returns
+    -------
+    results : list
+        The result of each job sorted by its 'run_id', see run_job.
+        Use iter_events() to read the requested events.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = make_jobs(
+        requests=requests,
+        steering_dicts=steering_dicts,
+        out_dir=out_dir,
+        max_gap=max_gap,
+        corsika_path=corsika_path,
+        **kwargs,
+    )
+    results = []
+    if len(jobs) == 0:
+        return results
+
+    num_workers = num_workers if num_workers else os.cpu_count()
+    num_workers = min([num_workers, len(jobs)])
+
+    with multiprocessing.Pool(processes=num_workers) as pool:
+        for result in pool.imap_unordered(run_job, jobs, chunksize=1):
+            results.append(result)
+    return sorted(results, key=lambda result: result["run_id"])
+
+
+def iter_events(results):
+    """
+    Yields the requested events simulated again by run().
+
+    Yields
+    ------
+    (tape_path, event_number, evth, cherenkov_bunches, particles) : tuple
+        The cherenkov_bunches are a matrix of shape (N, 8), the particles
+        from CORSIKA's particle-output are a matrix of shape (M, 7).
+    """
+    for result in results:
+        if result["error"] is not None:
+            raise RuntimeError(
+                "Job {:d} failed: {:s}".format(
+                    result["run_id"], str(result["error"])
+                )
+            )
+        requested = set(result["event_numbers"])
+
+        with cherenkov.CherenkovEventTapeReader(
+            result["cherenkov_output_path"]
+        ) as cer_run, open(result["particle_output_path"], "rb") as f:
+            par_run = particles.dat.RunReader(stream=f)
+            for (evth, cer_reader), (par_evth, par_reader) in zip(
+                cer_run, par_run
+            ):
+                event_number = int(evth[I.EVTH.EVENT_NUMBER])
+                assert event_number == int(par_evth[I.EVTH.EVENT_NUMBER])
+                cer_blocks = [block for block in cer_reader]
+                par_blocks = [block for block in par_reader]
+                if event_number not in requested:
+                    continue
+                yield (
+                    result["tape_path"],
+                    event_number,
+                    evth,
+                    _vstack(cer_blocks, shape_1=8),
+                    _vstack(par_blocks, shape_1=7),
+                )
+
+
+def _vstack(blocks, shape_1):
+    if len(blocks) == 0:
+        return np.zeros(shape=(0, shape_1), dtype=np.float32)
+    return np.vstack(blocks)
@@ -0,0 +1,297 @@
+"""
+Resume a run which crashed or was preempted.
+
+The Cherenkov event-tape is written event by event. The EVTH of each event
+carries the state of the random-number-generator at the begin of the event,
+see random.seed.parse_seed_from_evth. A partial tape is resumed by running
+CORSIKA again with only the remaining primaries, starting from the seed in
+the EVTH of the first incomplete event. The events of the resumed run are
+spliced to the complete events of the partial tape.
+
+The payload of an event is only complete once the next EVTH, or the end of
+the tape, was written. Therefore the last event in a partial tape is always
+simulated again.
+
+Only the Cherenkov event-tape is spliced. CORSIKA's particle-output of the
+resumed run has the resumed events only. The particle-output of the events
+before the resume-point is not spliced.
+"""
+
+import copy
+import gzip
+import io
+import os
+import tarfile
+import zlib
+from . import I
+from . import event_tape
+from . import random
+
+TRUNCATION_ERRORS = (tarfile.TarError, EOFError, zlib.error)
+
+
+def _open_raw(path):
+    if str.endswith(path, ".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def tape_has_end_of_archive(path, chunk_size=2**20):
+    """
+    Returns True if the tape in path ends with the two zero-blocks which
+    mark the end of a tar-archive. A tape is only closed properly when the
+    run finished.
+    """
+    tail = b""
+    try:
+        with _open_raw(path) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if len(chunk) == 0:
+                    break
+                tail = (tail + chunk)[-2 * tarfile.BLOCKSIZE :]
+    except TRUNCATION_ERRORS:
+        return False
+    if len(tail) < 2 * tarfile.BLOCKSIZE:
+        return False
+    return tail == bytes(2 * tarfile.BLOCKSIZE)
+
+
+def scan_partial_tape(path):
+    """
+    Returns the RUNH and the EVTHs found in the partial tape in path.
+    Reading stops without error where the tape is truncated.
+
+    Returns
+    -------
+    scan : dict
+        runh : np.array or None
+            None if the tape ends before the RUNH, or does not exist.
+        evths : list of np.array
+            The EVTHs in the order of the tape.
+        is_complete : bool
+            True if the tape was closed properly.
+    """
+    scan = {"runh": None, "evths": [], "is_complete": False}
+    if not os.path.exists(path):
+        return scan
+    try:
+        with tarfile.open(name=path, mode=_read_mode(path)) as tar:
+            for tarinfo in tar:
+                if event_tape.is_runh_path(tarinfo.name):
+                    scan["runh"] = event_tape.read_runh(tar, tarinfo)
+                elif event_tape.is_evth_path(tarinfo.name):
+                    scan["evths"].append(event_tape.read_evth(tar, tarinfo))
+    except TRUNCATION_ERRORS:
+        return scan
+    scan["is_complete"] = tape_has_end_of_archive(path)
+    return scan
+
+
+def find_resume_point(path, steering_dict):
+    """
+    Returns where to resume the run of steering_dict which wrote the partial
+    tape in path.
+
+    Returns
+    -------
+    resume_point : dict or None
+        None if the run is complete.
+        event_number : int
+            The event to resume with. All events before are complete.
+        random_seed : list of dict
+            The state of the random-number-generator at the begin of
+            event_number.
+    """
+    first = int(steering_dict["run"]["event_id_of_first_event"])
+    num_primaries = len(steering_dict["primaries"])
+    scan = scan_partial_tape(path=path)
+
+    if scan["runh"] is not None:
+        assert int(scan["runh"][I.RUNH.RUN_NUMBER]) == int(
+            steering_dict["run"]["run_id"]
+        ), "The tape in '{:s}' is of an other run.".format(path)
+
+    if len(scan["evths"]) == 0:
+        return {
+            "event_number": first,
+            "random_seed": copy.deepcopy(steering_dict["run"]["random_seed"]),
+        }
+
+    if scan["is_complete"] and len(scan["evths"]) == num_primaries:
+        return None
+
+    evth = scan["evths"][-1]
+    event_number = int(evth[I.EVTH.EVENT_NUMBER])
+    assert first <= event_number < first + num_primaries
+    return {
+        "event_number": event_number,
+        "random_seed": random.seed.parse_seed_from_evth(evth),
+    }
+
+
+def make_resume_steering_dict(steering_dict, resume_point):
+    """
+    Returns the steering_dict for the remaining primaries of a run.
+    """
+    first = int(steering_dict["run"]["event_id_of_first_event"])
+    start = resume_point["event_number"] - first
+
+    out = {"run": copy.deepcopy(steering_dict["run"])}
+    out["run"]["event_id_of_first_event"] = type(
+        steering_dict["run"]["event_id_of_first_event"]
+    )(resume_point["event_number"])
+    out["run"]["random_seed"] = copy.deepcopy(resume_point["random_seed"])
+    out["primaries"] = copy.deepcopy(steering_dict["primaries"][start:])
+    return out
+
+
+def splice(partial_path, resumed_path, out_path, event_number):
+    """
+    Writes the events before event_number from the partial tape, followed by
+    all events of the resumed tape, to out_path. The members are copied
+    without parsing the payload.
+
+    Parameters
+    ----------
+    partial_path : str
+        The tape which is truncated.
+    resumed_path : str
+        The complete tape which starts with event_number.
+    out_path : str
+        Must neither be partial_path nor resumed_path.
+    event_number : int
+        The first event taken from the resumed tape.
+    """
+    assert out_path not in [partial_path, resumed_path]
+    run_number = None
+    with tarfile.open(name=out_path, mode=_write_mode(out_path)) as out:
+        try:
+            if not os.path.exists(partial_path):
+                raise EOFError
+            with tarfile.open(
+                name=partial_path, mode=_read_mode(partial_path)
+            ) as tar:
+                for tarinfo in tar:
+                    if event_tape.is_runh_path(tarinfo.name):
+                        run_number = event_tape.parse_run_number(tarinfo.name)
+                    elif (
+                        event_tape.parse_event_number(tarinfo.name)
+                        >= event_number
+                    ):
+                        break
+                    # The header must not be written for a truncated member.
+                    data = _read_complete_member(tar=tar, tarinfo=tarinfo)
+                    if data is None:
+                        break
+                    out.addfile(tarinfo, io.BytesIO(data))
+        except TRUNCATION_ERRORS:
+            pass
+
+        with tarfile.open(
+            name=resumed_path, mode=_read_mode(resumed_path)
+        ) as tar:
+            for tarinfo in tar:
+                if event_tape.is_runh_path(tarinfo.name):
+                    resumed_run_number = event_tape.parse_run_number(
+                        tarinfo.name
+                    )
+                    if run_number is None:
+                        run_number = resumed_run_number
+                        out.addfile(tarinfo, tar.extractfile(tarinfo))
+                    assert run_number == resumed_run_number
+                    continue
+                assert (
+                    event_tape.parse_event_number(tarinfo.name) >= event_number
+                )
+                out.addfile(tarinfo, tar.extractfile(tarinfo))
+
+
+def _read_complete_member(tar, tarinfo):
+    # Returns None when the tape ends within the member's data.
+    try:
+        data = tar.extractfile(tarinfo).read()
+    except TRUNCATION_ERRORS:
+        return None
+    if len(data) != tarinfo.size:
+        return None
+    return data
+
+
+def resume(
+    steering_dict,
+    cherenkov_output_path,
+    particle_output_path,
+    corsika_path=None,
+    **kwargs,
+):
+    """
+    Completes the partial Cherenkov event-tape in cherenkov_output_path
+    which was written by an interrupted run of steering_dict.
+
+    Parameters
+    ----------
+    steering_dict : dict
+        The steering of the interrupted run.
+    cherenkov_output_path : str
+        Path to the partial tape. It is replaced by the complete tape.
+    particle_output_path : str
+        Path to write CORSIKA's particle-output of the resumed events to.
+        It does not have the events before the resume-point.
+    corsika_path : str (default: None)
+        Path to corsika's executable in its 'run' directory.
+    kwargs : dict
+        Passed on to corsika_primary.corsika_primary.
+
+    Returns
+    -------
+    resume_point : dict or None
+        See find_resume_point. None if the run was already complete.
+    """
+    from . import corsika_primary
+
+    resume_point = find_resume_point(
+        path=cherenkov_output_path, steering_dict=steering_dict
+    )
+    if resume_point is None:
+        return None
+
+    resume_steering_dict = make_resume_steering_dict(
+        steering_dict=steering_dict, resume_point=resume_point
+    )
+    base, ext = _split_ext(cherenkov_output_path)
+    # CORSIKA writes uncompressed tapes.
+    resumed_path = base + ".resumed.tar"
+    spliced_path = base + ".spliced" + ext
+
+    corsika_primary(
+        steering_dict=resume_steering_dict,
+        cherenkov_output_path=resumed_path,
+        particle_output_path=particle_output_path,
+        corsika_path=corsika_path,
+        **kwargs,
+    )
+    splice(
+        partial_path=cherenkov_output_path,
+        resumed_path=resumed_path,
+        out_path=spliced_path,
+        event_number=resume_point["event_number"],
+    )
+    os.replace(spliced_path, cherenkov_output_path)
+    os.remove(resumed_path)
+    return resume_point
+
+
+def _split_ext(path):
+    for ext in [".tar.gz", ".tar"]:
+        if str.endswith(path, ext):
+            return path[: -len(ext)], ext
+    return path, ""
+
+
+def _read_mode(path):
+    return "r|gz" if str.endswith(path, ".gz") else "r|"
+
+
+def _write_mode(path):
+    return "w|gz" if str.endswith(path, ".gz") else "w|"
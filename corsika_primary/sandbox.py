@@ -0,0 +1,120 @@
+"""
+Build the temporary run-directories CORSIKA is executed in.
+
+CORSIKA expects to be executed in its 'run' directory next to the tables of
+the hadronic-models and the atmospheric-profiles. These tables are only read.
+Instead of copying the full 'run' directory for every run, the temporary
+run-directory can be populated with hardlinks or symlinks to a staged copy.
+Only the files written into the run-directory are real files.
+"""
+
+import os
+import shutil
+import tempfile
+from . import steering
+
+MODES = ["copy", "hardlink", "symlink"]
+
+# Files in the run-directory which are written for each run.
+# These are never linked to the staged copy.
+WRITTEN_FILENAMES = [steering.PRIMARY_BYTES_FILENAME_IN_CORSIKA_RUN_DIR]
+
+
+def stage(corsika_path, stage_dir):
+    """
+    Returns the path of the CORSIKA executable in a staged copy of its
+    run-directory. The run-directory is copied to stage_dir only once.
+    Concurrent calls are safe as the copy is moved into place atomically.
+
+    Parameters
+    ----------
+    corsika_path : str
+        Path to corsika's executable in its 'run' directory.
+    stage_dir : str
+        Directory to stage the copy in. Should be on node-local disk and on
+        the same filesystem as the temporary directories when mode 'hardlink'
+        is used.
+    """
+    corsika_path = os.path.abspath(corsika_path)
+    corsika_run_dir = os.path.dirname(corsika_path)
+    staged_run_dir = os.path.join(
+        os.path.abspath(stage_dir), os.path.basename(corsika_run_dir)
+    )
+    staged_corsika_path = os.path.join(
+        staged_run_dir, os.path.basename(corsika_path)
+    )
+
+    if os.path.isdir(staged_run_dir):
+        return staged_corsika_path
+
+    os.makedirs(stage_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=stage_dir) as tmp_dir:
+        tmp_run_dir = os.path.join(tmp_dir, "run")
+        shutil.copytree(corsika_run_dir, tmp_run_dir, symlinks=False)
+        _remove_written_files(run_dir=tmp_run_dir)
+        try:
+            os.rename(tmp_run_dir, staged_run_dir)
+        except OSError:
+            # An other process staged the run-directory in the meantime.
+            assert os.path.isdir(staged_run_dir)
+
+    return staged_corsika_path
+
+
+def make_run_dir(src_run_dir, dst_run_dir, mode="copy"):
+    """
+    Populates the temporary run-directory dst_run_dir from src_run_dir.
+
+    Parameters
+    ----------
+    src_run_dir : str
+        CORSIKA's 'run' directory, or its staged copy.
+    dst_run_dir : str
+        The temporary run-directory to be created.
+    mode : str
+        'copy': Copy all files. This is the safe default.
+        'hardlink': Hardlink all files. Falls back to 'symlink' when
+        src_run_dir is on a different filesystem.
+        'symlink': Symlink all files.
+    """
+    assert mode in MODES, "Expected mode in {:s}, but got '{:s}'.".format(
+        str(MODES), mode
+    )
+    src_run_dir = os.path.abspath(src_run_dir)
+
+    if mode == "copy":
+        shutil.copytree(src_run_dir, dst_run_dir, symlinks=False)
+        _remove_written_files(run_dir=dst_run_dir)
+        return
+
+    for src_dirpath, dirnames, filenames in os.walk(src_run_dir):
+        relpath = os.path.relpath(src_dirpath, src_run_dir)
+        dst_dirpath = os.path.normpath(os.path.join(dst_run_dir, relpath))
+        os.makedirs(dst_dirpath, exist_ok=True)
+
+        for dirname in dirnames:
+            src = os.path.join(src_dirpath, dirname)
+            if os.path.islink(src):
+                os.symlink(
+                    os.path.realpath(src), os.path.join(dst_dirpath, dirname)
+                )
+
+        for filename in filenames:
+            if relpath == "." and filename in WRITTEN_FILENAMES:
+                continue
+            src = os.path.join(src_dirpath, filename)
+            dst = os.path.join(dst_dirpath, filename)
+            if mode == "hardlink":
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    os.symlink(src, dst)
+            else:
+                os.symlink(src, dst)
+
+
+def _remove_written_files(run_dir):
+    for filename in WRITTEN_FILENAMES:
+        path = os.path.join(run_dir, filename)
+        if os.path.lexists(path):
+            os.remove(path)
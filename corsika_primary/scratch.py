@@ -0,0 +1,335 @@
+"""
+Manage the scratch-storage for the temporary directories of runs.
+
+Each run needs a temporary directory for its FIFOs, its run-directory, and
+CORSIKA's particle-output. The Scratch picks the first location with enough
+space, e.g. /dev/shm, a local SSD, and a fallback. The space of concurrent
+runs is reserved in a ledger shared by all processes on the node. When
+there is not enough space, a run waits for other runs to release theirs.
+
+The space available for a new reservation is the free space of the
+file-system minus the parts of the active reservations which are not
+written yet. So space used by others, e.g. other users, is respected.
+"""
+
+import os
+import json
+import time
+import fcntl
+import shutil
+import stat
+import tempfile
+import contextlib
+
+LEDGER_FILENAME = ".corsika_primary_scratch_ledger.json"
+
+# Conservative guess for CORSIKA's particle-output. It depends on the
+# observation-level and the energy-cuts. A particle takes 7 float32, i.e.
+# 28 bytes, so this allows ~350 particles per GeV of primary energy.
+# Showers of gammas and protons have fewer particles than this on an
+# observation-level at a few km above sea-level with the default cuts.
+PARTICLE_OUTPUT_NUM_BYTES_PER_GEV = 10 * 1000
+
+# The FIFOs, the primary-file and the std-out parsing need little space.
+RUN_BASE_NUM_BYTES = 16 * 1000 * 1000
+
+
+def default_locations():
+    return ["/dev/shm", tempfile.gettempdir()]
+
+
+def estimate_run_dir_num_bytes(corsika_run_dir, run_dir_mode):
+    """
+    Returns the number of bytes the temporary run-directory takes.
+    Only mode 'copy' copies the files.
+    """
+    if run_dir_mode != "copy":
+        return 0
+    num_bytes = 0
+    for dirpath, _, filenames in os.walk(corsika_run_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if not os.path.islink(path):
+                num_bytes += os.stat(path).st_size
+    return num_bytes
+
+
+def estimate_footprint_num_bytes(
+    steering_dict,
+    run_dir_num_bytes=0,
+    particle_output_num_bytes_per_GeV=PARTICLE_OUTPUT_NUM_BYTES_PER_GEV,
+):
+    """
+    Returns the expected maximum size of a run's temporary directory.
+
+    Parameters
+    ----------
+    steering_dict : dict
+        The steering for the run and for each primary particle.
+    run_dir_num_bytes : int
+        See estimate_run_dir_num_bytes.
+    particle_output_num_bytes_per_GeV : float
+        Size of CORSIKA's particle-output per GeV of primary energy.
+        Use 0 when the particle-output is not written into the temporary
+        directory.
+    """
+    energy_GeV = 0.0
+    for primary in steering_dict["primaries"]:
+        energy_GeV += float(primary["energy_GeV"])
+    return int(
+        RUN_BASE_NUM_BYTES
+        + run_dir_num_bytes
+        + energy_GeV * particle_output_num_bytes_per_GeV
+    )
+
+
+class Scratch:
+    def __init__(
+        self,
+        locations=None,
+        quota_num_bytes=None,
+        particle_output_num_bytes_per_GeV=PARTICLE_OUTPUT_NUM_BYTES_PER_GEV,
+    ):
+        """
+        Parameters
+        ----------
+        locations : list of str (default: None)
+            Directories to put temporary directories in, the preferred
+            first. Missing directories are skipped.
+            If None, default_locations() is used.
+        quota_num_bytes : int (default: None)
+            The maximum number of bytes reserved in each location by all
+            runs on the node. If None, only the free space of the
+            location's file-system is the limit.
+        particle_output_num_bytes_per_GeV : float
+            Size of CORSIKA's particle-output per GeV of primary energy.
+            Calibrate this for the observation-level and energy-cuts of
+            the runs. See estimate_footprint_num_bytes.
+        """
+        if locations is None:
+            locations = default_locations()
+        self.locations = [os.path.abspath(loc) for loc in locations]
+        self.quota_num_bytes = quota_num_bytes
+        self.particle_output_num_bytes_per_GeV = float(
+            particle_output_num_bytes_per_GeV
+        )
+
+    def _capacity(self, location):
+        total_num_bytes = shutil.disk_usage(location).total
+        if self.quota_num_bytes is None:
+            return total_num_bytes
+        return min([total_num_bytes, self.quota_num_bytes])
+
+    def _available(self, location, ledger):
+        # The reserved runs may have written parts of their reservations
+        # already. These parts are already missing in the free space.
+        reserved_num_bytes = 0
+        unwritten_num_bytes = 0
+        for token in ledger:
+            num_bytes = ledger[token]["num_bytes"]
+            written_num_bytes = num_bytes_written(ledger[token].get("path"))
+            reserved_num_bytes += num_bytes
+            unwritten_num_bytes += max([0, num_bytes - written_num_bytes])
+
+        available = shutil.disk_usage(location).free - unwritten_num_bytes
+        if self.quota_num_bytes is not None:
+            available = min(
+                [available, self.quota_num_bytes - reserved_num_bytes]
+            )
+        return available
+
+    def try_reserve(self, num_bytes):
+        """
+        Returns a Reservation in the first location with num_bytes
+        available, or None.
+        Raises a RuntimeError when no location could ever hold num_bytes.
+        """
+        num_bytes = int(num_bytes)
+        can_ever = False
+        for location in self.locations:
+            if not os.path.isdir(location):
+                continue
+            if num_bytes > self._capacity(location):
+                continue
+            can_ever = True
+
+            with _LockedLedger(location=location) as ledger:
+                if self._available(location, ledger.entries) >= num_bytes:
+                    token = ledger.add(num_bytes=num_bytes)
+                    return Reservation(
+                        location=location, token=token, num_bytes=num_bytes
+                    )
+
+        if not can_ever:
+            raise RuntimeError(
+                "No location in {:s} can hold {:d} bytes.".format(
+                    str(self.locations), num_bytes
+                )
+            )
+        return None
+
+    def reserve(self, num_bytes, timeout_s=None, poll_interval_s=1.0):
+        """
+        Returns a Reservation of num_bytes. Waits until other runs released
+        enough space. Raises a TimeoutError after timeout_s.
+        """
+        start = time.monotonic()
+        while True:
+            reservation = self.try_reserve(num_bytes=num_bytes)
+            if reservation is not None:
+                return reservation
+            if timeout_s is not None:
+                if time.monotonic() - start > timeout_s:
+                    raise TimeoutError(
+                        "Waited {:.1f}s for {:d} bytes of scratch.".format(
+                            timeout_s, num_bytes
+                        )
+                    )
+            time.sleep(poll_interval_s)
+
+    def reserve_run(
+        self,
+        steering_dict,
+        corsika_run_dir,
+        run_dir_mode,
+        particle_output_in_scratch=True,
+        **kwargs
+    ):
+        """
+        Returns a Reservation for the estimated footprint of a run.
+        If not particle_output_in_scratch, e.g. when the particle-output is
+        written elsewhere, no space is reserved for it.
+        See reserve() for kwargs.
+        """
+        num_bytes = estimate_footprint_num_bytes(
+            steering_dict=steering_dict,
+            run_dir_num_bytes=estimate_run_dir_num_bytes(
+                corsika_run_dir=corsika_run_dir, run_dir_mode=run_dir_mode
+            ),
+            particle_output_num_bytes_per_GeV=(
+                self.particle_output_num_bytes_per_GeV
+                if particle_output_in_scratch
+                else 0.0
+            ),
+        )
+        return self.reserve(num_bytes=num_bytes, **kwargs)
+
+    @contextlib.contextmanager
+    def temporary_directory(self, reservation, prefix="corsika_primary_"):
+        """
+        Yields the path of a temporary directory in the reservation's
+        location. Releases the reservation on exit.
+        """
+        try:
+            with tempfile.TemporaryDirectory(
+                prefix=prefix, dir=reservation.location
+            ) as tmp_dir:
+                reservation.set_path(tmp_dir)
+                yield tmp_dir
+        finally:
+            reservation.release()
+
+    def __repr__(self):
+        out = "{:s}(locations={:s})".format(
+            self.__class__.__name__, str(self.locations)
+        )
+        return out
+
+
+class Reservation:
+    def __init__(self, location, token, num_bytes):
+        self.location = location
+        self.token = token
+        self.num_bytes = num_bytes
+        self.released = False
+
+    def set_path(self, path):
+        """
+        Sets the directory where the reservation is written to. Its size
+        is taken as the written part of the reservation.
+        """
+        with _LockedLedger(location=self.location) as ledger:
+            ledger.set_path(token=self.token, path=path)
+
+    def release(self):
+        if self.released:
+            return
+        with _LockedLedger(location=self.location) as ledger:
+            ledger.remove(token=self.token)
+        self.released = True
+
+    def __repr__(self):
+        out = "{:s}(location='{:s}', num_bytes={:d})".format(
+            self.__class__.__name__, self.location, self.num_bytes
+        )
+        return out
+
+
+class _LockedLedger:
+    """
+    The reservations in a location. The ledger is a json-file next to the
+    temporary directories. It is locked while it is read and written.
+    Reservations of processes which are gone are dropped.
+    """
+
+    def __init__(self, location):
+        self.path = os.path.join(location, LEDGER_FILENAME)
+
+    def __enter__(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        self.file = os.fdopen(fd, "r+")
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        txt = self.file.read()
+        self.entries = json.loads(txt) if txt else {}
+        for token in list(self.entries.keys()):
+            if not _pid_exists(self.entries[token]["pid"]):
+                self.entries.pop(token)
+        return self
+
+    def add(self, num_bytes):
+        token = "{:d}.{:d}".format(os.getpid(), time.monotonic_ns())
+        self.entries[token] = {"pid": os.getpid(), "num_bytes": num_bytes}
+        return token
+
+    def set_path(self, token, path):
+        self.entries[token]["path"] = path
+
+    def remove(self, token):
+        self.entries.pop(token, None)
+
+    def __exit__(self, type, value, traceback):
+        self.file.seek(0)
+        self.file.truncate()
+        self.file.write(json.dumps(self.entries))
+        self.file.flush()
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def num_bytes_written(path):
+    """
+    Returns the size of the regular files in the directory path.
+    Symbolic links are not followed. Returns 0 when path is None.
+    """
+    if path is None:
+        return 0
+    num_bytes = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                st = os.lstat(os.path.join(dirpath, filename))
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                num_bytes += st.st_size
+    return num_bytes
+
+
+def _pid_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import corsika_primary as cpw
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="corsika_primary_benchmark_event_tape_writer.py",
+        description=(
+            "Measure the throughput of the CherenkovEventTapeWriter "
+            "for one large event. "
+            "The event needs num_bunches * 32 bytes of memory and of disk."
+        ),
+    )
+    parser.add_argument(
+        "--num_bunches",
+        metavar="INT",
+        type=float,
+        default=1e8,
+        help="number of bunches in the event. Default is 1e8.",
+    )
+    parser.add_argument(
+        "--buffer_capacity",
+        metavar="INT",
+        type=int,
+        default=cpw.cherenkov.NUM_CHERENKOV_BUNCHES_IN_BUFFER,
+        help="buffer-capacity of the writer in bunches.",
+    )
+    parser.add_argument(
+        "--num_buffers",
+        metavar="INT",
+        type=int,
+        default=1,
+        help="number of buffers of the writer.",
+    )
+    parser.add_argument(
+        "--suffix",
+        type=str,
+        default=".tar",
+        help="suffix of the tape, e.g. '.tar' or '.bgz.tar'.",
+    )
+    parser.add_argument(
+        "--dir",
+        metavar="PATH",
+        type=str,
+        default=None,
+        help="directory to write the tape to. Default is a temporary one.",
+    )
+    args = parser.parse_args()
+
+    num_bunches = int(args.num_bunches)
+    prng = np.random.Generator(np.random.PCG64(1))
+    bunches = prng.uniform(size=(num_bunches, 8)).astype(np.float32)
+
+    runh = np.zeros(273, dtype=np.float32)
+    runh[cpw.I.RUNH.MARKER] = cpw.I.RUNH.MARKER_FLOAT32
+    runh[cpw.I.RUNH.RUN_NUMBER] = 1
+    evth = np.zeros(273, dtype=np.float32)
+    evth[cpw.I.EVTH.MARKER] = cpw.I.EVTH.MARKER_FLOAT32
+    evth[cpw.I.EVTH.RUN_NUMBER] = 1
+    evth[cpw.I.EVTH.EVENT_NUMBER] = 1
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, "run" + args.suffix)
+        start = time.perf_counter()
+        with cpw.cherenkov.CherenkovEventTapeWriter(
+            path=path,
+            buffer_capacity=args.buffer_capacity,
+            num_buffers=args.num_buffers,
+        ) as tape:
+            tape.write_runh(runh)
+            tape.write_evth(evth)
+            tape.write_payload(bunches)
+        duration = time.perf_counter() - start
+
+    num_bytes = bunches.nbytes
+    print(
+        "{:d} bunches, {:.1f}MB in {:.3f}s, {:.1f}MB/s".format(
+            num_bunches,
+            num_bytes * 1e-6,
+            duration,
+            num_bytes * 1e-6 / duration,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
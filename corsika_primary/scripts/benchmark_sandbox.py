@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import argparse
+import os
+import tempfile
+import time
+import corsika_primary as cpw
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="corsika_primary_benchmark_sandbox.py",
+        description=(
+            "Measure the time to the first EVTH of a CorsikaPrimary run "
+            "for each mode of populating the temporary run-directory. "
+            "CORSIKA's run-directory is staged first, see sandbox.stage."
+        ),
+    )
+    parser.add_argument(
+        "--corsika_path",
+        metavar="PATH",
+        type=str,
+        default=None,
+        help=(
+            "path to CORSIKA-primary's executable. "
+            "Default is the one in ~/.corsika_primary.json."
+        ),
+    )
+    parser.add_argument(
+        "--dir",
+        metavar="PATH",
+        type=str,
+        default=None,
+        help="directory to stage and run in. Default is a temporary one.",
+    )
+    args = parser.parse_args()
+
+    corsika_path = args.corsika_path
+    if corsika_path is None:
+        corsika_path = cpw.configfile.read()["corsika_primary"]
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        staged_corsika_path = cpw.sandbox.stage(
+            corsika_path=corsika_path,
+            stage_dir=os.path.join(tmp, "stage"),
+        )
+        for mode in cpw.sandbox.MODES:
+            run_path = os.path.join(tmp, mode)
+            start = time.perf_counter()
+            with cpw.CorsikaPrimary(
+                corsika_path=staged_corsika_path,
+                steering_dict=cpw.steering.EXAMPLE,
+                stdout_path=run_path + ".o",
+                stderr_path=run_path + ".e",
+                particle_output_path=run_path + ".par.dat",
+                run_dir_mode=mode,
+            ) as run:
+                evth, cer_reader = next(run)
+                duration = time.perf_counter() - start
+                for event in run:
+                    pass
+            print(
+                "time to first EVTH, {:>10s}: {:.3f}s".format(mode, duration)
+            )
+
+
+if __name__ == "__main__":
+    main()
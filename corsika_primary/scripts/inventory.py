@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+import argparse
+import glob
+import os
+import corsika_primary as cpw
+
+
+def find_tapes(paths):
+    tapes = []
+    for path in paths:
+        if os.path.isdir(path):
+            for suffix in [".tar", ".tar.gz"]:
+                tapes += glob.glob(os.path.join(path, "*" + suffix))
+        else:
+            tapes.append(path)
+    return sorted(tapes)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="corsika_primary_inventory.py",
+        description=(
+            "Print the number of events, payload-blocks, rows, and bytes "
+            "of event-tapes. Only the headers of the tar are read, "
+            "the payload is not decoded."
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        metavar="PATH",
+        type=str,
+        nargs="+",
+        help="event-tapes, or directories with event-tapes.",
+    )
+    parser.add_argument(
+        "--payload",
+        choices=["cherenkov", "particles"],
+        default="cherenkov",
+        help="the kind of payload in the tapes. Default is cherenkov.",
+    )
+    parser.add_argument(
+        "--events",
+        action="store_true",
+        help="also print a line for each event.",
+    )
+    parser.add_argument(
+        "--num_workers",
+        metavar="INT",
+        type=int,
+        default=None,
+        help="number of processes. Default is the number of cpus.",
+    )
+    args = parser.parse_args()
+
+    if args.payload == "cherenkov":
+        payload_block_suffix = cpw.cherenkov.CHERENKOV_SUFFIX
+        payload_shape_1 = 8
+    else:
+        payload_block_suffix = cpw.particles.PARTICLE_SUFFIX
+        payload_shape_1 = 7
+
+    inventories = cpw.event_tape_tools.inventory_many(
+        paths=find_tapes(args.paths),
+        payload_block_suffix=payload_block_suffix,
+        payload_shape_1=payload_shape_1,
+        num_workers=args.num_workers,
+    )
+
+    print("path, num_events, num_blocks, num_rows, num_bytes")
+    for path in inventories:
+        inv = inventories[path]
+        print(
+            "{:s}, {:d}, {:d}, {:d}, {:d}".format(
+                path,
+                len(inv),
+                int(inv.num_blocks.sum()),
+                int(inv.num_rows.sum()),
+                int(inv.num_bytes.sum()),
+            )
+        )
+        if args.events:
+            for event in inv:
+                print(
+                    "    run {:d}, event {:d}, {:d}, {:d}, {:d}".format(
+                        int(event.run_number),
+                        int(event.event_number),
+                        int(event.num_blocks),
+                        int(event.num_rows),
+                        int(event.num_bytes),
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+import argparse
+import corsika_primary as cpw
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="corsika_primary_make_toc.py",
+        description=(
+            "(Re)build the table-of-contents of uncompressed event-tapes "
+            "for random access to their events. "
+            "The toc is written next to the tape. "
+            "Only for tapes with a single run."
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        metavar="PATH",
+        type=str,
+        nargs="+",
+        help="event-tapes.",
+    )
+    parser.add_argument(
+        "--payload",
+        choices=["cherenkov", "particles"],
+        default="cherenkov",
+        help="the kind of payload in the tapes. Default is cherenkov.",
+    )
+    args = parser.parse_args()
+
+    if args.payload == "cherenkov":
+        payload_block_suffix = cpw.cherenkov.CHERENKOV_SUFFIX
+    else:
+        payload_block_suffix = cpw.particles.PARTICLE_SUFFIX
+
+    for path in args.paths:
+        try:
+            toc = cpw.event_tape.make_toc(
+                path=path, payload_block_suffix=payload_block_suffix
+            )
+        except AssertionError as err:
+            # e.g. a tape with many runs.
+            parser.exit(status=1, message="{:s}\n".format(str(err)))
+        cpw.event_tape.write_toc(path=cpw.event_tape.toc_path(path), toc=toc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+import argparse
+import corsika_primary as cpw
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="corsika_primary_server.py",
+        description=(
+            "Serve runs of CORSIKA-primary on a unix-socket. "
+            "Keeps workers with their run-directory prepared and "
+            "CORSIKA already spawned. CORSIKA still reads its tables "
+            "after the request. "
+            "Submit runs with corsika_primary.server.submit()."
+        ),
+    )
+    parser.add_argument(
+        "socket_path",
+        metavar="PATH",
+        type=str,
+        help="unix-socket to listen on.",
+    )
+    parser.add_argument(
+        "--num_workers",
+        metavar="INT",
+        type=int,
+        help="number of workers. Default is the number of cpus.",
+    )
+    parser.add_argument(
+        "--corsika_path",
+        metavar="PATH",
+        type=str,
+        help="CORSIKA-primary's executable. Default is in the configfile.",
+    )
+    parser.add_argument(
+        "--run_dir_mode",
+        metavar="STRING",
+        type=str,
+        default="hardlink",
+        help="one of 'copy', 'hardlink', 'symlink'.",
+    )
+
+    args = parser.parse_args()
+
+    with cpw.server.Server(
+        socket_path=args.socket_path,
+        num_workers=args.num_workers,
+        corsika_path=args.corsika_path,
+        run_dir_mode=args.run_dir_mode,
+    ) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+A local job-server with CORSIKA-primary workers.
+
+Each worker prepares its temporary run-directory and spawns CORSIKA ahead of
+time. The spawned CORSIKA waits for its steering-card on std-in. A request
+only has to write the steering-card and the primaries to start the run.
+After each run, the worker prepares its next CORSIKA in the background.
+
+This only saves the preparation of the run-directory and the start of the
+process. CORSIKA reads its hadronic tables and initializes its models only
+after it has read the steering-card, i.e. after the request. So each run
+still takes CORSIKA's full initialization.
+
+The server listens on a unix-socket. Every message is a frame of a uint64
+size followed by size bytes.
+
+Request:
+    One frame with the binary steering, see steering.steering_dict_to_bytes.
+
+Response:
+    Frames with the bytes of the Cherenkov event-tape while it is written,
+    terminated by an empty frame.
+    One frame with the bytes of the particle-output.
+    One frame with the json-status of the run.
+"""
+
+import os
+import io
+import json
+import queue
+import select
+import shutil
+import socket
+import struct
+import socketserver
+import subprocess
+import tempfile
+from . import configfile
+from . import particles
+from . import parallel
+from . import sandbox
+from . import steering
+
+FRAME_SIZE_FORMAT = "<Q"
+FRAME_SIZE_NUM_BYTES = struct.calcsize(FRAME_SIZE_FORMAT)
+CHUNK_NUM_BYTES = 2**20
+
+
+def send_frame(sock, payload):
+    sock.sendall(struct.pack(FRAME_SIZE_FORMAT, len(payload)))
+    if len(payload) > 0:
+        sock.sendall(payload)
+
+
+def recv_frame(sock):
+    size_bytes = _recv_exactly(sock=sock, size=FRAME_SIZE_NUM_BYTES)
+    (size,) = struct.unpack(FRAME_SIZE_FORMAT, size_bytes)
+    return _recv_exactly(sock=sock, size=size)
+
+
+def _recv_exactly(sock, size):
+    buff = io.BytesIO()
+    num_received = 0
+    while num_received < size:
+        chunk = sock.recv(min([size - num_received, CHUNK_NUM_BYTES]))
+        if len(chunk) == 0:
+            raise EOFError("Connection closed before frame was complete.")
+        buff.write(chunk)
+        num_received += len(chunk)
+    return buff.getvalue()
+
+
+class Worker:
+    def __init__(
+        self,
+        corsika_path,
+        tmp_dir_prefix="corsika_primary_worker_",
+        run_dir_mode="hardlink",
+    ):
+        """
+        A CORSIKA-primary with the temporary run-directory prepared and
+        CORSIKA spawned before the next run is requested. CORSIKA's tables
+        are not read before the request, see the module's docstring.
+
+        Parameters
+        ----------
+        corsika_path : str
+            Path to corsika's executable in its 'run' directory.
+        tmp_dir_prefix : str
+            Prefix of the worker's temporary directories.
+        run_dir_mode : str (default: 'hardlink')
+            See sandbox.make_run_dir.
+        """
+        self.corsika_path = os.path.abspath(corsika_path)
+        self.corsika_run_dir = os.path.dirname(self.corsika_path)
+        self.tmp_dir_prefix = str(tmp_dir_prefix)
+        self.run_dir_mode = str(run_dir_mode)
+        self.num_runs = 0
+        self.tmp_dir_handle = None
+        self.prepare()
+
+    def prepare(self):
+        """
+        Prepares a fresh temporary run-directory and spawns CORSIKA which
+        then waits for its steering-card.
+        """
+        op = os.path
+        self.tmp_dir_handle = tempfile.TemporaryDirectory(
+            prefix=self.tmp_dir_prefix
+        )
+        self.tmp_dir = self.tmp_dir_handle.name
+
+        self.cer_fifo_path = op.join(self.tmp_dir, "cer_fifo.tar")
+        os.mkfifo(self.cer_fifo_path)
+
+        self.tmp_corsika_run_dir = op.join(self.tmp_dir, "run")
+        sandbox.make_run_dir(
+            src_run_dir=self.corsika_run_dir,
+            dst_run_dir=self.tmp_corsika_run_dir,
+            mode=self.run_dir_mode,
+        )
+        self.tmp_corsika_path = op.join(
+            self.tmp_corsika_run_dir, op.basename(self.corsika_path)
+        )
+        self.primary_path = op.join(
+            self.tmp_corsika_run_dir,
+            steering.PRIMARY_BYTES_FILENAME_IN_CORSIKA_RUN_DIR,
+        )
+
+        self.stdout_path = op.join(self.tmp_dir, "stdout.txt")
+        self.stderr_path = op.join(self.tmp_dir, "stderr.txt")
+        self.stdout = open(self.stdout_path, "w")
+        self.stderr = open(self.stderr_path, "w")
+        self.corsika_process = subprocess.Popen(
+            self.tmp_corsika_path,
+            stdout=self.stdout,
+            stderr=self.stderr,
+            stdin=subprocess.PIPE,
+            cwd=self.tmp_corsika_run_dir,
+        )
+
+    def run(self, steering_dict, cherenkov_chunk_callback):
+        """
+        Runs CORSIKA on the steering_dict.
+
+        Parameters
+        ----------
+        steering_dict : dict
+            The steering for the run and for each primary particle.
+        cherenkov_chunk_callback : function(bytes)
+            Is called with every chunk of the Cherenkov event-tape while
+            CORSIKA writes it.
+
+        Returns
+        -------
+        (particle_bytes, status) : (bytes, dict)
+            The bytes of the particle-output, and the status with the
+            'returncode', the 'end_of_run', and the 'stderr'.
+        """
+        steering.assert_values(steering_dict=steering_dict)
+        steering_card = steering.make_steering_card_str(
+            steering_dict=steering_dict,
+            output_path=self.cer_fifo_path,
+            parout_direct=self.tmp_dir,
+        )
+        with open(self.primary_path, "wb") as f:
+            f.write(
+                steering.primary_dicts_to_bytes(steering_dict["primaries"])
+            )
+
+        self.corsika_process.stdin.write(str.encode(steering_card))
+        self.corsika_process.stdin.flush()
+        self.corsika_process.stdin.close()
+
+        self._read_cherenkov_fifo(callback=cherenkov_chunk_callback)
+
+        returncode = self.corsika_process.wait()
+        self.stdout.close()
+        self.stderr.close()
+
+        particle_path = os.path.join(
+            self.tmp_dir,
+            particles.dat.DAT_FILE_TEMPLATE.format(
+                runnr=steering_dict["run"]["run_id"]
+            ),
+        )
+        particle_bytes = b""
+        if os.path.exists(particle_path):
+            with open(particle_path, "rb") as f:
+                particle_bytes = f.read()
+
+        with open(self.stderr_path, "rt") as f:
+            stderr = f.read()
+        status = {
+            "returncode": returncode,
+            "end_of_run": parallel.stdout_file_ends_with_end_of_run_marker(
+                path=self.stdout_path
+            ),
+            "stderr": stderr,
+        }
+        self.num_runs += 1
+        return particle_bytes, status
+
+    def _read_cherenkov_fifo(self, callback):
+        # Opening the FIFO non-blocking does not wait for CORSIKA.
+        # The FIFO is only readable after CORSIKA opened it. This way a
+        # CORSIKA which dies before it opens the FIFO can not block us.
+        fd = os.open(self.cer_fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            while True:
+                readable, _, _ = select.select([fd], [], [], 1.0)
+                if not readable:
+                    if self.corsika_process.poll() is not None:
+                        break
+                    continue
+                chunk = os.read(fd, CHUNK_NUM_BYTES)
+                if len(chunk) == 0:
+                    break
+                callback(chunk)
+        finally:
+            os.close(fd)
+
+    def recycle(self):
+        """
+        Removes the last run's temporary directory and prepares the next.
+        """
+        self.close()
+        self.prepare()
+
+    def close(self):
+        if self.corsika_process.poll() is None:
+            self.corsika_process.kill()
+            self.corsika_process.wait()
+        for f in [self.stdout, self.stderr]:
+            if not f.closed:
+                f.close()
+        self.tmp_dir_handle.cleanup()
+
+    def __repr__(self):
+        out = "{:s}(path='{:s}', tmp_dir='{:s}')".format(
+            self.__class__.__name__, self.corsika_path, self.tmp_dir
+        )
+        return out
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            steering_bytes = recv_frame(sock=self.request)
+        except EOFError:
+            return
+        steering_dict = steering.steering_bytes_to_dict(steering_bytes)
+
+        worker = self.server.idle_workers.get()
+        try:
+            particle_bytes, status = worker.run(
+                steering_dict=steering_dict,
+                cherenkov_chunk_callback=lambda chunk: send_frame(
+                    sock=self.request, payload=chunk
+                ),
+            )
+            send_frame(sock=self.request, payload=b"")
+            send_frame(sock=self.request, payload=particle_bytes)
+            send_frame(
+                sock=self.request, payload=str.encode(json.dumps(status))
+            )
+        finally:
+            worker.recycle()
+            self.server.idle_workers.put(worker)
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path,
+        num_workers=None,
+        corsika_path=None,
+        run_dir_mode="hardlink",
+    ):
+        """
+        Serves runs of CORSIKA-primary on a unix-socket.
+
+        with Server(socket_path="/tmp/corsika.sock") as server:
+            server.serve_forever()
+
+        Parameters
+        ----------
+        socket_path : str
+            Path of the unix-socket to listen on.
+        num_workers : int (default: None)
+            Number of workers. If None, os.cpu_count() is used.
+        corsika_path : str (default: None)
+            Path to corsika's executable in its 'run' directory.
+            If None, the path is looked up in the user's configfile
+            ~/.corsika_primary.json
+            Stage the 'run' directory (see sandbox.stage) on node-local
+            disk for the run_dir_mode 'hardlink'.
+        run_dir_mode : str (default: 'hardlink')
+            See sandbox.make_run_dir.
+        """
+        if corsika_path is None:
+            corsika_path = configfile.read()["corsika_primary"]
+        num_workers = num_workers if num_workers else os.cpu_count()
+        assert num_workers > 0
+
+        self.socket_path = os.path.abspath(socket_path)
+        self.idle_workers = queue.Queue()
+        self.workers = []
+        for i in range(num_workers):
+            worker = Worker(
+                corsika_path=corsika_path,
+                tmp_dir_prefix="corsika_primary_worker_{:03d}_".format(i),
+                run_dir_mode=run_dir_mode,
+            )
+            self.workers.append(worker)
+            self.idle_workers.put(worker)
+
+        socketserver.ThreadingUnixStreamServer.__init__(
+            self, self.socket_path, _RequestHandler
+        )
+
+    def server_close(self):
+        socketserver.ThreadingUnixStreamServer.server_close(self)
+        for worker in self.workers:
+            worker.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def submit(
+    socket_path,
+    steering_dict,
+    cherenkov_output_path,
+    particle_output_path,
+):
+    """
+    Submits a run to the server and writes its output.
+    Blocks until the run is done.
+
+    Parameters
+    ----------
+    socket_path : str
+        Path of the server's unix-socket.
+    steering_dict : dict
+        The steering for the run and for each primary particle.
+    cherenkov_output_path : str
+        Path to write the Cherenkov event-tape to.
+    particle_output_path : str
+        Path to write the particle output to.
+
+    Returns
+    -------
+    status : dict
+        With the 'returncode', the 'end_of_run', and the 'stderr'.
+    """
+    steering_bytes = steering.steering_dict_to_bytes(steering_dict)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        send_frame(sock=sock, payload=steering_bytes)
+
+        with open(cherenkov_output_path + ".tmp", "wb") as f:
+            while True:
+                chunk = recv_frame(sock=sock)
+                if len(chunk) == 0:
+                    break
+                f.write(chunk)
+        shutil.move(cherenkov_output_path + ".tmp", cherenkov_output_path)
+
+        with open(particle_output_path, "wb") as f:
+            f.write(recv_frame(sock=sock))
+
+        status = json.loads(recv_frame(sock=sock).decode())
+    return status
@@ -0,0 +1,310 @@
+"""
+Split one large run into shards which run in parallel, and merge their
+outputs back into one run.
+
+Each shard is a run of its own with a contiguous slice of the primaries.
+Its event_id_of_first_event is the id the slice's first event has in the
+large run, so the events keep their ids. Each shard gets its own
+random_seed derived from the large run's random_seed and the shard's index.
+The events are not the same as in a serial run, but each event's
+random-state is in its EVTH and every shard is reproducible.
+When a shard fails, the CORSIKA of all other shards is killed and no
+merged output is left behind.
+"""
+
+import copy
+import os
+import signal
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+from . import I
+from . import cherenkov
+from . import particles
+from . import parallel
+from . import random
+
+
+def make_shard_random_seed(random_seed, shard_index):
+    """
+    Returns the random_seed of shard shard_index derived from the
+    random_seed of the large run.
+    """
+    entropy = [int(seq["SEED"]) for seq in random_seed]
+    entropy += [int(seq["CALLS"]) for seq in random_seed]
+    entropy += [int(seq["BILLIONS"]) for seq in random_seed]
+    entropy += [int(shard_index)]
+    prng = np.random.Generator(np.random.PCG64(entropy))
+    seed = prng.integers(
+        low=random.seed.MIN_SEED,
+        high=random.seed.MAX_SEED - random.seed.NUM_RANDOM_SEQUENCES + 1,
+        endpoint=True,
+    )
+    return random.seed.make_simple_seed(seed=int(seed))
+
+
+def split(steering_dict, num_shards):
+    """
+    Returns the steering_dicts of the shards. The primaries are split into
+    contiguous slices of about the same sum of energy.
+
+    Parameters
+    ----------
+    steering_dict : dict
+        The steering for the large run.
+    num_shards : int
+        The maximum number of shards. There are no empty shards.
+    """
+    assert num_shards >= 1
+    primaries = steering_dict["primaries"]
+    num_shards = min([num_shards, len(primaries)])
+    if num_shards == 0:
+        return [copy.deepcopy(steering_dict)]
+
+    energies = np.array([float(p["energy_GeV"]) for p in primaries])
+    cumsum = np.cumsum(energies)
+    targets = cumsum[-1] * np.arange(1, num_shards) / num_shards
+    stops = list(np.searchsorted(cumsum, targets, side="right"))
+    boundaries = [0]
+    for stop in stops + [len(primaries)]:
+        # every shard has at least one primary
+        stop = max([stop, boundaries[-1] + 1])
+        stop = min([stop, len(primaries) - (num_shards - len(boundaries))])
+        boundaries.append(int(stop))
+
+    first = int(steering_dict["run"]["event_id_of_first_event"])
+    shards = []
+    for shard_index in range(num_shards):
+        start = boundaries[shard_index]
+        stop = boundaries[shard_index + 1]
+        shard = {"run": copy.deepcopy(steering_dict["run"])}
+        shard["run"]["event_id_of_first_event"] = np.int64(first + start)
+        shard["run"]["random_seed"] = make_shard_random_seed(
+            random_seed=steering_dict["run"]["random_seed"],
+            shard_index=shard_index,
+        )
+        shard["primaries"] = copy.deepcopy(primaries[start:stop])
+        shards.append(shard)
+    return shards
+
+
+def run(
+    steering_dict,
+    cherenkov_output_path,
+    particle_output_path,
+    num_shards=None,
+    tmp_dir_prefix="corsika_primary_",
+    corsika_path=None,
+    **kwargs,
+):
+    """
+    Runs the large run in shards in parallel and merges the outputs in
+    order of the events while the shards finish.
+
+    Parameters
+    ----------
+    steering_dict : dict
+        The steering for the run and for each primary particle.
+    cherenkov_output_path : str
+        Path to write the merged Cherenkov event-tape to.
+    particle_output_path : str
+        Path to write the merged particle event-tape to.
+        This is a ParticleEventTape, not CORSIKA's DAT-file.
+    num_shards : int (default: None)
+        If None, os.cpu_count() is used.
+    corsika_path : str (default: None)
+        Path to corsika's executable in its 'run' directory.
+    kwargs : dict
+        Passed on to corsika_primary.corsika_primary.
+
+    Returns
+    -------
+    results : list
+        The result of each shard, see parallel.run_job.
+        The std-out and std-error of all shards are written to
+        cherenkov_output_path + '.stdout' and '.stderr'.
+    """
+    num_shards = num_shards if num_shards else os.cpu_count()
+    shards = split(steering_dict=steering_dict, num_shards=num_shards)
+
+    with tempfile.TemporaryDirectory(prefix=tmp_dir_prefix) as tmp_dir:
+        jobs = []
+        for shard_index, shard in enumerate(shards):
+            job = {
+                "run_id": shard_index,
+                "steering_dict": shard,
+                "corsika_path": corsika_path,
+                "kwargs": kwargs,
+            }
+            job.update(
+                parallel.make_output_paths(out_dir=tmp_dir, run_id=shard_index)
+            )
+            jobs.append(job)
+
+        merger = Merger(
+            cherenkov_output_path=cherenkov_output_path,
+            particle_output_path=particle_output_path,
+        )
+        results = []
+        other_children = {p.pid for p in multiprocessing.active_children()}
+        with multiprocessing.Pool(
+            processes=len(jobs), initializer=_start_own_process_group
+        ) as pool:
+            workers = [
+                p.pid
+                for p in multiprocessing.active_children()
+                if p.pid not in other_children
+            ]
+            try:
+                # imap yields the shards in order while they finish.
+                for result in pool.imap(parallel.run_job, jobs, chunksize=1):
+                    results.append(result)
+                    merger.append_logs(
+                        stdout_path=result["stdout_path"],
+                        stderr_path=result["stderr_path"],
+                    )
+                    if result["error"] is not None or not result["end_of_run"]:
+                        raise RuntimeError(
+                            "Shard {:d} failed: {:s}".format(
+                                result["run_id"], str(result["error"])
+                            )
+                        )
+                    merger.append(
+                        cherenkov_path=result["cherenkov_output_path"],
+                        particle_dat_path=result["particle_output_path"],
+                    )
+            except BaseException:
+                # Terminating the pool alone leaves CORSIKA running. Its
+                # process-group outlives the terminated worker.
+                pool.terminate()
+                kill_process_groups(pids=workers)
+                merger.abort()
+                raise
+        merger.close()
+    return results
+
+
+def _start_own_process_group():
+    # The worker's CORSIKA inherits the worker's process-group. So both
+    # are killed at once, see kill_process_groups.
+    os.setpgrp()
+
+
+def kill_process_groups(pids):
+    """
+    Kills the process-groups started by the processes in pids, i.e. the
+    workers of the pool and their CORSIKA children. A group exists as long
+    as one of its processes runs, even when the worker is gone.
+    """
+    for pid in pids:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # Nothing runs in the group anymore, or the worker did not
+            # start its own group and thus had no CORSIKA running.
+            pass
+
+
+def partial_path(path):
+    """
+    Returns the path the output is written to until it is complete.
+    The suffix stays the same, it defines the kind of compression.
+    """
+    dirname, basename = os.path.split(str(path))
+    return os.path.join(dirname, ".partial_" + basename)
+
+
+class Merger:
+    def __init__(self, cherenkov_output_path, particle_output_path):
+        """
+        Appends the outputs of the shards in order to one Cherenkov
+        event-tape and one particle event-tape. Asserts that the event ids
+        continue without gaps. The tapes are written to partial_path() and
+        only get their final paths on close().
+        """
+        self.cherenkov_output_path = str(cherenkov_output_path)
+        self.particle_output_path = str(particle_output_path)
+        self.cherenkov_tape = cherenkov.CherenkovEventTapeWriter(
+            path=partial_path(self.cherenkov_output_path)
+        )
+        self.particle_tape = particles.ParticleEventTapeWriter(
+            path=partial_path(self.particle_output_path)
+        )
+        self.has_runh = False
+        self.next_event_number = None
+        for suffix in [".stdout", ".stderr"]:
+            with open(self.cherenkov_output_path + suffix, "wb"):
+                pass
+
+    def append(self, cherenkov_path, particle_dat_path):
+        cer_event_numbers = []
+        with cherenkov.CherenkovEventTapeReader(cherenkov_path) as cer_run:
+            if not self.has_runh:
+                self.cherenkov_tape.write_runh(cer_run.runh)
+            for evth, cer_reader in cer_run:
+                event_number = int(evth[I.EVTH.EVENT_NUMBER])
+                self._assert_next_event_number(event_number)
+                cer_event_numbers.append(event_number)
+                self.cherenkov_tape.write_evth(evth)
+                for cer_block in cer_reader:
+                    self.cherenkov_tape.write_payload(cer_block)
+
+        par_event_numbers = []
+        with open(particle_dat_path, "rb") as f:
+            with particles.dat.RunReader(f) as par_run:
+                if not self.has_runh:
+                    self.particle_tape.write_runh(par_run.runh)
+                for evth, par_reader in par_run:
+                    par_event_numbers.append(int(evth[I.EVTH.EVENT_NUMBER]))
+                    self.particle_tape.write_evth(evth)
+                    for par_block in par_reader:
+                        self.particle_tape.write_payload(par_block)
+
+        assert cer_event_numbers == par_event_numbers
+        self.has_runh = True
+
+    def _assert_next_event_number(self, event_number):
+        if self.next_event_number is not None:
+            assert (
+                event_number == self.next_event_number
+            ), "Expected event {:d}, but got {:d}.".format(
+                self.next_event_number, event_number
+            )
+        self.next_event_number = event_number + 1
+
+    def append_logs(self, stdout_path, stderr_path):
+        for src, suffix in [
+            (stdout_path, ".stdout"),
+            (stderr_path, ".stderr"),
+        ]:
+            if os.path.exists(src):
+                with open(src, "rb") as fin, open(
+                    self.cherenkov_output_path + suffix, "ab"
+                ) as fout:
+                    shutil.copyfileobj(fin, fout)
+
+    def close(self):
+        self.cherenkov_tape.close()
+        self.particle_tape.close()
+        for path in [self.cherenkov_output_path, self.particle_output_path]:
+            os.replace(partial_path(path), path)
+
+    def abort(self):
+        """
+        Removes the partial tapes. The logs stay.
+        """
+        for tape in [self.cherenkov_tape, self.particle_tape]:
+            try:
+                tape.close()
+            except Exception:
+                pass
+        for path in [self.cherenkov_output_path, self.particle_output_path]:
+            if os.path.exists(partial_path(path)):
+                os.remove(partial_path(path))
+
+    def __repr__(self):
+        out = "{:s}(path='{:s}')".format(
+            self.__class__.__name__, self.cherenkov_output_path
+        )
+        return out
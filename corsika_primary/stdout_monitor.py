@@ -0,0 +1,202 @@
+"""
+Parse CORSIKA's std-out while CORSIKA writes it.
+
+The std-out of long runs can be large. Instead of reading it again after the
+run, the StdoutMonitor parses it line by line as it is fed and only keeps
+what it extracts.
+"""
+
+import codecs
+import os
+import threading
+import numpy as np
+from . import random
+
+RANDOM_STATE_MARKER = " AND RANDOM NUMBER GENERATOR AT BEGIN OF EVENT :"
+NUM_BUNCHES_MARKER = " Total number of photons in shower:"
+END_OF_RUN_MARKER = (
+    " "
+    + "=========="
+    + " END OF RUN "
+    + "================================================"
+)
+
+
+class StdoutMonitor:
+    def __init__(self):
+        """
+        Extracts from CORSIKA's std-out:
+        seeds : dict
+            The random-number-generator states at the begin of the events
+            with the event_number as key.
+            CORSIKA does not print this for all events.
+        num_bunches : list
+            The number of bunches of each event.
+            CORSIKA does not print this for all events.
+        num_photons : list
+            The number of photons of each event, from the same lines as
+            num_bunches.
+        errors : list
+            The (line_number, error) of lines which could not be parsed.
+            The monitor never raises while it is fed, because it runs in
+            the StdoutTee's thread which must keep draining the std-out.
+        And whether the std-out ends with the END OF RUN marker.
+        """
+        self.seeds = {}
+        self.num_bunches = []
+        self.num_photons = []
+        self.errors = []
+        self.num_lines = 0
+        self.last_line = None
+        self._tail = ""
+        self._event_number = None
+        self._state = None
+
+    def feed(self, text):
+        """
+        Feeds the next chunk of std-out. Chunks do not need to end on a line.
+        """
+        lines = str.split(self._tail + text, "\n")
+        self._tail = lines.pop()
+        for line in lines:
+            self._parse_line_or_record_error(line)
+            self.last_line = line
+            self.num_lines += 1
+
+    def finish(self):
+        """
+        Parses the last line in case the std-out does not end with a newline.
+        """
+        if len(self._tail) > 0:
+            self._parse_line_or_record_error(self._tail)
+
+    def ends_with_end_of_run_marker(self):
+        """
+        According to CORSIKA-author Heck, this is the only sane way to check
+        whether CORSIKA has finished. See
+        testing.stdout_ends_with_end_of_run_marker.
+        """
+        if self.last_line is None:
+            return False
+        return END_OF_RUN_MARKER in self.last_line
+
+    def _parse_line_or_record_error(self, line):
+        try:
+            self._parse_line(line)
+        except Exception as err:
+            self.errors.append((self.num_lines, err))
+            self._event_number = None
+            self._state = None
+
+    def _parse_line(self, line):
+        if str.find(line, NUM_BUNCHES_MARKER) == 0:
+            num_photons, num_bunches = parse_num_photons_and_bunches_line(line)
+            self.num_photons.append(num_photons)
+            self.num_bunches.append(num_bunches)
+
+        if RANDOM_STATE_MARKER in line:
+            # A partial state of an earlier event is dropped.
+            self._state = None
+            self._event_number = int(line[49:57])
+            self._state = []
+        elif self._state is not None:
+            seq = len(self._state)
+            match = " SEQUENCE =  {:d}  SEED =".format(seq + 1)
+            if str.find(line, match) == 0:
+                self._state.append(
+                    {
+                        "SEED": np.int32(int(line[22:33])),
+                        "CALLS": np.int32(int(line[41:52])),
+                        "BILLIONS": np.int32(int(line[63:73])),
+                    }
+                )
+                if len(self._state) == random.seed.NUM_RANDOM_SEQUENCES:
+                    self.seeds[self._event_number] = self._state
+                    self._event_number = None
+                    self._state = None
+
+    def __repr__(self):
+        out = "{:s}(lines={:d}, seeds={:d}, num_bunches={:d}, errors={:d})".format(
+            self.__class__.__name__,
+            self.num_lines,
+            len(self.seeds),
+            len(self.num_bunches),
+            len(self.errors),
+        )
+        return out
+
+
+def parse_num_photons_and_bunches_line(line):
+    """
+    Returns (num_photons, num_bunches) of a line like:
+    ' Total number of photons in shower: 49768.06 in 50053.00 bunches'
+    """
+    work_line = line[len(NUM_BUNCHES_MARKER) :]
+    photons_str, bunches_str = str.split(work_line, " in ")
+    bunches_str = str.split(bunches_str)[0]
+    return float(photons_str), int(float(bunches_str))
+
+
+class StdoutTee:
+    def __init__(self, fd, path, monitor, chunk_size=2**16):
+        """
+        A background-thread reads the file-descriptor fd until its end,
+        writes everything to path, and feeds the monitor on the fly.
+
+        Parameters
+        ----------
+        fd : int
+            The reading end of CORSIKA's std-out pipe. The tee closes it.
+        path : str
+            Path to write the std-out to.
+        monitor : StdoutMonitor
+            Parses the std-out.
+        """
+        self.fd = fd
+        self.path = str(path)
+        self.monitor = monitor
+        self.chunk_size = int(chunk_size)
+        self.thread = threading.Thread(target=self._tee, daemon=True)
+        self.thread.start()
+
+    def _tee(self):
+        # Nothing in here may raise. When the thread stops to drain the
+        # pipe, CORSIKA blocks forever in its next write.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        f = self._open_or_record_error()
+        while True:
+            chunk = os.read(self.fd, self.chunk_size)
+            if len(chunk) == 0:
+                break
+            if f is not None:
+                try:
+                    f.write(chunk)
+                except Exception as err:
+                    self._record_error(err)
+                    f.close()
+                    f = None
+            try:
+                self.monitor.feed(decoder.decode(chunk))
+            except Exception as err:
+                self._record_error(err)
+        os.close(self.fd)
+        if f is not None:
+            f.close()
+        self.monitor.feed(decoder.decode(b"", final=True))
+        self.monitor.finish()
+
+    def _open_or_record_error(self):
+        try:
+            return open(self.path, "wb")
+        except Exception as err:
+            self._record_error(err)
+            return None
+
+    def _record_error(self, err):
+        self.monitor.errors.append((self.monitor.num_lines, err))
+
+    def join(self):
+        self.thread.join()
+
+    def __repr__(self):
+        return "{:s}(path='{:s}')".format(self.__class__.__name__, self.path)
@@ -73,8 +73,12 @@ def assert_values(steering_dict):
     assert run["energy_range"]["start_GeV"] <= run["energy_range"]["stop_GeV"]
 
     for p in primaries:
-        assert p["energy_GeV"] >= run["energy_range"]["start_GeV"]
-        assert p["energy_GeV"] <= run["energy_range"]["stop_GeV"]
+        assert_primary_in_energy_range(primary_dict=p, run_dict=run)
+
+
+def assert_primary_in_energy_range(primary_dict, run_dict):
+    assert primary_dict["energy_GeV"] >= run_dict["energy_range"]["start_GeV"]
+    assert primary_dict["energy_GeV"] <= run_dict["energy_range"]["stop_GeV"]
 
 
 def assert_dtypes_in_obj(obj, dtype):
@@ -105,10 +109,18 @@ def make_sure_direct_ends_with_os_sep(direct):
         return direct + os.path.sep
 
 
-def make_steering_card_str(steering_dict, output_path, parout_direct=None):
+def make_steering_card_str(
+    steering_dict, output_path, parout_direct=None, num_showers=None
+):
     """
     Make steering card-st for CORSIKA. The card contains all steering for
     the run which is the same for each event.
+
+    Parameters
+    ----------
+    num_showers : int (default: None)
+        Number of showers NSHOW. If None, it is the number of primaries.
+        Set it when the primaries are streamed while the run is live.
     """
     if parout_direct:
         parout_direct = make_sure_direct_ends_with_os_sep(direct=parout_direct)
@@ -155,7 +167,10 @@ def make_steering_card_str(steering_dict, output_path, parout_direct=None):
     card += ["CERSIZ 1."]
     card += ["CERFIL F"]
     card += ["TSTART T"]
-    card += ["NSHOW {:d}".format(len(primaries))]
+    if num_showers is None:
+        num_showers = len(primaries)
+    assert num_showers >= len(primaries)
+    card += ["NSHOW {:d}".format(num_showers)]
     card += ["TELFIL {:s}".format(output_path)]
     card += ["EXIT"]
     card += ["\n"]  # newline so that CORSIKA knows when stdin is over.]
@@ -309,22 +324,62 @@ def primary_bytes_by_idx(primary_bytes, idx):
     return primary_bytes[bstart:bstop]
 
 
+def steering_dict_to_bytes(steering_dict):
+    """
+    Returns the binary steering of a single run, i.e. the HEADER, the run's
+    steering, and the steering of each primary particle.
+    """
+    with io.BytesIO() as buff:
+        buff.write(HEADER)
+        buff.write(run_dict_to_bytes(steering_dict["run"]))
+        for primary_dict in steering_dict["primaries"]:
+            buff.write(primary_dict_to_bytes(primary_dict))
+        buff.seek(0)
+        return buff.read()
+
+
+def steering_bytes_to_dict(steering_bytes):
+    """
+    Inverse of steering_dict_to_bytes.
+    """
+    num_bytes_primaries = (
+        len(steering_bytes) - NUM_BYTES_HEADER - NUM_BYTES_RUN_STEERING
+    )
+    assert num_bytes_primaries >= 0
+    assert num_bytes_primaries % NUM_BYTES_PRIMARY_STEERING == 0
+    num_primaries = num_bytes_primaries // NUM_BYTES_PRIMARY_STEERING
+
+    with io.BytesIO(steering_bytes) as f:
+        header = f.read(NUM_BYTES_HEADER).decode()
+        version_line = str.split(header, "\n")[2]
+        version_str = str.split(version_line, " ")[1]
+        if version_str != version.__version__:
+            print("WARNING, version mismatch.")
+        run_bytes = f.read(NUM_BYTES_RUN_STEERING)
+        primary_bytes = f.read(num_bytes_primaries)
+
+    run = {}
+    run["run"] = run_bytes_to_dict(run_bytes)
+    run["primaries"] = []
+    for idx in range(num_primaries):
+        run["primaries"].append(
+            primary_bytes_to_dict(
+                primary_bytes_by_idx(primary_bytes=primary_bytes, idx=idx)
+            )
+        )
+    return run
+
+
 def write_steerings(path, runs):
     with tarfile.open(path + ".tmp", "w") as tarfout:
         for run_id in runs:
             run = runs[run_id]
             assert run_id == run["run"]["run_id"]
-            with io.BytesIO() as buff:
-                buff.write(HEADER)
-                buff.write(run_dict_to_bytes(run["run"]))
-                for primary_dict in run["primaries"]:
-                    buff.write(primary_dict_to_bytes(primary_dict))
-                buff.seek(0)
-                _tar_write(
-                    tarfout=tarfout,
-                    path="{:09d}.steering.bin".format(run_id),
-                    payload=buff.read(),
-                )
+            _tar_write(
+                tarfout=tarfout,
+                path="{:09d}.steering.bin".format(run_id),
+                payload=steering_dict_to_bytes(run),
+            )
     shutil.move(path + ".tmp", path)
 
 
@@ -340,37 +395,10 @@ def read_steerings(path):
             run_id = int(run_id_str)
 
             if ss == "steering" and bb == "bin":
-                num_bytes_primaries = (
-                    tarinfo.size - NUM_BYTES_HEADER - NUM_BYTES_RUN_STEERING
-                )
-                assert num_bytes_primaries >= 0
-                assert num_bytes_primaries % NUM_BYTES_PRIMARY_STEERING == 0
-                num_primaries = (
-                    num_bytes_primaries // NUM_BYTES_PRIMARY_STEERING
-                )
-
                 with tarfin.extractfile(tarinfo) as f:
-                    header = f.read(NUM_BYTES_HEADER).decode()
-                    version_line = str.split(header, "\n")[2]
-                    version_str = str.split(version_line, " ")[1]
-                    if version_str != version.__version__:
-                        print("WARNING, version mismatch.")
-                    run_bytes = f.read(NUM_BYTES_RUN_STEERING)
-                    primary_bytes = f.read(num_bytes_primaries)
-
-                    run = {}
-                    run["run"] = run_bytes_to_dict(run_bytes)
-                    run["primaries"] = []
-                    for idx in range(num_primaries):
-                        run["primaries"].append(
-                            primary_bytes_to_dict(
-                                primary_bytes_by_idx(
-                                    primary_bytes=primary_bytes, idx=idx
-                                )
-                            )
-                        )
-                    assert run["run"]["run_id"] == run_id
-                    runs[run_id] = run
+                    run = steering_bytes_to_dict(f.read())
+                assert run["run"]["run_id"] == run_id
+                runs[run_id] = run
             else:
                 raise ValueError("Unknown file '{:s}'.".format(tarinfo.name))
     return runs
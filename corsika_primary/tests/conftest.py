@@ -22,14 +22,4 @@ def pytest_addoption(parser):
         action="store",
         default=CORSIKA_PATH.format(flavor="modified"),
     )
-    parser.addoption(
-        "--merlict_eventio_converter",
-        action="store",
-        default=os.path.join(
-            ".",
-            "build",
-            "merlict_development_kit",
-            "merlict-eventio-converter",
-        ),
-    )
     parser.addoption("--debug_dir", action="store", default="")
@@ -0,0 +1,194 @@
+import pytest
+import os
+import asyncio
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_run
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+async def read_tape_members(path):
+    stream = asyncio.StreamReader()
+    with open(path, "rb") as f:
+        stream.feed_data(f.read())
+    stream.feed_eof()
+    reader = cpw.asynchronous.AsyncTarStreamReader(stream=stream)
+
+    members = []
+    while True:
+        member = await reader.next_member()
+        if member is None:
+            break
+        members.append(member)
+    return members
+
+
+def test_async_tar_stream_reader(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(13))
+    orig = make_dummy_run(
+        prng=prng, run_number=13, avg_num_events=5, avg_num_bunches=2500
+    )
+    path = os.path.join(tmp.name, "run.tar")
+    with cpw.cherenkov.CherenkovEventTapeWriter(
+        path=path, buffer_capacity=1000
+    ) as ww:
+        ww.write_runh(orig["RUNH"])
+        for event_number in orig["events"]:
+            ww.write_evth(orig["events"][event_number]["EVTH"])
+            ww.write_payload(orig["events"][event_number]["bunches"])
+
+    members = asyncio.run(read_tape_members(path=path))
+
+    runh_info, runh_bin = members[0]
+    runh = cpw.event_tape.parse_runh(runh_bin=runh_bin, path=runh_info.name)
+    np.testing.assert_array_equal(runh, orig["RUNH"])
+
+    bunches = {}
+    for info, payload in members[1:]:
+        event_number = cpw.event_tape.parse_event_number(info.name)
+        if cpw.event_tape.is_evth_path(info.name):
+            evth = cpw.event_tape.parse_evth(evth_bin=payload, path=info.name)
+            np.testing.assert_array_equal(
+                evth, orig["events"][event_number]["EVTH"]
+            )
+            bunches[event_number] = []
+        else:
+            bunches[event_number].append(
+                cpw.event_tape.parse_payload_block(
+                    payload_bin=payload, shape_1=8
+                )
+            )
+
+    assert set(bunches.keys()) == set(orig["events"].keys())
+    for event_number in bunches:
+        np.testing.assert_array_equal(
+            np.vstack(bunches[event_number]),
+            orig["events"][event_number]["bunches"],
+        )
+
+    tmp.cleanup_when_no_debug()
+
+
+async def run_async(corsika_primary_path, steering_dict, run_path):
+    out = []
+    async with cpw.AsyncCorsikaPrimary(
+        corsika_path=corsika_primary_path,
+        steering_dict=steering_dict,
+        stdout_path=run_path + ".o",
+        stderr_path=run_path + ".e",
+        particle_output_path=run_path + ".par.dat",
+    ) as run:
+        async for evth, bunches in run:
+            out.append((evth, bunches))
+    assert run.exit_ok
+    return out
+
+
+async def run_many_async(corsika_primary_path, steering_dict, run_paths):
+    return await asyncio.gather(
+        *[
+            run_async(
+                corsika_primary_path=corsika_primary_path,
+                steering_dict=steering_dict,
+                run_path=run_path,
+            )
+            for run_path in run_paths
+        ]
+    )
+
+
+def test_async_same_as_sync(corsika_primary_path, debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+
+    sync_path = os.path.join(tmp.name, "sync")
+    sync_events = []
+    with cpw.CorsikaPrimary(
+        corsika_path=corsika_primary_path,
+        steering_dict=cpw.steering.EXAMPLE,
+        stdout_path=sync_path + ".o",
+        stderr_path=sync_path + ".e",
+        particle_output_path=sync_path + ".par.dat",
+    ) as run:
+        for evth, cer_reader in run:
+            sync_events.append((evth, np.vstack([b for b in cer_reader])))
+
+    async_runs = asyncio.run(
+        run_many_async(
+            corsika_primary_path=corsika_primary_path,
+            steering_dict=cpw.steering.EXAMPLE,
+            run_paths=[
+                os.path.join(tmp.name, "async_a"),
+                os.path.join(tmp.name, "async_b"),
+            ],
+        )
+    )
+
+    for async_events in async_runs:
+        assert len(async_events) == len(sync_events)
+        for i in range(len(sync_events)):
+            np.testing.assert_array_equal(
+                async_events[i][0], sync_events[i][0]
+            )
+            np.testing.assert_array_equal(
+                async_events[i][1], sync_events[i][1]
+            )
+
+    tmp.cleanup_when_no_debug()
+
+
+DIES_BEFORE_RUNH = {
+    "never_opens_output": "cat > /dev/null\nexit 1\n",
+    "closes_output": (
+        "path=$(sed -n 's/^TELFIL //p')\n" ': > "$path"\n' "exit 1\n"
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(DIES_BEFORE_RUNH.keys()))
+def test_async_corsika_dies_before_runh(debug_dir, name):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function + name,
+    )
+    corsika_path = os.path.join(tmp.name, "run", "corsika")
+    os.makedirs(os.path.dirname(corsika_path))
+    with open(corsika_path, "wt") as f:
+        f.write("#!/bin/sh\n" + DIES_BEFORE_RUNH[name])
+    os.chmod(corsika_path, 0o755)
+
+    run_path = os.path.join(tmp.name, "run")
+    run = cpw.AsyncCorsikaPrimary(
+        corsika_path=corsika_path,
+        steering_dict=cpw.steering.EXAMPLE,
+        stdout_path=run_path + ".o",
+        stderr_path=run_path + ".e",
+        particle_output_path=run_path + ".par.dat",
+    )
+
+    async def enter():
+        async with run:
+            pass
+
+    with pytest.raises(RuntimeError, match="RUNH"):
+        asyncio.run(asyncio.wait_for(enter(), timeout=10))
+    assert run.exit_ok is False
+    assert run.corsika_process.returncode is not None
+    assert not os.path.exists(run.tmp_dir)
+    tmp.cleanup_when_no_debug()
@@ -0,0 +1,76 @@
+import corsika_primary as cpw
+import numpy as np
+
+
+def make_bunches(prng, num):
+    bunches = prng.uniform(low=-1e4, high=1e4, size=(num, 8))
+    return bunches.astype(np.float32)
+
+
+def expected_si_units(bunches):
+    b = bunches.copy()
+    b[:, cpw.I.BUNCH.X_CM] *= 1e-2
+    b[:, cpw.I.BUNCH.Y_CM] *= 1e-2
+    b[:, cpw.I.BUNCH.TIME_NS] *= 1e-9
+    b[:, cpw.I.BUNCH.EMISSOION_ALTITUDE_ASL_CM] *= 1e-2
+    b[:, cpw.I.BUNCH.WAVELENGTH_NM] = (
+        np.abs(b[:, cpw.I.BUNCH.WAVELENGTH_NM]) * 1e-9
+    )
+    return b
+
+
+def test_bunches_to_si_units():
+    prng = np.random.Generator(np.random.PCG64(1))
+    bunches = make_bunches(prng, num=1000)
+    original = bunches.copy()
+
+    si = cpw.bunches_to_si_units(bunches)
+    np.testing.assert_array_equal(bunches, original)
+    np.testing.assert_array_equal(si, expected_si_units(original))
+
+    si_inplace = cpw.bunches_to_si_units(bunches, inplace=True)
+    assert si_inplace is bunches
+    np.testing.assert_array_equal(bunches, si)
+
+
+def test_si_units_chunks():
+    prng = np.random.Generator(np.random.PCG64(2))
+    bunches = make_bunches(prng, num=1000)
+    for chunk_size in [1, 7, 1000, 5000]:
+        np.testing.assert_array_equal(
+            cpw.cherenkov_bunches.to_si_units(bunches, chunk_size=chunk_size),
+            expected_si_units(bunches),
+        )
+
+
+def test_si_units_view():
+    prng = np.random.Generator(np.random.PCG64(3))
+    bunches = make_bunches(prng, num=1000)
+    original = bunches.copy()
+    expected = expected_si_units(bunches)
+
+    view = cpw.cherenkov_bunches.SiUnitsView(bunches, chunk_size=7)
+    assert len(view) == 1000
+    for key, index in [
+        ("x_m", cpw.I.BUNCH.X_CM),
+        ("y_m", cpw.I.BUNCH.Y_CM),
+        ("ux_1", cpw.I.BUNCH.UX_1),
+        ("vy_1", cpw.I.BUNCH.VY_1),
+        ("time_s", cpw.I.BUNCH.TIME_NS),
+        ("emission_altitude_asl_m", cpw.I.BUNCH.EMISSOION_ALTITUDE_ASL_CM),
+        ("bunch_size_1", cpw.I.BUNCH.BUNCH_SIZE_1),
+        ("wavelength_m", cpw.I.BUNCH.WAVELENGTH_NM),
+    ]:
+        np.testing.assert_array_equal(getattr(view, key), expected[:, index])
+    np.testing.assert_array_equal(bunches, original)
+
+    # unitless columns are views, converted columns are cached
+    assert np.shares_memory(view.ux_1, bunches)
+    assert view.x_m is view.x_m
+
+
+def test_si_units_view_converts_only_accessed_columns():
+    bunches = np.ones(shape=(10, 8), dtype=np.float32)
+    view = cpw.cherenkov_bunches.SiUnitsView(bunches)
+    view.time_s
+    assert list(view._columns.keys()) == [cpw.I.BUNCH.TIME_NS]
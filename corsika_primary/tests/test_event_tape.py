@@ -57,6 +57,40 @@ def make_dummy_run(prng, run_number, avg_num_events, avg_num_bunches):
     return run
 
 
+def make_dummy_events(
+    prng, event_numbers, run_number=1, max_num_bunches=1000, shape_1=8
+):
+    runh = make_dummy_runh(prng=prng, run_number=run_number)
+    events = {}
+    for event_number in event_numbers:
+        event_number = int(event_number)
+        evth = make_dummy_evth(
+            prng=prng, run_number=run_number, event_number=event_number
+        )
+        num = int(prng.integers(low=0, high=max_num_bunches))
+        payload = prng.uniform(size=(num, shape_1)).astype(np.float32)
+        events[event_number] = (evth, payload)
+    return runh, events
+
+
+def write_dummy_events(
+    path,
+    runh,
+    events,
+    event_numbers=None,
+    writer=cpw.cherenkov.CherenkovEventTapeWriter,
+    **kwargs
+):
+    if event_numbers is None:
+        event_numbers = list(events.keys())
+    with writer(path=path, **kwargs) as tape:
+        tape.write_runh(runh)
+        for event_number in event_numbers:
+            evth, payload = events[event_number]
+            tape.write_evth(evth)
+            tape.write_payload(payload)
+
+
 RUN_NUMBERS = [1, 13, 67, 3877]
 AVG_NUM_EVENTS = 25
 AVG_NUM_BUNCHES = 10000
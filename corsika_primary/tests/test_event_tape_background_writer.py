@@ -0,0 +1,119 @@
+import pytest
+import os
+import time
+import corsika_primary as cpw
+import inspect
+import numpy as np
+import test_event_tape
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_dummy_events(prng, num_events):
+    return test_event_tape.make_dummy_events(
+        prng=prng,
+        event_numbers=range(1, num_events + 1),
+        max_num_bunches=5000,
+    )
+
+
+def write_dummy_run(path, runh, events, num_buffers):
+    with cpw.cherenkov.CherenkovEventTapeWriter(
+        path=path,
+        buffer_capacity=1000,
+        write_toc=not str.endswith(path, ".gz"),
+        num_buffers=num_buffers,
+    ) as tape:
+        tape.write_runh(runh)
+        for event_number in events:
+            evth, bunches = events[event_number]
+            tape.write_evth(evth)
+            # the caller reuses its arrays
+            tape.write_payload(bunches.copy())
+            evth[:] = 0.0
+
+
+def read_run(path):
+    events = {}
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        for evth, cer_reader in run:
+            blocks = [b for b in cer_reader]
+            blocks.append(np.zeros(shape=(0, 8), dtype=np.float32))
+            events[int(evth[cpw.I.EVTH.EVENT_NUMBER])] = (
+                evth,
+                np.vstack(blocks),
+            )
+    return events
+
+
+@pytest.mark.parametrize("suffix", [".tar", ".tar.gz", ".bgz.tar"])
+def test_background_writer_writes_same_tape(debug_dir, suffix):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    runh, events = make_dummy_events(prng, num_events=20)
+    expected = {e: (events[e][0].copy(), events[e][1]) for e in events}
+
+    paths = {}
+    for num_buffers in [1, 2, 4]:
+        paths[num_buffers] = os.path.join(
+            tmp.name, "run{:d}{:s}".format(num_buffers, suffix)
+        )
+        write_dummy_run(
+            path=paths[num_buffers],
+            runh=runh,
+            events={
+                e: (expected[e][0].copy(), expected[e][1]) for e in events
+            },
+            num_buffers=num_buffers,
+        )
+
+    for num_buffers in paths:
+        back = read_run(paths[num_buffers])
+        assert list(back.keys()) == list(expected.keys())
+        for e in expected:
+            np.testing.assert_array_equal(back[e][0], expected[e][0])
+            np.testing.assert_array_equal(back[e][1], expected[e][1])
+
+    if suffix != ".tar.gz":
+        with open(paths[1], "rb") as a, open(paths[4], "rb") as b:
+            assert a.read() == b.read()
+        with open(paths[1] + ".toc.x4.uint64", "rb") as a, open(
+            paths[4] + ".toc.x4.uint64", "rb"
+        ) as b:
+            assert a.read() == b.read()
+    tmp.cleanup_when_no_debug()
+
+
+def test_background_writer_raises_errors_in_caller(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(2))
+    runh, events = make_dummy_events(prng, num_events=1)
+    evth, bunches = events[1]
+    evth[cpw.I.EVTH.RUN_NUMBER] = np.float32(2)  # not the run's number
+
+    tape = cpw.cherenkov.CherenkovEventTapeWriter(
+        path=os.path.join(tmp.name, "run.tar"), num_buffers=2
+    )
+    tape.write_runh(runh)
+    tape.write_evth(evth)
+    for i in range(1000):
+        if tape.error is not None:
+            break
+        time.sleep(0.01)
+    assert tape.error is not None
+
+    # The thread failed before close flushes the buffer.
+    with pytest.raises(AssertionError):
+        tape.close()
+    assert not tape.thread.is_alive()
+    assert tape.tar.closed
+    tmp.cleanup_when_no_debug()
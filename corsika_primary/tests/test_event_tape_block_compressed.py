@@ -0,0 +1,118 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+import test_event_tape
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_dummy_events(prng, num_events):
+    runh, events = test_event_tape.make_dummy_events(
+        prng=prng,
+        event_numbers=range(1, num_events + 1),
+        max_num_bunches=3000,
+    )
+    for event_number in events:
+        evth, bunches = events[event_number]
+        # rounded to be compressible
+        events[event_number] = (evth, bunches.round(2))
+    return runh, events
+
+
+def write_dummy_run(path, runh, events, write_toc=False):
+    test_event_tape.write_dummy_events(
+        path=path,
+        runh=runh,
+        events=events,
+        buffer_capacity=500,
+        write_toc=write_toc,
+    )
+
+
+def assert_run_equal(run, runh, events):
+    np.testing.assert_array_equal(run.runh, runh)
+    event_numbers = []
+    for evth, cer_reader in run:
+        event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+        event_numbers.append(event_number)
+        blocks = [block for block in cer_reader]
+        blocks.append(np.zeros(shape=(0, 8), dtype=np.float32))
+        np.testing.assert_array_equal(evth, events[event_number][0])
+        np.testing.assert_array_equal(
+            np.vstack(blocks), events[event_number][1]
+        )
+    assert event_numbers == list(events.keys())
+
+
+def test_block_compressed_write_read(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    runh, events = make_dummy_events(prng, num_events=15)
+    raw_path = os.path.join(tmp.name, "run.tar")
+    bgz_path = os.path.join(
+        tmp.name, "run" + cpw.event_tape.BLOCK_COMPRESSED_SUFFIX
+    )
+    write_dummy_run(path=raw_path, runh=runh, events=events)
+    write_dummy_run(path=bgz_path, runh=runh, events=events)
+    assert os.stat(bgz_path).st_size < os.stat(raw_path).st_size
+
+    for num_threads in [1, 4]:
+        with cpw.cherenkov.CherenkovEventTapeReader(
+            bgz_path, num_threads=num_threads
+        ) as run:
+            assert_run_equal(run=run, runh=runh, events=events)
+
+    tmp.cleanup_when_no_debug()
+
+
+def test_block_compressed_random_access(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(2))
+    runh, events = make_dummy_events(prng, num_events=15)
+    path = os.path.join(
+        tmp.name, "run" + cpw.event_tape.BLOCK_COMPRESSED_SUFFIX
+    )
+    write_dummy_run(path=path, runh=runh, events=events, write_toc=True)
+
+    with cpw.cherenkov.CherenkovEventTapeRandomAccessReader(path) as tape:
+        for event_number in [15, 2, 9]:
+            evth, bunches = tape[event_number]
+            np.testing.assert_array_equal(evth, events[event_number][0])
+            np.testing.assert_array_equal(bunches, events[event_number][1])
+    tmp.cleanup_when_no_debug()
+
+
+def test_convert(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(3))
+    runh, events = make_dummy_events(prng, num_events=5)
+    raw_path = os.path.join(tmp.name, "run.tar")
+    bgz_path = os.path.join(
+        tmp.name, "run" + cpw.event_tape.BLOCK_COMPRESSED_SUFFIX
+    )
+    back_path = os.path.join(tmp.name, "back.tar")
+    write_dummy_run(path=raw_path, runh=runh, events=events)
+
+    suffix = cpw.cherenkov.CHERENKOV_SUFFIX
+    cpw.event_tape.convert(raw_path, bgz_path, payload_block_suffix=suffix)
+    cpw.event_tape.convert(bgz_path, back_path, payload_block_suffix=suffix)
+
+    with cpw.cherenkov.CherenkovEventTapeReader(bgz_path) as run:
+        assert_run_equal(run=run, runh=runh, events=events)
+    with open(raw_path, "rb") as a, open(back_path, "rb") as b:
+        assert a.read() == b.read()
+    tmp.cleanup_when_no_debug()
@@ -0,0 +1,95 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_runh
+from test_event_tape import make_dummy_evth
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def write_run(path, runh, evth, payload, step, num_buffers):
+    with cpw.cherenkov.CherenkovEventTapeWriter(
+        path=path,
+        buffer_capacity=1000,
+        num_buffers=num_buffers,
+    ) as tape:
+        tape.write_runh(runh)
+        tape.write_evth(evth)
+        tape.write_payload(np.zeros(shape=(0, 8), dtype=np.float32))
+        for start in range(0, payload.shape[0], step):
+            tape.write_payload(payload[start : start + step])
+
+
+@pytest.mark.parametrize("num_buffers", [1, 2])
+@pytest.mark.parametrize("suffix", [".tar", ".bgz.tar"])
+def test_large_payload_writes_same_tape(debug_dir, suffix, num_buffers):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    runh = make_dummy_runh(prng=prng, run_number=1)
+    evth = make_dummy_evth(prng=prng, run_number=1, event_number=1)
+    payload = prng.uniform(size=(4321, 8)).astype(np.float32)
+
+    paths = {}
+    # step 1 always goes through the buffer, the others write full
+    # blocks straight from the payload.
+    for step in [1, 2500, payload.shape[0]]:
+        paths[step] = os.path.join(
+            tmp.name, "step{:d}{:s}".format(step, suffix)
+        )
+        write_run(
+            path=paths[step],
+            runh=runh,
+            evth=evth,
+            payload=payload,
+            step=step,
+            num_buffers=num_buffers,
+        )
+
+    for step in paths:
+        with open(paths[1], "rb") as a, open(paths[step], "rb") as b:
+            assert a.read() == b.read()
+
+    with cpw.cherenkov.CherenkovEventTapeReader(paths[1]) as run:
+        for back_evth, cer_reader in run:
+            np.testing.assert_array_equal(back_evth, evth)
+            blocks = [b for b in cer_reader]
+            assert [b.shape[0] for b in blocks] == [1000] * 4 + [321]
+            np.testing.assert_array_equal(np.vstack(blocks), payload)
+    tmp.cleanup_when_no_debug()
+
+
+def test_non_contiguous_payload(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(2))
+    runh = make_dummy_runh(prng=prng, run_number=1)
+    evth = make_dummy_evth(prng=prng, run_number=1, event_number=1)
+    payload = prng.uniform(size=(2 * 3000, 8)).astype(np.float32)[::2]
+    assert not payload.flags.c_contiguous
+
+    path = os.path.join(tmp.name, "run.tar")
+    write_run(
+        path=path,
+        runh=runh,
+        evth=evth,
+        payload=payload,
+        step=payload.shape[0],
+        num_buffers=1,
+    )
+
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        for _, cer_reader in run:
+            np.testing.assert_array_equal(
+                np.vstack([b for b in cer_reader]), payload
+            )
+    tmp.cleanup_when_no_debug()
@@ -0,0 +1,73 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_events
+from test_event_tape import write_dummy_events
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def write_dummy_run(path, prng, num_events, shape_1):
+    if shape_1 == 8:
+        writer = cpw.cherenkov.CherenkovEventTapeWriter
+    else:
+        writer = cpw.particles.ParticleEventTapeWriter
+    runh, events = make_dummy_events(
+        prng=prng,
+        event_numbers=range(1, num_events + 1),
+        max_num_bunches=2000,
+        shape_1=shape_1,
+    )
+    write_dummy_events(
+        path=path,
+        runh=runh,
+        events=events,
+        writer=writer,
+        buffer_capacity=777,
+    )
+    return events
+
+
+@pytest.mark.parametrize("shape_1", [8, 7])
+def test_memory_map_reads_same_as_stream(debug_dir, shape_1):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(shape_1))
+    path = os.path.join(tmp.name, "run{:d}.tar".format(shape_1))
+    events = write_dummy_run(path, prng, num_events=12, shape_1=shape_1)
+
+    if shape_1 == 8:
+        reader = cpw.cherenkov.CherenkovEventTapeReader
+    else:
+        reader = cpw.particles.ParticleEventTapeReader
+
+    views = []
+    with reader(path, memory_map=True) as run:
+        for evth, payload_reader in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            blocks = []
+            for block in payload_reader:
+                assert block.shape[1] == shape_1
+                assert not block.flags.writeable
+                assert not block.flags.owndata
+                blocks.append(block)
+            views += blocks
+            np.testing.assert_array_equal(evth, events[event_number][0])
+            payload = np.vstack(
+                blocks + [np.zeros(shape=(0, shape_1), dtype=np.float32)]
+            )
+            np.testing.assert_array_equal(payload, events[event_number][1])
+
+    # the views outlive the reader
+    for view in views:
+        assert np.all(np.isfinite(view))
+    total = sum([v.shape[0] for v in views])
+    assert total == sum([events[e][1].shape[0] for e in events])
+    tmp.cleanup_when_no_debug()
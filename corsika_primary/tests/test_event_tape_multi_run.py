@@ -0,0 +1,141 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_events
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_dummy_runs(prng, num_events_in_runs):
+    runs = {}
+    for run_number in num_events_in_runs:
+        runs[run_number] = make_dummy_events(
+            prng=prng,
+            event_numbers=range(1, num_events_in_runs[run_number] + 1),
+            run_number=run_number,
+            max_num_bunches=300,
+        )
+    return runs
+
+
+def write_runs(path, runs, num_buffers=1):
+    with cpw.cherenkov.CherenkovEventTapeWriter(
+        path=path, buffer_capacity=100, num_buffers=num_buffers
+    ) as tape:
+        for run_number in runs:
+            runh, events = runs[run_number]
+            tape.write_runh(runh)
+            for event_number in events:
+                evth, bunches = events[event_number]
+                tape.write_evth(evth)
+                tape.write_payload(bunches)
+
+
+@pytest.mark.parametrize("num_buffers", [1, 2])
+@pytest.mark.parametrize("suffix", [".tar", ".tar.gz", ".bgz.tar"])
+def test_write_and_read_multi_run(debug_dir, suffix, num_buffers):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    runs = make_dummy_runs(prng, {1: 5, 2: 0, 3: 4, 7: 6})
+    path = os.path.join(tmp.name, "runs" + suffix)
+    write_runs(path=path, runs=runs, num_buffers=num_buffers)
+
+    keys = []
+    with cpw.cherenkov.CherenkovMultiRunEventTapeReader(path) as tape:
+        for runh, evth, cer_reader in tape:
+            run_number = int(runh[cpw.I.RUNH.RUN_NUMBER])
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            keys.append((run_number, event_number))
+            exp_runh, exp_events = runs[run_number]
+            np.testing.assert_array_equal(runh, exp_runh)
+            np.testing.assert_array_equal(evth, exp_events[event_number][0])
+            if event_number % 2 == 0:
+                continue  # the payload is skipped
+            np.testing.assert_array_equal(
+                tape.read_event_payload(), exp_events[event_number][1]
+            )
+
+    expected_keys = [(r, e) for r in runs for e in runs[r][1]]
+    assert keys == expected_keys
+
+    # The single run reader reads the first run only.
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        assert run.run_number == 1
+        assert len([evth for evth, _ in run]) == 5
+    tmp.cleanup_when_no_debug()
+
+
+def test_multi_run_reader_reads_concatenated_runs(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(2))
+    runs = make_dummy_runs(prng, {1: 3, 2: 3})
+    paths = []
+    for run_number in runs:
+        path = os.path.join(tmp.name, "run{:d}.tar".format(run_number))
+        write_runs(path=path, runs={run_number: runs[run_number]})
+        paths.append(path)
+
+    out_path = os.path.join(tmp.name, "runs.tar")
+    cpw.event_tape_tools.concatenate(in_paths=paths, out_path=out_path)
+
+    all_path = os.path.join(tmp.name, "all.tar")
+    write_runs(path=all_path, runs=runs)
+    with open(out_path, "rb") as a, open(all_path, "rb") as b:
+        assert a.read() == b.read()
+
+    with cpw.cherenkov.CherenkovMultiRunEventTapeReader(out_path) as tape:
+        keys = [
+            (tape.run_number, int(evth[cpw.I.EVTH.EVENT_NUMBER]))
+            for runh, evth, _ in tape
+        ]
+    assert keys == [(1, 1), (1, 2), (1, 3), (2, 1), (2, 2), (2, 3)]
+    tmp.cleanup_when_no_debug()
+
+
+def test_writer_asserts_order_of_runs(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(3))
+    runs = make_dummy_runs(prng, {2: 1, 1: 1})
+
+    with pytest.raises(AssertionError):
+        write_runs(path=os.path.join(tmp.name, "runs.tar"), runs=runs)
+
+    with cpw.cherenkov.CherenkovEventTapeWriter(
+        path=os.path.join(tmp.name, "toc.tar"), write_toc=True
+    ) as tape:
+        tape.write_runh(runs[1][0])
+        with pytest.raises(AssertionError):
+            tape.write_runh(runs[2][0])
+    tmp.cleanup_when_no_debug()
+
+
+def test_toc_and_random_access_reject_multi_run(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(4))
+    path = os.path.join(tmp.name, "runs.tar")
+    write_runs(path=path, runs=make_dummy_runs(prng, {1: 2, 2: 2}))
+
+    with pytest.raises(AssertionError):
+        cpw.event_tape.make_toc(
+            path=path, payload_block_suffix=cpw.cherenkov.CHERENKOV_SUFFIX
+        )
+    with pytest.raises(AssertionError):
+        cpw.cherenkov.CherenkovEventTapeRandomAccessReader(path)
+    tmp.cleanup_when_no_debug()
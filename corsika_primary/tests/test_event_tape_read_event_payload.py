@@ -0,0 +1,103 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_events
+from test_event_tape import write_dummy_events
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def write_dummy_run(path, prng, num_events):
+    runh, events = make_dummy_events(
+        prng=prng, event_numbers=range(1, num_events + 1)
+    )
+    write_dummy_events(
+        path=path, runh=runh, events=events, buffer_capacity=100
+    )
+    return {e: events[e][1] for e in events}
+
+
+@pytest.mark.parametrize(
+    "suffix,memory_map",
+    [(".tar", False), (".tar", True), (".tar.gz", False), (".bgz.tar", False)],
+)
+def test_read_event_payload(debug_dir, suffix, memory_map):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    path = os.path.join(tmp.name, "run" + suffix)
+    events = write_dummy_run(path=path, prng=prng, num_events=20)
+
+    for reuse_buffer in [False, True]:
+        with cpw.cherenkov.CherenkovEventTapeReader(
+            path, memory_map=memory_map
+        ) as run:
+            for evth, cer_reader in run:
+                event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+                bunches = run.read_event_payload(reuse_buffer=reuse_buffer)
+                assert bunches.dtype == np.float32
+                np.testing.assert_array_equal(bunches, events[event_number])
+                assert len([b for b in cer_reader]) == 0
+                if not reuse_buffer:
+                    # No spare rows are kept alive by the view.
+                    assert bunches.base.nbytes == bunches.nbytes
+    tmp.cleanup_when_no_debug()
+
+
+def test_read_event_payload_after_first_block(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(2))
+    path = os.path.join(tmp.name, "run.tar")
+    events = write_dummy_run(path=path, prng=prng, num_events=10)
+
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        for evth, cer_reader in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            expected = events[event_number]
+            if expected.shape[0] > 0:
+                first = next(cer_reader)
+                np.testing.assert_array_equal(
+                    first, expected[0 : first.shape[0]]
+                )
+                expected = expected[first.shape[0] :]
+            np.testing.assert_array_equal(run.read_event_payload(), expected)
+    tmp.cleanup_when_no_debug()
+
+
+def test_read_event_payload_reuses_buffer(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(3))
+    path = os.path.join(tmp.name, "run.tar")
+    events = write_dummy_run(path=path, prng=prng, num_events=10)
+    max_num = max([events[e].shape[0] for e in events])
+
+    out = np.zeros(shape=(max_num, 8), dtype=np.float32)
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        for evth, _ in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            bunches = run.read_event_payload(out=out)
+            assert np.shares_memory(bunches, out) or bunches.size == 0
+            np.testing.assert_array_equal(bunches, events[event_number])
+
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        for evth, _ in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            bunches = run.read_event_payload(reuse_buffer=True)
+            np.testing.assert_array_equal(bunches, events[event_number])
+            assert run.payload_buffer.shape[0] >= bunches.shape[0]
+            if bunches.size > 0:
+                assert np.shares_memory(bunches, run.payload_buffer)
+    tmp.cleanup_when_no_debug()
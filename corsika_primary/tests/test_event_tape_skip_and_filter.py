@@ -0,0 +1,120 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_events
+from test_event_tape import write_dummy_events
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+PARTICLE_IDS = [1, 3, 14]
+
+
+def write_dummy_run(path, prng, num_events):
+    runh, events = make_dummy_events(
+        prng=prng,
+        event_numbers=range(1, num_events + 1),
+        max_num_bunches=500,
+    )
+    for event_number in events:
+        evth = events[event_number][0]
+        evth[cpw.I.EVTH.PARTICLE_ID] = prng.choice(PARTICLE_IDS)
+        evth[cpw.I.EVTH.TOTAL_ENERGY_GEV] = prng.uniform(1, 100)
+        evth[cpw.I.EVTH.THETA_RAD] = prng.uniform(0, 1)
+    write_dummy_events(
+        path=path, runh=runh, events=events, buffer_capacity=100
+    )
+    return events
+
+
+READER_CONFIGS = [
+    (".tar", False),
+    (".tar", True),
+    (".tar.gz", False),
+    (".bgz.tar", False),
+]
+
+
+@pytest.mark.parametrize("suffix,memory_map", READER_CONFIGS)
+def test_skip_unread_payload(debug_dir, suffix, memory_map):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    path = os.path.join(tmp.name, "run" + suffix)
+    events = write_dummy_run(path=path, prng=prng, num_events=20)
+
+    with cpw.cherenkov.CherenkovEventTapeReader(
+        path, memory_map=memory_map
+    ) as run:
+        event_numbers = []
+        for evth, cer_reader in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            event_numbers.append(event_number)
+            if event_number % 3 == 0:
+                blocks = [b for b in cer_reader]
+                blocks.append(np.zeros(shape=(0, 8), dtype=np.float32))
+                np.testing.assert_array_equal(
+                    np.vstack(blocks), events[event_number][1]
+                )
+            elif event_number % 3 == 1 and len(events[event_number][1]):
+                next(cer_reader)  # read only the first block
+        assert event_numbers == list(events.keys())
+    tmp.cleanup_when_no_debug()
+
+
+@pytest.mark.parametrize("suffix,memory_map", READER_CONFIGS)
+def test_evth_filter(debug_dir, suffix, memory_map):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(2))
+    path = os.path.join(tmp.name, "run" + suffix)
+    events = write_dummy_run(path=path, prng=prng, num_events=40)
+
+    evth_filter = cpw.event_tape.make_evth_filter(
+        particle_ids=[1, 14],
+        energy_range_GeV=(10, 80),
+        theta_range_rad=(0.1, 0.9),
+    )
+    expected = [e for e in events if evth_filter(events[e][0])]
+    assert 0 < len(expected) < len(events)
+
+    with cpw.cherenkov.CherenkovEventTapeReader(
+        path, memory_map=memory_map, evth_filter=evth_filter
+    ) as run:
+        event_numbers = []
+        for evth, cer_reader in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            event_numbers.append(event_number)
+            assert evth[cpw.I.EVTH.PARTICLE_ID] in [1, 14]
+            np.testing.assert_array_equal(
+                run.read_event_payload(), events[event_number][1]
+            )
+        assert event_numbers == expected
+    tmp.cleanup_when_no_debug()
+
+
+def test_payload_reader_of_skipped_event_stops(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(3))
+    path = os.path.join(tmp.name, "run.tar")
+    write_dummy_run(path=path, prng=prng, num_events=3)
+
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        assert run.mode == "r:"
+        _, first_reader = next(run)
+        evth, _ = next(run)
+        assert evth[cpw.I.EVTH.EVENT_NUMBER] == 2
+        assert len([b for b in first_reader]) == 0
+    tmp.cleanup_when_no_debug()
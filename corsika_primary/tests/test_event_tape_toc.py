@@ -0,0 +1,73 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_events
+from test_event_tape import write_dummy_events
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_dummy_run(prng, run_number, num_events):
+    return make_dummy_events(
+        prng=prng,
+        event_numbers=range(1, num_events + 1),
+        run_number=run_number,
+        max_num_bunches=2500,
+    )
+
+
+def write_dummy_run(path, runh, events, write_toc):
+    write_dummy_events(
+        path=path,
+        runh=runh,
+        events=events,
+        buffer_capacity=1000,
+        write_toc=write_toc,
+    )
+
+
+def test_writer_toc_equals_rebuilt_toc(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    runh, events = make_dummy_run(prng, run_number=7, num_events=20)
+    path = os.path.join(tmp.name, "run.tar")
+    write_dummy_run(path=path, runh=runh, events=events, write_toc=True)
+
+    written = cpw.event_tape.read_toc(cpw.event_tape.toc_path(path))
+    rebuilt = cpw.event_tape.make_toc(
+        path=path, payload_block_suffix=cpw.cherenkov.CHERENKOV_SUFFIX
+    )
+    np.testing.assert_array_equal(written, rebuilt)
+    assert written[0, 0] == 0
+    tmp.cleanup_when_no_debug()
+
+
+@pytest.mark.parametrize("write_toc", [True, False])
+def test_random_access(debug_dir, write_toc):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(2))
+    runh, events = make_dummy_run(prng, run_number=3, num_events=25)
+    path = os.path.join(tmp.name, "run{:d}.tar".format(int(write_toc)))
+    write_dummy_run(path=path, runh=runh, events=events, write_toc=write_toc)
+    assert os.path.exists(cpw.event_tape.toc_path(path)) == write_toc
+
+    with cpw.cherenkov.CherenkovEventTapeRandomAccessReader(path) as tape:
+        np.testing.assert_array_equal(tape.runh, runh)
+        assert len(tape) == len(events)
+        assert tape.event_numbers == list(events.keys())
+        for event_number in [25, 3, 1, 17, 17]:
+            evth, bunches = tape[event_number]
+            np.testing.assert_array_equal(evth, events[event_number][0])
+            np.testing.assert_array_equal(bunches, events[event_number][1])
+    tmp.cleanup_when_no_debug()
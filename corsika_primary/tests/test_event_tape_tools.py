@@ -0,0 +1,182 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_events
+from test_event_tape import write_dummy_events
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_dummy_run(prng, event_numbers, run_number=1):
+    return make_dummy_events(
+        prng=prng,
+        event_numbers=event_numbers,
+        run_number=run_number,
+        max_num_bunches=300,
+    )
+
+
+def write_run(path, runh, events, event_numbers=None):
+    write_dummy_events(
+        path=path,
+        runh=runh,
+        events=events,
+        event_numbers=event_numbers,
+        buffer_capacity=100,
+    )
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("suffix", [".tar", ".bgz.tar"])
+def test_concatenate_split_and_drop(debug_dir, suffix):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    runh, events = make_dummy_run(prng, event_numbers=range(1, 11))
+
+    def p(name):
+        return os.path.join(tmp.name, name + suffix)
+
+    write_run(p("all"), runh, events)
+    write_run(p("a"), runh, events, event_numbers=range(1, 5))
+    write_run(p("b"), runh, events, event_numbers=range(5, 11))
+
+    cpw.event_tape_tools.concatenate(
+        in_paths=[p("a"), p("b")], out_path=p("a_b")
+    )
+    assert read_file(p("a_b")) == read_file(p("all"))
+
+    cpw.event_tape_tools.split(
+        in_path=p("all"),
+        out_paths=[p("split_a"), p("split_b")],
+        event_ranges=[(1, 4), (5, 10)],
+    )
+    assert read_file(p("split_a")) == read_file(p("a"))
+    assert read_file(p("split_b")) == read_file(p("b"))
+
+    write_run(p("odd"), runh, events, event_numbers=[1, 3, 5, 7, 9])
+    cpw.event_tape_tools.drop(
+        in_path=p("all"),
+        out_path=p("dropped"),
+        event_numbers=[2, 4, 6, 8, 10],
+    )
+    assert read_file(p("dropped")) == read_file(p("odd"))
+
+    with pytest.raises(AssertionError):
+        cpw.event_tape_tools.concatenate(
+            in_paths=[p("b"), p("a")], out_path=p("b_a")
+        )
+    tmp.cleanup_when_no_debug()
+
+
+def test_concatenate_and_renumber_runs(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(2))
+    runh1, events1 = make_dummy_run(prng, range(1, 4), run_number=1)
+    runh2, events2 = make_dummy_run(prng, range(4, 7), run_number=2)
+    path1 = os.path.join(tmp.name, "run1.tar")
+    path2 = os.path.join(tmp.name, "run2.tar")
+    write_run(path1, runh1, events1)
+    write_run(path2, runh2, events2)
+
+    out_path = os.path.join(tmp.name, "run7.tar")
+    cpw.event_tape_tools.concatenate(
+        in_paths=[path1, path2], out_path=out_path, run_number=7
+    )
+
+    expected = dict(events1)
+    expected.update(events2)
+    with cpw.cherenkov.CherenkovEventTapeReader(out_path) as run:
+        assert run.run_number == 7
+        event_numbers = []
+        for evth, cer_reader in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            event_numbers.append(event_number)
+            assert evth[cpw.I.EVTH.RUN_NUMBER] == 7
+            exp_evth, exp_bunches = expected[event_number]
+            exp_evth = exp_evth.copy()
+            exp_evth[cpw.I.EVTH.RUN_NUMBER] = 7
+            np.testing.assert_array_equal(evth, exp_evth)
+            np.testing.assert_array_equal(
+                run.read_event_payload(), exp_bunches
+            )
+        assert event_numbers == [1, 2, 3, 4, 5, 6]
+    tmp.cleanup_when_no_debug()
+
+
+def test_rename_only_changes_run_number():
+    name = "000000001/000000012/000000003.cer.x8.float32"
+    assert (
+        cpw.event_tape_tools.rename(name, run_number=42)
+        == "000000042/000000012/000000003.cer.x8.float32"
+    )
+
+
+@pytest.mark.parametrize("suffix", [".tar", ".tar.gz", ".bgz.tar"])
+def test_inventory(debug_dir, suffix):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(3))
+    runh, events = make_dummy_run(prng, event_numbers=range(1, 11))
+    path = os.path.join(tmp.name, "run" + suffix)
+    write_run(path, runh, events)
+
+    inv = cpw.event_tape_tools.inventory(
+        path=path,
+        payload_block_suffix=cpw.cherenkov.CHERENKOV_SUFFIX,
+        payload_shape_1=8,
+    )
+    assert len(inv) == 10
+    for i, event_number in enumerate(events):
+        num = events[event_number][1].shape[0]
+        assert inv.run_number[i] == 1
+        assert inv.event_number[i] == event_number
+        assert inv.num_blocks[i] == int(np.ceil(num / 100))
+        assert inv.num_rows[i] == num
+        assert inv.num_bytes[i] == num * cpw.I.BUNCH.NUM_BYTES
+    tmp.cleanup_when_no_debug()
+
+
+def test_inventory_many(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(4))
+    paths = []
+    expected = {}
+    for run_number in range(1, 5):
+        runh, events = make_dummy_run(
+            prng, event_numbers=range(1, 4), run_number=run_number
+        )
+        path = os.path.join(tmp.name, "run{:d}.tar".format(run_number))
+        write_run(path, runh, events)
+        paths.append(path)
+        expected[path] = [events[e][1].shape[0] for e in events]
+
+    inventories = cpw.event_tape_tools.inventory_many(
+        paths=paths,
+        payload_block_suffix=cpw.cherenkov.CHERENKOV_SUFFIX,
+        payload_shape_1=8,
+        num_workers=2,
+    )
+    assert list(inventories.keys()) == paths
+    for path in paths:
+        assert inventories[path].num_rows.tolist() == expected[path]
+    tmp.cleanup_when_no_debug()
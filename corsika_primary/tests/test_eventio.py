@@ -0,0 +1,230 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import numpy as np
+
+
+@pytest.fixture()
+def corsika_vanilla_path(pytestconfig):
+    return pytestconfig.getoption("corsika_vanilla_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_object(
+    type, payload, version=0, toplevel=True, only_subobjects=False
+):
+    out = b""
+    if toplevel:
+        out += np.uint32(cpw.eventio.SYNC_MARKER).tobytes()
+    out += np.uint32(type | (version << 20)).tobytes()
+    out += np.int32(0).tobytes()
+    length = len(payload) | (int(only_subobjects) << 30)
+    out += np.uint32(length).tobytes()
+    return out + payload
+
+
+def make_corsika_block(type, block):
+    payload = np.int32(block.shape[0]).tobytes() + block.tobytes()
+    return make_object(type=type, payload=payload)
+
+
+def make_photon_bunches(bunches, compact=False):
+    payload = np.int16(0).tobytes() + np.int16(0).tobytes()
+    payload += np.float32(np.sum(bunches[:, 6])).tobytes()
+    payload += np.int32(bunches.shape[0]).tobytes()
+    if compact:
+        c = bunches.copy()
+        c[:, 5] = np.log10(c[:, 5])
+        c = np.round(c / cpw.eventio.COMPACT_SCALE).astype(np.int16)
+        payload += c.tobytes()
+    else:
+        payload += bunches.astype(np.float32).tobytes()
+    return make_object(
+        type=cpw.eventio.TYPE_PHOTON_BUNCHES,
+        payload=payload,
+        version=1000 if compact else 0,
+        toplevel=False,
+    )
+
+
+def make_dummy_bunches(prng, num):
+    b = np.zeros(shape=(num, 8), dtype=np.float32)
+    b[:, 0] = prng.uniform(-1e3, 1e3, size=num).round(1)
+    b[:, 1] = prng.uniform(-1e3, 1e3, size=num).round(1)
+    b[:, 2] = prng.uniform(-0.1, 0.1, size=num).round(4)
+    b[:, 3] = prng.uniform(-0.1, 0.1, size=num).round(4)
+    b[:, 4] = prng.uniform(0, 100, size=num).round(1)
+    b[:, 5] = prng.uniform(1e5, 2e6, size=num)
+    b[:, 6] = prng.uniform(0.5, 1.0, size=num).round(2)
+    b[:, 7] = prng.uniform(250, 700, size=num).round(0)
+    return b
+
+
+def write_dummy_eventio(path, events, compact=False):
+    runh = np.zeros(273, dtype=np.float32)
+    runh[cpw.I.RUNH.MARKER] = cpw.I.RUNH.MARKER_FLOAT32
+    with open(path, "wb") as f:
+        f.write(make_corsika_block(cpw.eventio.TYPE_RUNH, runh))
+        f.write(
+            make_object(
+                type=cpw.eventio.TYPE_TELESCOPE_DEFINITION,
+                payload=np.int32(1).tobytes()
+                + np.array([0, 0, 0, 1e4], dtype=np.float32).tobytes(),
+            )
+        )
+        for event_number in events:
+            evth = np.zeros(273, dtype=np.float32)
+            evth[cpw.I.EVTH.MARKER] = cpw.I.EVTH.MARKER_FLOAT32
+            evth[cpw.I.EVTH.EVENT_NUMBER] = event_number
+            f.write(make_corsika_block(cpw.eventio.TYPE_EVTH, evth))
+            f.write(
+                make_object(
+                    type=cpw.eventio.TYPE_ARRAY_OFFSETS,
+                    payload=np.int32(1).tobytes()
+                    + np.array([0, 0, 0], dtype=np.float32).tobytes(),
+                )
+            )
+            telescope_data = b""
+            for bunches in events[event_number]:
+                telescope_data += make_photon_bunches(bunches, compact)
+            f.write(
+                make_object(
+                    type=cpw.eventio.TYPE_TELESCOPE_DATA,
+                    payload=telescope_data,
+                    only_subobjects=True,
+                )
+            )
+            evte = np.zeros(273, dtype=np.float32)
+            f.write(make_corsika_block(cpw.eventio.TYPE_EVTE, evte))
+        rune = np.zeros(273, dtype=np.float32)
+        f.write(make_corsika_block(cpw.eventio.TYPE_RUNE, rune))
+
+
+def make_dummy_events(prng, num_events, num_telescopes):
+    events = {}
+    for event_number in range(1, num_events + 1):
+        events[event_number] = [
+            make_dummy_bunches(prng, int(prng.integers(0, 100)))
+            for tel in range(num_telescopes)
+        ]
+    return events
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_read_dummy_eventio(debug_dir, compact):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(13))
+    events = make_dummy_events(prng, num_events=5, num_telescopes=2)
+    path = os.path.join(tmp.name, "run{:d}.eventio".format(int(compact)))
+    write_dummy_eventio(path=path, events=events, compact=compact)
+
+    with cpw.eventio.RunReader(path) as run:
+        assert run.runh[cpw.I.RUNH.MARKER] == cpw.I.RUNH.MARKER_FLOAT32
+        event_numbers = []
+        for evth, bunch_reader in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            event_numbers.append(event_number)
+            blocks = [block for block in bunch_reader]
+            assert bunch_reader.evte is not None
+            assert len(blocks) == len(events[event_number])
+            for block, expected in zip(blocks, events[event_number]):
+                assert block.shape == expected.shape
+                if compact:
+                    np.testing.assert_allclose(
+                        block[:, [0, 1, 4, 7]],
+                        expected[:, [0, 1, 4, 7]],
+                        rtol=1e-6,
+                    )
+                    np.testing.assert_allclose(
+                        block[:, 5], expected[:, 5], rtol=2e-3
+                    )
+                else:
+                    np.testing.assert_array_equal(block, expected)
+        assert event_numbers == [1, 2, 3, 4, 5]
+        assert run.rune is not None
+        np.testing.assert_array_equal(
+            run.telescope_positions, [[0, 0, 0, 1e4]]
+        )
+    tmp.cleanup_when_no_debug()
+
+
+def test_skip_unread_events(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(14))
+    events = make_dummy_events(prng, num_events=4, num_telescopes=3)
+    path = os.path.join(tmp.name, "run.eventio")
+    write_dummy_eventio(path=path, events=events)
+
+    with cpw.eventio.RunReader(path) as run:
+        event_numbers = [int(evth[cpw.I.EVTH.EVENT_NUMBER]) for evth, _ in run]
+    assert event_numbers == [1, 2, 3, 4]
+    tmp.cleanup_when_no_debug()
+
+
+def test_vanilla_eventio_num_bunches(corsika_vanilla_path, debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    seed = cpw.random.seed.make_simple_seed(seed=1)
+    card = "\n".join(
+        [
+            "RUNNR 1",
+            "EVTNR 1",
+            "NSHOW 3",
+            "PRMPAR 1",
+            "ESLOPE 0",
+            "ERANGE 1.337 1.337",
+            "THETAP 0. 0.",
+            "PHIP 0. 0.",
+            "VIEWCONE 0 0",
+        ]
+        + [
+            "SEED {:d} {:d} {:d}".format(s["SEED"], s["CALLS"], s["BILLIONS"])
+            for s in seed
+        ]
+        + [
+            "OBSLEV 230000.0",
+            "FIXCHI 0.",
+            "MAGNET 1.250e+01 -2.590e+01",
+            "ELMFLG T T",
+            "MAXPRT 1",
+            "PAROUT F F",
+            "TELESCOPE 0 0 0 1000000.0",
+            "ATMOSPHERE 10 T",
+            "CWAVLG 250 700",
+            "CSCAT 1 0 0",
+            "CERQEF F T F",
+            "CERSIZ 1.",
+            "CERFIL F",
+            "TSTART T",
+            "EXIT",
+        ]
+    )
+    path = os.path.join(tmp.name, "vanilla.eventio")
+    cpw.corsika_vanilla(
+        corsika_path=corsika_vanilla_path,
+        steering_card=card,
+        cherenkov_output_path=path,
+    )
+    with open(path + ".stdout", "rt") as f:
+        num_bunches = cpw.testing.parse_num_bunches_from_corsika_stdout(
+            stdout=f.read()
+        )
+
+    with cpw.eventio.RunReader(path) as run:
+        for i, (evth, bunch_reader) in enumerate(run):
+            bunches = np.vstack([b for b in bunch_reader])
+            assert bunches.shape[0] == num_bunches[i]
+    tmp.cleanup_when_no_debug()
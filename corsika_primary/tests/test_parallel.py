@@ -0,0 +1,79 @@
+import pytest
+import os
+import copy
+import corsika_primary as cpw
+import inspect
+import numpy as np
+
+f8 = np.float64
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_steering_dicts(num_runs):
+    steering_dicts = {}
+    for run_id in np.arange(1, num_runs + 1):
+        run_id = int(run_id)
+        ste = copy.deepcopy(cpw.steering.EXAMPLE)
+        ste["run"]["run_id"] = np.int64(run_id)
+        ste["run"]["random_seed"] = cpw.random.seed.make_simple_seed(
+            seed=run_id
+        )
+        ste["primaries"] = ste["primaries"][0 : 1 + run_id % 3]
+        steering_dicts[run_id] = ste
+    return steering_dicts
+
+
+def test_jobs_longest_first(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    steering_dicts = make_steering_dicts(num_runs=7)
+    jobs = cpw.parallel.make_jobs(
+        steering_dicts=steering_dicts, out_dir=tmp.name
+    )
+    assert len(jobs) == len(steering_dicts)
+    costs = [job["cost"] for job in jobs]
+    assert costs == sorted(costs, reverse=True)
+
+    cherenkov_output_paths = set(
+        [job["cherenkov_output_path"] for job in jobs]
+    )
+    assert len(cherenkov_output_paths) == len(jobs)
+
+    tmp.cleanup_when_no_debug()
+
+
+def test_run_steerings(corsika_primary_path, debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    steering_dicts = make_steering_dicts(num_runs=4)
+    steerings_path = os.path.join(tmp.name, "steerings.tar")
+    cpw.steering.write_steerings(path=steerings_path, runs=steering_dicts)
+
+    results = cpw.parallel.run_steerings(
+        steerings_path=steerings_path,
+        out_dir=os.path.join(tmp.name, "out"),
+        num_workers=2,
+        corsika_path=corsika_primary_path,
+    )
+    assert set(results.keys()) == set(steering_dicts.keys())
+    for run_id in results:
+        result = results[run_id]
+        assert result["error"] is None
+        assert result["returncode"] == 0
+        assert result["end_of_run"]
+        assert os.path.exists(result["cherenkov_output_path"])
+
+    tmp.cleanup_when_no_debug()
@@ -1,3 +1,4 @@
+import pytest
 import corsika_primary as cpw
 import os
 from importlib import resources as importlib_resources
@@ -124,3 +125,20 @@ def test_parsing_random_state_proton():
         for seq in range(cpw.random.seed.NUM_RANDOM_SEQUENCES):
             for key in ["SEED", "CALLS", "BILLIONS"]:
                 assert events[evt][seq][key] == expected_events[evt][seq][key]
+
+
+def test_parsing_random_state_asserts_no_event_is_missing():
+    path = os.path.join(resource_dir, "example_vanilla_corsika.stdout")
+    with open(path, "rt") as f:
+        lines = f.read().split("\n")
+    markers = [
+        i
+        for i in range(len(lines))
+        if "AND RANDOM NUMBER GENERATOR AT BEGIN OF EVENT" in lines[i]
+    ]
+    assert len(markers) > 2
+    lines.pop(markers[1])
+    with pytest.raises(AssertionError):
+        cpw.testing.parse_random_seeds_from_corsika_stdout(
+            stdout="\n".join(lines)
+        )
@@ -0,0 +1,194 @@
+import pytest
+import os
+import copy
+import tarfile
+import threading
+import numpy as np
+import corsika_primary as cpw
+import inspect
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def test_primary_stream_writer(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    path = os.path.join(tmp.name, "primaries.x5.float64")
+    os.mkfifo(path)
+
+    primaries = cpw.steering.EXAMPLE["primaries"]
+    stream = cpw.primary_stream.PrimaryStreamWriter(
+        path=path, max_num_primaries=len(primaries)
+    )
+    for i in range(len(primaries) - 1):
+        stream.push(primaries[i])
+    assert not stream.is_exhausted()
+
+    with open(path, "rb") as f:
+        stream.push(primaries[-1])
+        assert stream.is_exhausted()
+        primary_bytes = f.read()
+    stream.join()
+    assert stream.error is None
+
+    back = cpw.steering.primary_bytes_to_dicts(primary_bytes)
+    assert len(back) == len(primaries)
+    for i in range(len(primaries)):
+        for key in primaries[i]:
+            assert back[i][key] == primaries[i][key]
+
+    with pytest.raises(AssertionError):
+        stream.push(primaries[0])
+
+    tmp.cleanup_when_no_debug()
+
+
+def test_primary_stream_writer_aborts_when_fifo_is_never_opened(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    path = os.path.join(tmp.name, "primaries.x5.float64")
+    os.mkfifo(path)
+
+    stream = cpw.primary_stream.PrimaryStreamWriter(
+        path=path, max_num_primaries=1
+    )
+    stream.push(cpw.steering.EXAMPLE["primaries"][0])
+    stream.join(timeout=0.2)
+    assert stream.thread.is_alive()
+
+    stream.abort()
+    stream.join(timeout=10)
+    assert not stream.thread.is_alive()
+    assert isinstance(stream.error, RuntimeError)
+    tmp.cleanup_when_no_debug()
+
+
+def tar_member_bytes(name, payload):
+    tarinfo = tarfile.TarInfo(name)
+    tarinfo.size = len(payload)
+    padding = (tarfile.BLOCKSIZE - len(payload)) % tarfile.BLOCKSIZE
+    return tarinfo.tobuf() + payload + padding * b"\0"
+
+
+def make_header(marker, run_number, event_number=0):
+    head = np.zeros(273, dtype=np.float32)
+    head[0] = np.frombuffer(marker, dtype=np.float32)[0]
+    if marker == b"RUNH":
+        head[cpw.I.RUNH.RUN_NUMBER] = run_number
+    else:
+        head[cpw.I.EVTH.EVENT_NUMBER] = event_number
+        head[cpw.I.EVTH.RUN_NUMBER] = run_number
+    return head
+
+
+def test_event_ends_with_evte_before_next_evth(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    path = os.path.join(tmp.name, "cer.tar")
+    os.mkfifo(path)
+    prng = np.random.Generator(np.random.PCG64(1))
+    bunches = {
+        e: prng.uniform(size=(10 * e, 8)).astype(np.float32) for e in [1, 2]
+    }
+    next_primary_pushed = threading.Event()
+    wrote_next_event = threading.Event()
+
+    def event_members(event_number):
+        eventdir = "000000001/{:09d}/".format(event_number)
+        return (
+            tar_member_bytes(
+                eventdir + "EVTH.float32",
+                make_header(b"EVTH", 1, event_number).tobytes(),
+            )
+            + tar_member_bytes(
+                eventdir + "000000001.cer.x8.float32",
+                bunches[event_number].tobytes(),
+            )
+            + tar_member_bytes(
+                eventdir + "EVTE.float32",
+                make_header(b"EVTE", 1, event_number).tobytes(),
+            )
+        )
+
+    def corsika():
+        # Like CORSIKA waiting for the next primary after an event.
+        with open(path, "wb", buffering=0) as f:
+            f.write(
+                tar_member_bytes(
+                    "000000001/RUNH.float32", make_header(b"RUNH", 1).tobytes()
+                )
+            )
+            f.write(event_members(1))
+            next_primary_pushed.wait(timeout=10)
+            wrote_next_event.set()
+            f.write(event_members(2))
+            f.write(2 * tarfile.BLOCKSIZE * b"\0")
+
+    thread = threading.Thread(target=corsika, daemon=True)
+    thread.start()
+
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        evth, _ = next(run)
+        assert evth[cpw.I.EVTH.EVENT_NUMBER] == 1
+        np.testing.assert_array_equal(run.read_event_payload(), bunches[1])
+        assert not wrote_next_event.is_set()
+
+        next_primary_pushed.set()
+        evth, _ = next(run)
+        assert evth[cpw.I.EVTH.EVENT_NUMBER] == 2
+        np.testing.assert_array_equal(run.read_event_payload(), bunches[2])
+        with pytest.raises(StopIteration):
+            next(run)
+    thread.join()
+    tmp.cleanup_when_no_debug()
+
+
+def test_push_primaries_while_run_is_live(debug_dir, corsika_primary_path):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    steering_dict = copy.deepcopy(cpw.steering.EXAMPLE)
+    primaries = steering_dict["primaries"]
+    steering_dict["primaries"] = primaries[0:1]
+
+    run_path = os.path.join(tmp.name, "run")
+    with cpw.CorsikaPrimary(
+        corsika_path=corsika_primary_path,
+        steering_dict=steering_dict,
+        stdout_path=run_path + ".o",
+        stderr_path=run_path + ".e",
+        particle_output_path=run_path + ".par.dat",
+        max_num_primaries=len(primaries),
+    ) as run:
+        for i in range(len(primaries)):
+            evth, cer_reader = next(run)
+            assert evth[cpw.I.EVTH.EVENT_NUMBER] == i + 1
+            # The event is complete before the next primary is pushed.
+            for cer_block in cer_reader:
+                assert cer_block.shape[1] == 8
+            if i + 1 < len(primaries):
+                with pytest.raises(RuntimeError):
+                    next(run)
+                run.push_primary(primaries[i + 1])
+
+        with pytest.raises(StopIteration):
+            next(run)
+
+    assert run.exit_ok
+
+    tmp.cleanup_when_no_debug()
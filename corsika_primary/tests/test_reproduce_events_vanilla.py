@@ -15,22 +15,14 @@ def corsika_vanilla_path(pytestconfig):
     return pytestconfig.getoption("corsika_vanilla_path")
 
 
-@pytest.fixture()
-def merlict_eventio_converter(pytestconfig):
-    return pytestconfig.getoption("merlict_eventio_converter")
-
-
 @pytest.fixture()
 def debug_dir(pytestconfig):
     return pytestconfig.getoption("debug_dir")
 
 
-def hash_cherenkov_pools(
-    steering_card, tmp_dir, corsika_vanilla_path, merlict_eventio_converter
-):
+def hash_cherenkov_pools(steering_card, tmp_dir, corsika_vanilla_path):
     os.makedirs(tmp_dir, exist_ok=True)
     eventio_path = os.path.join(tmp_dir, "eventio")
-    simpelio_path = os.path.join(tmp_dir, "simpleio")
     hashes_path = os.path.join(tmp_dir, "cherenkov_pool_md5_hashes.csv")
     seeds_path = os.path.join(tmp_dir, "seeds.csv")
     card_path = os.path.join(tmp_dir, "steering_card.txt")
@@ -47,18 +39,12 @@ def hash_cherenkov_pools(
             stdout_path=eventio_path + ".stdout",
             stderr_path=eventio_path + ".stderr",
         )
-        cpw.testing.eventio_to_simpleio(
-            merlict_eventio_converter=merlict_eventio_converter,
-            eventio_path=eventio_path,
-            simpleio_path=simpelio_path,
-        )
-        run = cpw.testing.SimpleIoRun(path=simpelio_path)
-
-        for event in run:
-            evth, bunches = event
-            event_id = int(evth[cpw.I.EVTH.EVENT_NUMBER])
-            hashes[event_id] = hashlib.md5(bunches.tobytes()).hexdigest()
-            seeds[event_id] = cpw.random.seed.parse_seed_from_evth(evth)
+        with cpw.eventio.RunReader(eventio_path) as run:
+            for evth, bunch_reader in run:
+                bunches = cpw.testing.read_all_blocks(bunch_reader)
+                event_id = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+                hashes[event_id] = hashlib.md5(bunches.tobytes()).hexdigest()
+                seeds[event_id] = cpw.random.seed.parse_seed_from_evth(evth)
 
         cpw.testing.write_hashes(path=hashes_path, hashes=hashes)
         cpw.testing.write_seeds(path=seeds_path, seeds=seeds)
@@ -71,7 +57,6 @@ def hash_cherenkov_pools(
 
 def test_reproduce_events_vanilla(
     corsika_vanilla_path,
-    merlict_eventio_converter,
     debug_dir,
 ):
     tmp = cpw.testing.TmpDebugDir(
@@ -182,7 +167,6 @@ def test_reproduce_events_vanilla(
             steering_card=full_card,
             tmp_dir=full_dir,
             corsika_vanilla_path=corsika_vanilla_path,
-            merlict_eventio_converter=merlict_eventio_converter,
         )
 
         repr_hashes = {}
@@ -212,7 +196,6 @@ def test_reproduce_events_vanilla(
                 steering_card=part_card,
                 tmp_dir=part_dir,
                 corsika_vanilla_path=corsika_vanilla_path,
-                merlict_eventio_converter=merlict_eventio_converter,
             )
             repr_hashes[event_id] = part_hashes[event_id]
 
@@ -243,7 +226,6 @@ def test_reproduce_events_vanilla(
             "tar",
             "-C",
             os.path.join(tmp.name),
-            "--exclude=simpleio",
             "--exclude=eventio",
             "--exclude=eventio.stderr",
             "-cvf",
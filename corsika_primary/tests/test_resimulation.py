@@ -0,0 +1,149 @@
+import pytest
+import os
+import copy
+import corsika_primary as cpw
+import inspect
+import numpy as np
+
+i8 = np.int64
+f8 = np.float64
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_steering_dict(run_id, num_primaries):
+    ste = copy.deepcopy(cpw.steering.EXAMPLE)
+    ste["run"]["run_id"] = i8(run_id)
+    ste["run"]["random_seed"] = cpw.random.seed.make_simple_seed(run_id)
+    ste["primaries"] = []
+    for i in range(num_primaries):
+        prm = copy.deepcopy(cpw.steering.EXAMPLE["primaries"][0])
+        prm["energy_GeV"] = f8(1.0 + 0.25 * i)
+        ste["primaries"].append(prm)
+    return ste
+
+
+def write_dummy_tape(path, steering_dict):
+    run_number = int(steering_dict["run"]["run_id"])
+    first = int(steering_dict["run"]["event_id_of_first_event"])
+    runh = np.zeros(273, dtype=np.float32)
+    runh[cpw.I.RUNH.MARKER] = cpw.I.RUNH.MARKER_FLOAT32
+    runh[cpw.I.RUNH.RUN_NUMBER] = np.float32(run_number)
+    with cpw.cherenkov.CherenkovEventTapeWriter(path=path) as tape:
+        tape.write_runh(runh)
+        for i, primary in enumerate(steering_dict["primaries"]):
+            evth = np.zeros(273, dtype=np.float32)
+            evth[cpw.I.EVTH.MARKER] = cpw.I.EVTH.MARKER_FLOAT32
+            evth[cpw.I.EVTH.RUN_NUMBER] = np.float32(run_number)
+            evth[cpw.I.EVTH.EVENT_NUMBER] = np.float32(first + i)
+            evth[cpw.I.EVTH.PARTICLE_ID] = primary["particle_id"]
+            evth[cpw.I.EVTH.TOTAL_ENERGY_GEV] = primary["energy_GeV"]
+            evth[cpw.I.EVTH.NUM_DIFFERENT_RANDOM_SEQUENCES] = 4
+            for seq in range(1, 5):
+                evth[cpw.I.EVTH.RANDOM_SEED(sequence=seq)] = 10 * i + seq
+            tape.write_evth(evth)
+            tape.write_payload(np.ones(shape=(10, 8), dtype=np.float32))
+
+
+def test_group_event_numbers():
+    g = cpw.resimulation.group_event_numbers
+    assert g([]) == []
+    assert g([5, 3, 4, 4, 9]) == [(3, 5), (9, 9)]
+    assert g([1, 3, 9], max_gap=1) == [(1, 3), (9, 9)]
+    assert g([1, 3, 9], max_gap=5) == [(1, 9)]
+
+
+def test_make_jobs(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    steering_dicts = {}
+    paths = {}
+    for run_id in [3, 4]:
+        steering_dicts[run_id] = make_steering_dict(run_id, num_primaries=10)
+        paths[run_id] = os.path.join(tmp.name, "{:d}.tar".format(run_id))
+        write_dummy_tape(
+            path=paths[run_id], steering_dict=steering_dicts[run_id]
+        )
+
+    requests = [(paths[3], 2), (paths[3], 3), (paths[3], 8), (paths[4], 10)]
+    jobs = cpw.resimulation.make_jobs(
+        requests=requests,
+        steering_dicts=steering_dicts,
+        out_dir=tmp.name,
+    )
+    assert len(jobs) == 3
+    costs = [job["cost"] for job in jobs]
+    assert costs == sorted(costs, reverse=True)
+
+    jobs = {(job["tape_path"], job["event_numbers"][0]): job for job in jobs}
+    job = jobs[(paths[3], 2)]
+    assert job["event_numbers"] == [2, 3]
+    ste = job["steering_dict"]
+    assert ste["run"]["event_id_of_first_event"] == 2
+    assert ste["run"]["random_seed"][0]["SEED"] == 10 * 1 + 1
+    assert ste["primaries"] == steering_dicts[3]["primaries"][1:3]
+
+    job = jobs[(paths[4], 10)]
+    assert job["event_numbers"] == [10]
+    assert len(job["steering_dict"]["primaries"]) == 1
+
+    with pytest.raises(AssertionError):
+        cpw.resimulation.make_jobs(
+            requests=[(paths[3], 11)],
+            steering_dicts=steering_dicts,
+            out_dir=tmp.name,
+        )
+    tmp.cleanup_when_no_debug()
+
+
+def test_resimulate_events(corsika_primary_path, debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    ste = make_steering_dict(run_id=5, num_primaries=8)
+    path = os.path.join(tmp.name, "run.tar")
+    cpw.corsika_primary(
+        steering_dict=ste,
+        cherenkov_output_path=path,
+        particle_output_path=path + ".par.dat",
+        corsika_path=corsika_primary_path,
+    )
+    original = {}
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        for evth, cer_reader in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            original[event_number] = np.vstack([b for b in cer_reader])
+
+    requests = [(path, 2), (path, 3), (path, 7)]
+    results = cpw.resimulation.run(
+        requests=requests,
+        steering_dicts={5: ste},
+        out_dir=os.path.join(tmp.name, "resimulation"),
+        num_workers=2,
+        corsika_path=corsika_primary_path,
+    )
+    event_numbers = []
+    for (
+        tape_path,
+        event_number,
+        evth,
+        bunches,
+        particles,
+    ) in cpw.resimulation.iter_events(results):
+        assert tape_path == path
+        np.testing.assert_array_equal(bunches, original[event_number])
+        assert particles.shape[1] == 7
+        event_numbers.append(event_number)
+    assert sorted(event_numbers) == [2, 3, 7]
+    tmp.cleanup_when_no_debug()
@@ -0,0 +1,261 @@
+import pytest
+import os
+import copy
+import hashlib
+import tarfile
+import corsika_primary as cpw
+import inspect
+import numpy as np
+
+i8 = np.int64
+f8 = np.float64
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_steering_dict(run_id, num_primaries, event_id_of_first_event=1):
+    ste = copy.deepcopy(cpw.steering.EXAMPLE)
+    ste["run"]["run_id"] = i8(run_id)
+    ste["run"]["event_id_of_first_event"] = i8(event_id_of_first_event)
+    ste["primaries"] = []
+    for i in range(num_primaries):
+        prm = copy.deepcopy(cpw.steering.EXAMPLE["primaries"][0])
+        prm["energy_GeV"] = f8(1.0 + 0.1 * i)
+        ste["primaries"].append(prm)
+    return ste
+
+
+def make_dummy_evth(prng, run_number, event_number):
+    evth = prng.uniform(low=0, high=1, size=273).astype(np.float32)
+    evth[cpw.I.EVTH.MARKER] = cpw.I.EVTH.MARKER_FLOAT32
+    evth[cpw.I.EVTH.RUN_NUMBER] = np.float32(run_number)
+    evth[cpw.I.EVTH.EVENT_NUMBER] = np.float32(event_number)
+    evth[cpw.I.EVTH.NUM_DIFFERENT_RANDOM_SEQUENCES] = np.float32(4)
+    for seq in range(1, 5):
+        evth[cpw.I.EVTH.RANDOM_SEED(sequence=seq)] = np.float32(
+            100 * event_number + seq
+        )
+        evth[cpw.I.EVTH.RANDOM_SEED_CALLS(sequence=seq)] = np.float32(seq)
+        evth[cpw.I.EVTH.RANDOM_SEED_MILLIONS(sequence=seq)] = np.float32(0)
+    return evth
+
+
+def write_dummy_tape(path, run_number, event_numbers, num_bunches=1000):
+    prng = np.random.Generator(np.random.PCG64(run_number))
+    runh = prng.uniform(low=0, high=1, size=273).astype(np.float32)
+    runh[cpw.I.RUNH.MARKER] = cpw.I.RUNH.MARKER_FLOAT32
+    runh[cpw.I.RUNH.RUN_NUMBER] = np.float32(run_number)
+    events = {}
+    with cpw.cherenkov.CherenkovEventTapeWriter(path=path) as tape:
+        tape.write_runh(runh)
+        for event_number in event_numbers:
+            evth = make_dummy_evth(prng, run_number, event_number)
+            bunches = prng.uniform(size=(num_bunches, 8)).astype(np.float32)
+            tape.write_evth(evth)
+            tape.write_payload(bunches)
+            events[event_number] = (evth, bunches)
+    return events
+
+
+def read_tape(path):
+    events = {}
+    with cpw.cherenkov.CherenkovEventTapeReader(path) as run:
+        for evth, cer_reader in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            events[event_number] = (evth, np.vstack([b for b in cer_reader]))
+    return events
+
+
+def payload_offset(path, event_number):
+    with tarfile.open(path, "r") as tar:
+        for tarinfo in tar:
+            if str.endswith(tarinfo.name, cpw.cherenkov.CHERENKOV_SUFFIX):
+                if cpw.event_tape.parse_event_number(tarinfo.name) == (
+                    event_number
+                ):
+                    return tarinfo.offset_data
+
+
+def truncate(path, num_bytes):
+    with open(path, "rb+") as f:
+        f.truncate(num_bytes)
+
+
+def test_complete_tape_needs_no_resume(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    path = os.path.join(tmp.name, "cer.tar")
+    ste = make_steering_dict(run_id=7, num_primaries=5)
+    write_dummy_tape(path=path, run_number=7, event_numbers=[1, 2, 3, 4, 5])
+
+    assert cpw.resume.tape_has_end_of_archive(path)
+    assert cpw.resume.find_resume_point(path, ste) is None
+    tmp.cleanup_when_no_debug()
+
+
+def test_missing_tape_resumes_at_first_event(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    path = os.path.join(tmp.name, "cer.tar")
+    ste = make_steering_dict(
+        run_id=7, num_primaries=5, event_id_of_first_event=3
+    )
+
+    point = cpw.resume.find_resume_point(path, ste)
+    assert point["event_number"] == 3
+    assert point["random_seed"] == ste["run"]["random_seed"]
+
+    with open(path, "wb") as f:
+        f.write(b"\x00" * 100)
+    point = cpw.resume.find_resume_point(path, ste)
+    assert point["event_number"] == 3
+    tmp.cleanup_when_no_debug()
+
+
+def test_truncated_tape_resumes_at_last_evth(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    path = os.path.join(tmp.name, "cer.tar")
+    ste = make_steering_dict(run_id=7, num_primaries=6)
+    events = write_dummy_tape(
+        path=path, run_number=7, event_numbers=[1, 2, 3, 4, 5, 6]
+    )
+    # cut into the payload of event 4
+    truncate(path, payload_offset(path=path, event_number=4) + 100)
+
+    point = cpw.resume.find_resume_point(path, ste)
+    assert point["event_number"] == 4
+    assert point["random_seed"] == cpw.random.seed.parse_seed_from_evth(
+        events[4][0]
+    )
+
+    resume_ste = cpw.resume.make_resume_steering_dict(ste, point)
+    assert resume_ste["run"]["event_id_of_first_event"] == 4
+    assert resume_ste["run"]["random_seed"] == point["random_seed"]
+    assert resume_ste["primaries"] == ste["primaries"][3:]
+    tmp.cleanup_when_no_debug()
+
+
+def test_splice(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    partial_path = os.path.join(tmp.name, "partial.tar")
+    resumed_path = os.path.join(tmp.name, "resumed.tar")
+    out_path = os.path.join(tmp.name, "out.tar")
+
+    partial = write_dummy_tape(
+        path=partial_path, run_number=7, event_numbers=[1, 2, 3, 4]
+    )
+    truncate(partial_path, os.stat(partial_path).st_size // 2)
+    resumed = write_dummy_tape(
+        path=resumed_path, run_number=7, event_numbers=[2, 3, 4, 5]
+    )
+
+    cpw.resume.splice(
+        partial_path=partial_path,
+        resumed_path=resumed_path,
+        out_path=out_path,
+        event_number=2,
+    )
+    out = read_tape(out_path)
+    assert list(out.keys()) == [1, 2, 3, 4, 5]
+    np.testing.assert_array_equal(out[1][1], partial[1][1])
+    for event_number in [2, 3, 4, 5]:
+        np.testing.assert_array_equal(
+            out[event_number][0], resumed[event_number][0]
+        )
+        np.testing.assert_array_equal(
+            out[event_number][1], resumed[event_number][1]
+        )
+    tmp.cleanup_when_no_debug()
+
+
+def test_splice_does_not_copy_truncated_member(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    partial_path = os.path.join(tmp.name, "partial.tar")
+    resumed_path = os.path.join(tmp.name, "resumed.tar")
+    out_path = os.path.join(tmp.name, "out.tar")
+
+    write_dummy_tape(path=partial_path, run_number=7, event_numbers=[1, 2, 3])
+    # cut into the payload of event 3
+    truncate(
+        partial_path, payload_offset(path=partial_path, event_number=3) + 100
+    )
+    write_dummy_tape(path=resumed_path, run_number=7, event_numbers=[4, 5])
+
+    cpw.resume.splice(
+        partial_path=partial_path,
+        resumed_path=resumed_path,
+        out_path=out_path,
+        event_number=4,
+    )
+    names = []
+    with tarfile.open(out_path, "r") as tar:
+        for tarinfo in tar:
+            names.append(tarinfo.name)
+            if tarinfo.isfile():
+                data = tar.extractfile(tarinfo).read()
+                assert len(data) == tarinfo.size
+    assert "000000007/000000003/EVTH.float32" in names
+    assert not any(
+        str.startswith(name, "000000007/000000003/000000")
+        and str.endswith(name, cpw.cherenkov.CHERENKOV_SUFFIX)
+        for name in names
+    )
+    assert "000000007/000000004/EVTH.float32" in names
+    tmp.cleanup_when_no_debug()
+
+
+def test_resume_reproduces_run(corsika_primary_path, debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    ste = make_steering_dict(run_id=3, num_primaries=8)
+    complete_path = os.path.join(tmp.name, "complete.tar")
+    partial_path = os.path.join(tmp.name, "partial.tar")
+
+    cpw.corsika_primary(
+        steering_dict=ste,
+        cherenkov_output_path=complete_path,
+        particle_output_path=complete_path + ".par.dat",
+        corsika_path=corsika_primary_path,
+    )
+    with open(complete_path, "rb") as fin, open(partial_path, "wb") as fout:
+        fout.write(fin.read(os.stat(complete_path).st_size // 2))
+
+    point = cpw.resume.resume(
+        steering_dict=ste,
+        cherenkov_output_path=partial_path,
+        particle_output_path=partial_path + ".par.dat",
+        corsika_path=corsika_primary_path,
+    )
+    assert point is not None
+
+    complete = read_tape(complete_path)
+    resumed = read_tape(partial_path)
+    assert list(resumed.keys()) == list(complete.keys())
+    for event_number in complete:
+        a = hashlib.md5(complete[event_number][1].tobytes()).hexdigest()
+        b = hashlib.md5(resumed[event_number][1].tobytes()).hexdigest()
+        assert a == b
+    tmp.cleanup_when_no_debug()
@@ -0,0 +1,83 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_dummy_run_dir(run_dir):
+    os.makedirs(os.path.join(run_dir, "tables"), exist_ok=True)
+    with open(os.path.join(run_dir, "corsika75600Linux"), "wt") as f:
+        f.write("executable")
+    with open(os.path.join(run_dir, "QGSDAT01"), "wt") as f:
+        f.write("hadronic-model-table")
+    with open(os.path.join(run_dir, "tables", "atmprof10.dat"), "wt") as f:
+        f.write("atmosphere")
+    primary_path = os.path.join(
+        run_dir, cpw.steering.PRIMARY_BYTES_FILENAME_IN_CORSIKA_RUN_DIR
+    )
+    with open(primary_path, "wt") as f:
+        f.write("left over from an earlier run")
+
+
+def test_make_run_dir(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    src_run_dir = os.path.join(tmp.name, "run")
+    make_dummy_run_dir(run_dir=src_run_dir)
+
+    for mode in cpw.sandbox.MODES:
+        dst_run_dir = os.path.join(tmp.name, mode, "run")
+        cpw.sandbox.make_run_dir(
+            src_run_dir=src_run_dir,
+            dst_run_dir=dst_run_dir,
+            mode=mode,
+        )
+        for relpath in ["corsika75600Linux", "QGSDAT01"]:
+            with open(os.path.join(dst_run_dir, relpath), "rt") as f:
+                assert len(f.read()) > 0
+        with open(os.path.join(dst_run_dir, "tables", "atmprof10.dat")) as f:
+            assert f.read() == "atmosphere"
+
+        primary_path = os.path.join(
+            dst_run_dir, cpw.steering.PRIMARY_BYTES_FILENAME_IN_CORSIKA_RUN_DIR
+        )
+        assert not os.path.exists(primary_path)
+
+        if mode == "symlink":
+            assert os.path.islink(os.path.join(dst_run_dir, "QGSDAT01"))
+        if mode == "hardlink":
+            st = os.stat(os.path.join(dst_run_dir, "QGSDAT01"))
+            assert st.st_nlink >= 2
+
+    tmp.cleanup_when_no_debug()
+
+
+def test_stage(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    src_run_dir = os.path.join(tmp.name, "run")
+    make_dummy_run_dir(run_dir=src_run_dir)
+    corsika_path = os.path.join(src_run_dir, "corsika75600Linux")
+
+    stage_dir = os.path.join(tmp.name, "stage")
+    staged_path = cpw.sandbox.stage(
+        corsika_path=corsika_path, stage_dir=stage_dir
+    )
+    assert os.path.isfile(staged_path)
+    assert os.path.dirname(os.path.dirname(staged_path)) == stage_dir
+
+    staged_path_again = cpw.sandbox.stage(
+        corsika_path=corsika_path, stage_dir=stage_dir
+    )
+    assert staged_path_again == staged_path
+
+    tmp.cleanup_when_no_debug()
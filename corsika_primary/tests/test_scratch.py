@@ -0,0 +1,154 @@
+import pytest
+import os
+import copy
+import corsika_primary as cpw
+import inspect
+import shutil
+import collections
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def test_estimate_footprint():
+    steering_dict = copy.deepcopy(cpw.steering.EXAMPLE)
+    small = cpw.scratch.estimate_footprint_num_bytes(steering_dict)
+    steering_dict["primaries"].append(steering_dict["primaries"][0])
+    large = cpw.scratch.estimate_footprint_num_bytes(steering_dict)
+    assert large > small > cpw.scratch.RUN_BASE_NUM_BYTES
+    assert cpw.scratch.estimate_footprint_num_bytes(
+        steering_dict, run_dir_num_bytes=10
+    ) == (large + 10)
+    assert (
+        cpw.scratch.estimate_footprint_num_bytes(
+            steering_dict, particle_output_num_bytes_per_GeV=0
+        )
+        == cpw.scratch.RUN_BASE_NUM_BYTES
+    )
+
+
+def test_no_reservation_for_particle_output_elsewhere(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    steering_dict = copy.deepcopy(cpw.steering.EXAMPLE)
+    scratch = cpw.scratch.Scratch(
+        locations=[tmp.name], particle_output_num_bytes_per_GeV=123
+    )
+    kwargs = {
+        "steering_dict": steering_dict,
+        "corsika_run_dir": tmp.name,
+        "run_dir_mode": "symlink",
+    }
+    aa = scratch.reserve_run(particle_output_in_scratch=False, **kwargs)
+    assert aa.num_bytes == cpw.scratch.RUN_BASE_NUM_BYTES
+    bb = scratch.reserve_run(**kwargs)
+    assert bb.num_bytes == cpw.scratch.estimate_footprint_num_bytes(
+        steering_dict, particle_output_num_bytes_per_GeV=123
+    )
+    assert bb.num_bytes > aa.num_bytes
+    aa.release()
+    bb.release()
+    tmp.cleanup_when_no_debug()
+
+
+def test_reserve_and_release_within_quota(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    missing = os.path.join(tmp.name, "missing")
+    location = os.path.join(tmp.name, "ssd")
+    os.makedirs(location)
+
+    scratch = cpw.scratch.Scratch(
+        locations=[missing, location], quota_num_bytes=1000
+    )
+    aa = scratch.try_reserve(num_bytes=600)
+    assert aa.location == location
+    assert scratch.try_reserve(num_bytes=600) is None
+
+    with pytest.raises(TimeoutError):
+        scratch.reserve(num_bytes=600, timeout_s=0.1, poll_interval_s=0.05)
+
+    aa.release()
+    aa.release()
+    bb = scratch.try_reserve(num_bytes=600)
+    assert bb is not None
+
+    with pytest.raises(RuntimeError):
+        scratch.try_reserve(num_bytes=2000)
+
+    bb.release()
+    with scratch.temporary_directory(
+        reservation=scratch.reserve(num_bytes=1000), prefix="run_"
+    ) as tmp_dir:
+        assert os.path.dirname(tmp_dir) == location
+        assert scratch.try_reserve(num_bytes=1) is None
+    assert not os.path.exists(tmp_dir)
+    cc = scratch.try_reserve(num_bytes=1000)
+    assert cc is not None
+    cc.release()
+
+    tmp.cleanup_when_no_debug()
+
+
+def test_reservations_of_gone_processes_are_dropped(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    scratch = cpw.scratch.Scratch(locations=[tmp.name], quota_num_bytes=1000)
+
+    pid = os.fork()
+    if pid == 0:
+        scratch.try_reserve(num_bytes=1000)
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    aa = scratch.try_reserve(num_bytes=1000)
+    assert aa is not None
+    aa.release()
+
+    tmp.cleanup_when_no_debug()
+
+
+def test_run_queues_when_others_filled_the_location(debug_dir, monkeypatch):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    Usage = collections.namedtuple("Usage", ["total", "used", "free"])
+    usage = {"free": 500}
+
+    def disk_usage(path):
+        return Usage(
+            total=10**12, used=10**12 - usage["free"], free=usage["free"]
+        )
+
+    monkeypatch.setattr(shutil, "disk_usage", disk_usage)
+    scratch = cpw.scratch.Scratch(locations=[tmp.name])
+
+    assert scratch.try_reserve(num_bytes=1000) is None
+    with pytest.raises(TimeoutError):
+        scratch.reserve(num_bytes=1000, timeout_s=0.1, poll_interval_s=0.05)
+
+    usage["free"] = 1500
+    with scratch.temporary_directory(
+        reservation=scratch.reserve(num_bytes=1000), prefix="run_"
+    ) as tmp_dir:
+        assert scratch.try_reserve(num_bytes=1000) is None
+
+        # The written part of a reservation is missing in the free space
+        # already and is not subtracted again.
+        with open(os.path.join(tmp_dir, "particles.dat"), "wb") as f:
+            f.write(b"\x00" * 600)
+        usage["free"] = 900
+        assert cpw.scratch.num_bytes_written(tmp_dir) == 600
+        bb = scratch.try_reserve(num_bytes=500)
+        assert bb is not None
+        bb.release()
+    tmp.cleanup_when_no_debug()
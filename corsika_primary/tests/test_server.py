@@ -0,0 +1,93 @@
+import pytest
+import os
+import socket
+import threading
+import corsika_primary as cpw
+import inspect
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def test_frames():
+    aa, bb = socket.socketpair()
+    payloads = [b"", b"abc", bytes(3 * cpw.server.CHUNK_NUM_BYTES + 7)]
+    with aa, bb:
+        sender = threading.Thread(
+            target=lambda: [
+                cpw.server.send_frame(sock=aa, payload=p) for p in payloads
+            ]
+        )
+        sender.start()
+        for payload in payloads:
+            assert cpw.server.recv_frame(sock=bb) == payload
+        sender.join()
+        aa.close()
+        with pytest.raises(EOFError):
+            cpw.server.recv_frame(sock=bb)
+
+
+def test_steering_bytes():
+    steering_dict = cpw.steering.EXAMPLE
+    back = cpw.steering.steering_bytes_to_dict(
+        cpw.steering.steering_dict_to_bytes(steering_dict)
+    )
+    for key in steering_dict["run"]:
+        assert str(back["run"][key]) == str(steering_dict["run"][key])
+    assert len(back["primaries"]) == len(steering_dict["primaries"])
+    for i in range(len(steering_dict["primaries"])):
+        for key in steering_dict["primaries"][i]:
+            assert (
+                back["primaries"][i][key] == steering_dict["primaries"][i][key]
+            )
+
+
+def test_submit_to_server(debug_dir, corsika_primary_path):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    socket_path = os.path.join(tmp.name, "corsika.sock")
+
+    with cpw.server.Server(
+        socket_path=socket_path,
+        num_workers=1,
+        corsika_path=corsika_primary_path,
+        run_dir_mode="copy",
+    ) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        for i in range(2):
+            run_path = os.path.join(tmp.name, "{:d}".format(i))
+            status = cpw.server.submit(
+                socket_path=socket_path,
+                steering_dict=cpw.steering.EXAMPLE,
+                cherenkov_output_path=run_path + ".cer.tar",
+                particle_output_path=run_path + ".par.dat",
+            )
+            assert status["returncode"] == 0
+            assert status["end_of_run"]
+            cpw.particles.assert_dat_is_valid(dat_path=run_path + ".par.dat")
+
+            with cpw.cherenkov.CherenkovEventTapeReader(
+                run_path + ".cer.tar"
+            ) as run:
+                num_events = 0
+                for evth, cer_reader in run:
+                    for cer_block in cer_reader:
+                        assert cer_block.shape[1] == 8
+                    num_events += 1
+            assert num_events == len(cpw.steering.EXAMPLE["primaries"])
+
+        server.shutdown()
+    assert not os.path.exists(socket_path)
+
+    tmp.cleanup_when_no_debug()
@@ -0,0 +1,182 @@
+import pytest
+import os
+import sys
+import copy
+import time
+import subprocess
+import multiprocessing
+import corsika_primary as cpw
+import inspect
+import numpy as np
+
+i8 = np.int64
+f8 = np.float64
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def make_steering_dict(num_primaries, event_id_of_first_event=1):
+    ste = copy.deepcopy(cpw.steering.EXAMPLE)
+    ste["run"]["event_id_of_first_event"] = i8(event_id_of_first_event)
+    prng = np.random.Generator(np.random.PCG64(42))
+    ste["primaries"] = []
+    for i in range(num_primaries):
+        prm = copy.deepcopy(cpw.steering.EXAMPLE["primaries"][0])
+        prm["energy_GeV"] = f8(prng.uniform(low=1.0, high=5.0))
+        ste["primaries"].append(prm)
+    return ste
+
+
+def test_split_covers_all_primaries_in_order():
+    ste = make_steering_dict(num_primaries=17, event_id_of_first_event=5)
+    for num_shards in [1, 2, 3, 7, 17, 100]:
+        shards = cpw.sharding.split(steering_dict=ste, num_shards=num_shards)
+        assert len(shards) == min([num_shards, 17])
+
+        primaries = []
+        next_event_id = 5
+        for shard in shards:
+            assert len(shard["primaries"]) > 0
+            assert shard["run"]["event_id_of_first_event"] == next_event_id
+            next_event_id += len(shard["primaries"])
+            primaries += shard["primaries"]
+        assert primaries == ste["primaries"]
+
+
+def test_split_balances_energy():
+    ste = make_steering_dict(num_primaries=100)
+    shards = cpw.sharding.split(steering_dict=ste, num_shards=4)
+    costs = [cpw.parallel.estimate_cost(shard) for shard in shards]
+    assert max(costs) < 1.2 * min(costs)
+
+
+def test_shard_seeds_are_valid_unique_and_reproducible():
+    ste = make_steering_dict(num_primaries=64)
+    shards_a = cpw.sharding.split(steering_dict=ste, num_shards=64)
+    shards_b = cpw.sharding.split(steering_dict=ste, num_shards=64)
+
+    seeds = set()
+    for a, b in zip(shards_a, shards_b):
+        assert a["run"]["random_seed"] == b["run"]["random_seed"]
+        for seq in a["run"]["random_seed"]:
+            assert cpw.random.seed.MIN_SEED <= seq["SEED"]
+            assert seq["SEED"] <= cpw.random.seed.MAX_SEED
+        seeds.add(int(a["run"]["random_seed"][0]["SEED"]))
+    assert len(seeds) == len(shards_a)
+
+
+def test_merger_writes_partial_tapes_until_close(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    cer_path = os.path.join(tmp.name, "cherenkov.tar")
+    par_path = os.path.join(tmp.name, "particles.tar")
+
+    merger = cpw.sharding.Merger(
+        cherenkov_output_path=cer_path, particle_output_path=par_path
+    )
+    merger.abort()
+    for path in [cer_path, par_path]:
+        assert not os.path.exists(path)
+        assert not os.path.exists(cpw.sharding.partial_path(path))
+    assert os.path.exists(cer_path + ".stdout")
+
+    merger = cpw.sharding.Merger(
+        cherenkov_output_path=cer_path, particle_output_path=par_path
+    )
+    assert os.path.exists(cpw.sharding.partial_path(cer_path))
+    merger.close()
+    for path in [cer_path, par_path]:
+        assert os.path.exists(path)
+        assert not os.path.exists(cpw.sharding.partial_path(path))
+    tmp.cleanup_when_no_debug()
+
+
+def spawn_child_and_wait(pid_path):
+    # Like a worker which runs CORSIKA.
+    child = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(60)"]
+    )
+    with open(pid_path, "wt") as f:
+        f.write(str(child.pid))
+    child.wait()
+
+
+def test_kill_process_groups_kills_children_of_workers(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    pid_path = os.path.join(tmp.name, "child.pid")
+    worker = multiprocessing.Process(
+        target=lambda: (
+            cpw.sharding._start_own_process_group(),
+            spawn_child_and_wait(pid_path),
+        )
+    )
+    worker.start()
+    for i in range(1000):
+        if os.path.exists(pid_path) and os.path.getsize(pid_path) > 0:
+            break
+        time.sleep(0.01)
+    with open(pid_path, "rt") as f:
+        child_pid = int(f.read())
+
+    # Like pool.terminate() which leaves the worker's child running.
+    worker.terminate()
+    worker.join(timeout=10)
+    assert not worker.is_alive()
+    cpw.sharding.kill_process_groups(pids=[worker.pid])
+    for i in range(1000):
+        if not os.path.exists("/proc/{:d}".format(child_pid)):
+            break
+        with open("/proc/{:d}/stat".format(child_pid), "rt") as f:
+            if f.read().split()[2] == "Z":
+                break  # killed, but not reaped by init yet
+        time.sleep(0.01)
+    else:
+        assert False, "The worker's child is still running."
+    tmp.cleanup_when_no_debug()
+
+
+def test_run_sharded(corsika_primary_path, debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    ste = make_steering_dict(num_primaries=12, event_id_of_first_event=3)
+    cer_path = os.path.join(tmp.name, "cherenkov.tar")
+    par_path = os.path.join(tmp.name, "particles.tar")
+
+    results = cpw.sharding.run(
+        steering_dict=ste,
+        cherenkov_output_path=cer_path,
+        particle_output_path=par_path,
+        num_shards=3,
+        corsika_path=corsika_primary_path,
+    )
+    assert len(results) == 3
+
+    event_numbers = []
+    with cpw.cherenkov.CherenkovEventTapeReader(cer_path) as run:
+        for evth, _ in run:
+            event_numbers.append(int(evth[cpw.I.EVTH.EVENT_NUMBER]))
+    assert event_numbers == list(range(3, 3 + 12))
+
+    par_event_numbers = []
+    with cpw.particles.ParticleEventTapeReader(par_path) as run:
+        for evth, _ in run:
+            par_event_numbers.append(int(evth[cpw.I.EVTH.EVENT_NUMBER]))
+    assert par_event_numbers == event_numbers
+
+    assert cpw.testing.stdout_ends_with_end_of_run_marker(cer_path + ".stdout")
+    tmp.cleanup_when_no_debug()
@@ -0,0 +1,179 @@
+import pytest
+import os
+import corsika_primary as cpw
+import inspect
+import subprocess
+import sys
+import numpy as np
+from importlib import resources as importlib_resources
+
+resource_dir = os.path.join(
+    importlib_resources.files("corsika_primary"), "tests", "resources"
+)
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+EXPECTED = {
+    "example_vanilla_corsika.stdout": {
+        "num_bunches": [50053, 57921, 38977, 42614, 29591, 37821, 33591],
+        "num_photons": [
+            49768.060690,
+            57522.976858,
+            38628.384280,
+            42182.757992,
+            29295.196614,
+            37474.158048,
+            33226.074979,
+        ],
+        "calls_of_sequence_2": {
+            1: 0,
+            2: 55244,
+            3: 116507,
+            4: 181150,
+            5: 329122,
+            6: 420552,
+            7: 500802,
+        },
+    },
+    "example_vanilla_corsika_proton.stdout": {
+        "num_bunches": [151544, 42812, 57030, 76825, 30695, 165768, 0],
+        "num_photons": [
+            150377.857018,
+            42434.713536,
+            56719.685898,
+            76289.821345,
+            30506.917306,
+            164624.788085,
+            0.0,
+        ],
+        "calls_of_sequence_2": {
+            2: 180281,
+            3: 217897,
+            4: 244168,
+            5: 363414,
+            6: 385387,
+        },
+    },
+}
+
+
+def test_feed_in_chunks():
+    prng = np.random.Generator(np.random.PCG64(42))
+    for filename in EXPECTED:
+        with open(os.path.join(resource_dir, filename), "rt") as f:
+            stdout = f.read()
+
+        monitor = cpw.stdout_monitor.StdoutMonitor()
+        start = 0
+        while start < len(stdout):
+            stop = start + prng.integers(low=1, high=4096)
+            monitor.feed(stdout[start:stop])
+            start = stop
+        monitor.finish()
+
+        expected = EXPECTED[filename]
+        assert monitor.ends_with_end_of_run_marker()
+        assert len(monitor.errors) == 0
+        assert monitor.num_bunches == expected["num_bunches"]
+        np.testing.assert_allclose(
+            monitor.num_photons, expected["num_photons"]
+        )
+        assert sorted(monitor.seeds.keys()) == [1, 2, 3, 4, 5, 6, 7]
+        for event_number in expected["calls_of_sequence_2"]:
+            state = monitor.seeds[event_number]
+            assert len(state) == cpw.random.seed.NUM_RANDOM_SEQUENCES
+            assert state[1]["SEED"] == 2
+            assert (
+                state[1]["CALLS"]
+                == expected["calls_of_sequence_2"][event_number]
+            )
+
+
+def test_monitor_keys_seeds_by_event_number():
+    lines = [
+        " AND RANDOM NUMBER GENERATOR AT BEGIN OF EVENT :       5",
+        " SEQUENCE =  1  SEED =         1  CALLS =        10  BILLIONS =         0",
+        " SEQUENCE =  2  SEED =         2  CALLS =        20  BILLIONS =         0",
+        " SEQUENCE =  3  SEED =         3  CALLS =        30  BILLIONS =         0",
+        " SEQUENCE =  4  SEED =         4  CALLS =        40  BILLIONS =         0",
+        " AND RANDOM NUMBER GENERATOR AT BEGIN OF EVENT :  broken",
+        "",
+    ]
+    monitor = cpw.stdout_monitor.StdoutMonitor()
+    monitor.feed(str.join("\n", lines))
+    monitor.finish()
+    assert list(monitor.seeds.keys()) == [5]
+    assert monitor.seeds[5][3]["CALLS"] == 40
+    assert len(monitor.errors) == 1
+
+
+def test_tee_keeps_draining_when_monitor_fails(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    # An out-of-order event, an unparsable event, and a lot of output
+    # which does not fit into the pipe.
+    child_script = str.join(
+        "\n",
+        [
+            "import sys",
+            "print(' AND RANDOM NUMBER GENERATOR AT BEGIN OF EVENT :       9')",
+            "print(' AND RANDOM NUMBER GENERATOR AT BEGIN OF EVENT :  x')",
+            "sys.stdout.write(('#' * 1023 + '\\n') * 1024)",
+        ],
+    )
+    path = os.path.join(tmp.name, "stdout.txt")
+    rfd, wfd = os.pipe()
+    monitor = cpw.stdout_monitor.StdoutMonitor()
+    tee = cpw.stdout_monitor.StdoutTee(fd=rfd, path=path, monitor=monitor)
+    proc = subprocess.Popen([sys.executable, "-c", child_script], stdout=wfd)
+    os.close(wfd)
+    assert proc.wait(timeout=30) == 0
+    tee.thread.join(timeout=30)
+    assert not tee.thread.is_alive()
+
+    assert os.path.getsize(path) > 1024 * 1024
+    assert len(monitor.errors) > 0
+    tmp.cleanup_when_no_debug()
+
+
+def test_stdout_monitor_on_live_run(debug_dir, corsika_primary_path):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    run_path = os.path.join(tmp.name, "run")
+    with cpw.CorsikaPrimary(
+        corsika_path=corsika_primary_path,
+        steering_dict=cpw.steering.EXAMPLE,
+        stdout_path=run_path + ".o",
+        stderr_path=run_path + ".e",
+        particle_output_path=run_path + ".par.dat",
+    ) as run:
+        for evth, cer_reader in run:
+            for cer_block in cer_reader:
+                pass
+
+    assert run.exit_ok
+    with open(run_path + ".o", "rt") as f:
+        lines = str.split(f.read(), "\n")
+    num_bunches_lines = [
+        line
+        for line in lines
+        if str.startswith(line, cpw.stdout_monitor.NUM_BUNCHES_MARKER)
+    ]
+    assert cpw.stdout_monitor.END_OF_RUN_MARKER in lines[-2]
+    assert len(run.stdout_monitor.errors) == 0
+    assert len(run.stdout_monitor.num_bunches) == len(num_bunches_lines)
+
+    tmp.cleanup_when_no_debug()
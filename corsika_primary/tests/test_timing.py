@@ -0,0 +1,85 @@
+import pytest
+import os
+import sys
+import json
+import subprocess
+import corsika_primary as cpw
+import inspect
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def test_timing_phases_and_events():
+    timer = cpw.timing.Timing()
+    timer.begin("a")
+    timer.begin("b")
+    timer.begin("a")
+    timer.milestone("first")
+    timer.milestone("first")
+    timer.event()
+    timer.event()
+    tt = timer.to_dict()
+    assert set(tt["phases_s"].keys()) == {"a", "b"}
+    assert list(tt["milestones_s"].keys()) == ["first"]
+    assert len(tt["events_s"]) == 2
+    assert tt["total_s"] >= sum(tt["phases_s"].values())
+    assert tt["rusage"] is None
+
+
+def test_wait_with_rusage():
+    process = subprocess.Popen(
+        [sys.executable, "-c", "x = bytearray(2**25); import sys; sys.exit(3)"]
+    )
+    rc, rusage = cpw.timing.wait(process)
+    assert rc == 3
+    assert process.returncode == 3
+    assert rusage["user_s"] + rusage["sys_s"] > 0.0
+    assert rusage["max_rss_bytes"] >= 2**25
+
+
+def test_timing_sidecar(debug_dir, corsika_primary_path):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    run_path = os.path.join(tmp.name, "run")
+
+    rc = cpw.corsika_primary(
+        corsika_path=corsika_primary_path,
+        steering_dict=cpw.steering.EXAMPLE,
+        cherenkov_output_path=run_path + ".cer.tar",
+        particle_output_path=run_path + ".par.dat",
+        timing_path=run_path + ".timing.json",
+    )
+    assert rc == 0
+    with open(run_path + ".timing.json", "rt") as f:
+        tt = json.loads(f.read())
+    assert "corsika" in tt["phases_s"]
+    assert tt["rusage"]["user_s"] > 0.0
+
+    with cpw.CorsikaPrimary(
+        corsika_path=corsika_primary_path,
+        steering_dict=cpw.steering.EXAMPLE,
+        stdout_path=run_path + ".o",
+        stderr_path=run_path + ".e",
+        particle_output_path=run_path + ".live.par.dat",
+    ) as run:
+        for evth, cer_reader in run:
+            for cer_block in cer_reader:
+                pass
+
+    assert run.timing["milestones_s"]["runh"] > 0.0
+    assert len(run.timing["events_s"]) == len(
+        cpw.steering.EXAMPLE["primaries"]
+    )
+    assert run.timing["rusage"]["max_rss_bytes"] > 0
+
+    tmp.cleanup_when_no_debug()
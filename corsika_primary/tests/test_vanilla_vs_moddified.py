@@ -23,11 +23,6 @@ def corsika_vanilla_path(pytestconfig):
     return pytestconfig.getoption("corsika_vanilla_path")
 
 
-@pytest.fixture()
-def merlict_eventio_converter(pytestconfig):
-    return pytestconfig.getoption("merlict_eventio_converter")
-
-
 @pytest.fixture()
 def debug_dir(pytestconfig):
     return pytestconfig.getoption("debug_dir")
@@ -105,7 +100,6 @@ def write_append_corsika_header_diff(path, event_id, report):
 def test_vanilla_vs_moddified(
     corsika_primary_path,
     corsika_vanilla_path,
-    merlict_eventio_converter,
     debug_dir,
 ):
     """
@@ -122,7 +116,6 @@ def test_vanilla_vs_moddified(
 
     assert os.path.exists(corsika_primary_path)
     assert os.path.exists(corsika_vanilla_path)
-    assert os.path.exists(merlict_eventio_converter)
 
     num_shower = 7
 
@@ -205,10 +198,7 @@ def test_vanilla_vs_moddified(
         ori_run_eventio_path = os.path.join(
             par_dir, "original_run_{:d}.eventio".format(run)
         )
-        ori_run_path = os.path.join(
-            par_dir, "original_run_{:d}.simpleio".format(run)
-        )
-        if not os.path.exists(ori_run_path):
+        if not os.path.exists(ori_run_eventio_path):
             cpw.corsika_vanilla(
                 corsika_path=corsika_vanilla_path,
                 steering_card=ori_steering_card,
@@ -216,11 +206,6 @@ def test_vanilla_vs_moddified(
                 stdout_path=ori_run_eventio_path + ".stdout",
                 stderr_path=ori_run_eventio_path + ".stderr",
             )
-            cpw.testing.eventio_to_simpleio(
-                merlict_eventio_converter=merlict_eventio_converter,
-                eventio_path=ori_run_eventio_path,
-                simpleio_path=ori_run_path,
-            )
 
         with open(ori_run_eventio_path + ".stdout", "rt") as f:
             ori_stdout = f.read()
@@ -275,13 +260,14 @@ def test_vanilla_vs_moddified(
         # READ ORIGINAL AND MODIFIED RUNS
         # -------------------------------
         mod_run = cpw.cherenkov.CherenkovEventTapeReader(mod_cer_path)
-        ori_run = cpw.testing.SimpleIoRun(ori_run_path)
+        ori_run = cpw.eventio.RunReader(ori_run_eventio_path)
 
         for evt_idx in range(num_shower):
             mod_evth, mod_cer_reader = next(mod_run)
-            ori_evth, ori_bunches = next(ori_run)
+            ori_evth, ori_bunch_reader = next(ori_run)
 
             mod_bunches = np.vstack([b for b in mod_cer_reader])
+            ori_bunches = cpw.testing.read_all_blocks(ori_bunch_reader)
 
             mod_bunches = cpw.bunches_to_si_units(mod_bunches)
             ori_bunches = cpw.bunches_to_si_units(ori_bunches)
@@ -0,0 +1,298 @@
+import pytest
+import os
+import sys
+import time
+import subprocess
+import corsika_primary as cpw
+import inspect
+import numpy as np
+from test_event_tape import make_dummy_events
+from test_event_tape import write_dummy_events
+
+
+@pytest.fixture()
+def corsika_primary_path(pytestconfig):
+    return pytestconfig.getoption("corsika_primary_path")
+
+
+@pytest.fixture()
+def debug_dir(pytestconfig):
+    return pytestconfig.getoption("debug_dir")
+
+
+def test_make_limits():
+    limits = cpw.watchdog.make_limits(stall_timeout_s=10.0)
+    assert limits["stall_timeout_s"] == 10.0
+    assert limits["wall_clock_timeout_s"] is None
+    with pytest.raises(AssertionError):
+        cpw.watchdog.make_limits(unknown_limit=1)
+    with pytest.raises(AssertionError):
+        cpw.watchdog.make_limits(wall_clock_timeout_s=-1.0)
+
+
+def test_apply_limits():
+    process = subprocess.Popen(
+        [sys.executable, "-c", "input()"],
+        stdin=subprocess.PIPE,
+    )
+    limits = cpw.watchdog.make_limits(
+        max_memory_bytes=2**34,
+        cpu_affinity=[sorted(os.sched_getaffinity(0))[0]],
+        nice=1,
+    )
+    cpw.watchdog.apply_limits(pid=process.pid, limits=limits)
+    assert os.sched_getaffinity(process.pid) == set(limits["cpu_affinity"])
+    soft, hard = cpw.watchdog.resource.prlimit(
+        process.pid, cpw.watchdog.resource.RLIMIT_AS
+    )
+    assert soft == 2**34
+    process.communicate(input=b"\n")
+
+
+def test_limits_apply_before_exec():
+    assert cpw.watchdog.make_preexec_fn(cpw.watchdog.default_limits()) is None
+    limits = cpw.watchdog.make_limits(
+        max_memory_bytes=2**34,
+        cpu_affinity=[sorted(os.sched_getaffinity(0))[0]],
+        nice=1,
+    )
+    script = (
+        "import os, resource; "
+        "print(resource.getrlimit(resource.RLIMIT_AS)[0]); "
+        "print(sorted(os.sched_getaffinity(0))); "
+        "print(os.nice(0))"
+    )
+    out = subprocess.check_output(
+        [sys.executable, "-c", script],
+        preexec_fn=cpw.watchdog.make_preexec_fn(limits),
+    )
+    lines = out.decode().splitlines()
+    assert int(lines[0]) == 2**34
+    assert lines[1] == str(limits["cpu_affinity"])
+    assert int(lines[2]) == os.nice(0) + 1
+
+
+def test_wall_clock_timeout_releases_fifo_reader(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    fifo_path = os.path.join(tmp.name, "fifo")
+    os.mkfifo(fifo_path)
+
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(60)"]
+    )
+    dog = cpw.watchdog.Watchdog(
+        process=process,
+        limits=cpw.watchdog.make_limits(wall_clock_timeout_s=0.5),
+        fifo_paths=[fifo_path],
+        poll_interval_s=0.1,
+    )
+    start = time.monotonic()
+    with open(fifo_path, "rb") as f:
+        assert f.read() == b""
+    rc, _ = cpw.timing.wait(process, before_reap=dog.stop)
+    assert time.monotonic() - start < 30.0
+    assert rc != 0
+    with pytest.raises(TimeoutError):
+        dog.raise_if_expired()
+
+    tmp.cleanup_when_no_debug()
+
+
+def write_to_fifo_script(fifo_path, num_chunks):
+    # Writes num_chunks to the FIFO, and then busy-loops without writing,
+    # e.g. like a CORSIKA which hangs.
+    return (
+        "import time\n"
+        "f = open('{:s}', 'wb', buffering=0)\n"
+        "for i in range({:d}):\n"
+        "    f.write(b'x' * 65536)\n"
+        "while True:\n"
+        "    time.sleep(0.01)\n"
+    ).format(fifo_path, num_chunks)
+
+
+def test_stall_timeout(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    fifo_path = os.path.join(tmp.name, "fifo")
+    os.mkfifo(fifo_path)
+    process = subprocess.Popen(
+        [sys.executable, "-c", write_to_fifo_script(fifo_path, 3)]
+    )
+    clock = cpw.watchdog.FifoReadClock()
+    dog = cpw.watchdog.Watchdog(
+        process=process,
+        limits=cpw.watchdog.make_limits(stall_timeout_s=0.5),
+        stall_clock=clock,
+        fifo_paths=[fifo_path],
+        poll_interval_s=0.1,
+    )
+    reader = cpw.watchdog.FifoReader(path=fifo_path, clock=clock)
+    while len(reader.read(2**16)) > 0:
+        pass
+    reader.close()
+    rc, _ = cpw.timing.wait(process, before_reap=dog.stop)
+    assert rc != 0
+    assert "stall" in dog.reason
+    assert clock.num_bytes == 3 * 65536
+    tmp.cleanup_when_no_debug()
+
+
+def test_no_stall_while_the_reader_is_slow(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    fifo_path = os.path.join(tmp.name, "fifo")
+    os.mkfifo(fifo_path)
+    # The child fills the FIFO and then waits for its reader.
+    process = subprocess.Popen(
+        [sys.executable, "-c", write_to_fifo_script(fifo_path, 100)]
+    )
+    clock = cpw.watchdog.FifoReadClock()
+    dog = cpw.watchdog.Watchdog(
+        process=process,
+        limits=cpw.watchdog.make_limits(stall_timeout_s=0.5),
+        stall_clock=clock,
+        poll_interval_s=0.1,
+    )
+    reader = cpw.watchdog.FifoReader(path=fifo_path, clock=clock)
+    time.sleep(2.0)
+    assert dog.reason is None
+    process.kill()
+    cpw.timing.wait(process, before_reap=dog.stop)
+    reader.close()
+    tmp.cleanup_when_no_debug()
+
+
+def test_stall_timeout_of_output_file(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    path = os.path.join(tmp.name, "output")
+    script = (
+        "import time\n"
+        "f = open('{:s}', 'wb', buffering=0)\n"
+        "for i in range(10):\n"
+        "    f.write(b'x')\n"
+        "    time.sleep(0.2)\n"
+        "time.sleep(60)\n"
+    ).format(path)
+    process = subprocess.Popen([sys.executable, "-c", script])
+    dog = cpw.watchdog.Watchdog(
+        process=process,
+        limits=cpw.watchdog.make_limits(stall_timeout_s=1.0),
+        stall_clock=cpw.watchdog.FileGrowthClock(path),
+        poll_interval_s=0.1,
+    )
+    start = time.monotonic()
+    rc, _ = cpw.timing.wait(process, before_reap=dog.stop)
+    assert time.monotonic() - start > 2.0
+    assert rc != 0
+    assert "stall" in dog.reason
+    assert os.stat(path).st_size == 10
+    tmp.cleanup_when_no_debug()
+
+
+def test_stall_timeout_needs_clock():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    with pytest.raises(AssertionError):
+        cpw.watchdog.Watchdog(
+            process=process,
+            limits=cpw.watchdog.make_limits(stall_timeout_s=0.5),
+        )
+    process.wait()
+
+
+def test_watchdog_is_stopped_before_the_process_is_reaped():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    dog = cpw.watchdog.Watchdog(
+        process=process,
+        limits=cpw.watchdog.make_limits(wall_clock_timeout_s=60.0),
+        poll_interval_s=0.1,
+    )
+    states = []
+
+    def before_reap():
+        # The exited process is a zombie until it is reaped.
+        with open("/proc/{:d}/stat".format(process.pid), "rt") as f:
+            states.append(f.read().split(")")[-1].split()[0])
+        dog.stop()
+
+    rc, _ = cpw.timing.wait(process, before_reap=before_reap)
+    assert rc == 0
+    assert states == ["Z"]
+    assert not dog.thread.is_alive()
+
+
+def test_no_timeout_when_process_is_done():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    dog = cpw.watchdog.Watchdog(
+        process=process,
+        limits=cpw.watchdog.make_limits(wall_clock_timeout_s=60.0),
+        poll_interval_s=0.1,
+    )
+    rc, _ = cpw.timing.wait(process, before_reap=dog.stop)
+    assert rc == 0
+    dog.raise_if_expired()
+
+
+def test_corsika_primary_wall_clock_timeout(debug_dir, corsika_primary_path):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    run_path = os.path.join(tmp.name, "run")
+    with pytest.raises(TimeoutError):
+        with cpw.CorsikaPrimary(
+            corsika_path=corsika_primary_path,
+            steering_dict=cpw.steering.EXAMPLE,
+            stdout_path=run_path + ".o",
+            stderr_path=run_path + ".e",
+            particle_output_path=run_path + ".par.dat",
+            limits=cpw.watchdog.make_limits(wall_clock_timeout_s=1e-3),
+        ) as run:
+            for evth, cer_reader in run:
+                for cer_block in cer_reader:
+                    pass
+
+    tmp.cleanup_when_no_debug()
+
+
+def test_event_tape_reader_reads_through_fifo_reader(debug_dir):
+    tmp = cpw.testing.TmpDebugDir(
+        debug_dir=debug_dir,
+        suffix=inspect.getframeinfo(inspect.currentframe()).function,
+    )
+    prng = np.random.Generator(np.random.PCG64(1))
+    runh, events = make_dummy_events(prng=prng, event_numbers=[1, 2, 3])
+    path = os.path.join(tmp.name, "run.tar")
+    write_dummy_events(path=path, runh=runh, events=events)
+    fifo_path = os.path.join(tmp.name, "fifo")
+    os.mkfifo(fifo_path)
+    process = subprocess.Popen(["cp", path, fifo_path])
+
+    clock = cpw.watchdog.FifoReadClock()
+    with cpw.cherenkov.CherenkovEventTapeReader(
+        path=fifo_path,
+        fileobj=cpw.watchdog.FifoReader(path=fifo_path, clock=clock),
+    ) as run:
+        assert run.mode == "r|"
+        for evth, _ in run:
+            event_number = int(evth[cpw.I.EVTH.EVENT_NUMBER])
+            np.testing.assert_array_equal(
+                run.read_event_payload(), events[event_number][1]
+            )
+        assert run.file.closed is False
+    assert run.file.closed
+    process.wait()
+    # The reader stops at the tar's end-of-archive and may leave the
+    # zero-padding of the last record unread.
+    assert 0 < clock.num_bytes <= os.stat(path).st_size
+    tmp.cleanup_when_no_debug()
@@ -0,0 +1,120 @@
+"""
+Record where the wall-time of a run goes, and what CORSIKA consumed.
+"""
+
+import os
+import time
+import json_utils
+
+
+class Timing:
+    def __init__(self):
+        """
+        Records the wall-time of the phases of a run, the wall-time of each
+        event, and the resource-usage of the CORSIKA child-process.
+        """
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.milestones = {}
+        self.events = []
+        self.rusage = None
+        self._phase_name = None
+        self._phase_start = None
+        self._last_milestone = self.start
+        self._last_event = None
+
+    def begin(self, name):
+        """
+        Begins the phase name and ends the current phase if any.
+        """
+        self.end()
+        self._phase_name = str(name)
+        self._phase_start = time.perf_counter()
+
+    def end(self):
+        """
+        Ends the current phase if any.
+        """
+        if self._phase_name is None:
+            return
+        duration = time.perf_counter() - self._phase_start
+        self.phases[self._phase_name] = (
+            self.phases.get(self._phase_name, 0.0) + duration
+        )
+        self._phase_name = None
+        self._phase_start = None
+
+    def milestone(self, name):
+        """
+        Records the wall-time since the start when name was reached first.
+        """
+        if name not in self.milestones:
+            self._last_milestone = time.perf_counter()
+            self.milestones[name] = self._last_milestone - self.start
+
+    def event(self):
+        """
+        Records the wall-time since the last event, or since the last
+        milestone when this is the first event.
+        """
+        now = time.perf_counter()
+        if self._last_event is None:
+            self._last_event = self._last_milestone
+        self.events.append(now - self._last_event)
+        self._last_event = now
+
+    def to_dict(self):
+        self.end()
+        return {
+            "total_s": time.perf_counter() - self.start,
+            "phases_s": dict(self.phases),
+            "milestones_s": dict(self.milestones),
+            "events_s": list(self.events),
+            "rusage": self.rusage,
+        }
+
+    def __repr__(self):
+        return "{:s}()".format(self.__class__.__name__)
+
+
+def rusage_to_dict(rusage):
+    """
+    Returns the CPU-times in s and the maximum resident set size in bytes.
+    On linux, ru_maxrss is in kilo-bytes.
+    """
+    return {
+        "user_s": rusage.ru_utime,
+        "sys_s": rusage.ru_stime,
+        "max_rss_bytes": rusage.ru_maxrss * 1024,
+        "minor_page_faults": rusage.ru_minflt,
+        "major_page_faults": rusage.ru_majflt,
+        "block_input_operations": rusage.ru_inblock,
+        "block_output_operations": rusage.ru_oublock,
+        "voluntary_context_switches": rusage.ru_nvcsw,
+        "involuntary_context_switches": rusage.ru_nivcsw,
+    }
+
+
+def wait(process, before_reap=None):
+    """
+    Waits for the subprocess.Popen process to exit and returns its
+    (returncode, rusage). The rusage is the one of this child only, and not
+    the one accumulated over all children by resource.getrusage.
+    If not None, before_reap() is called after the process exited but
+    before it is reaped, i.e. while its pid can not be reused. E.g. to stop
+    a watchdog.Watchdog which may kill the process.
+    """
+    if process.returncode is not None:
+        return process.returncode, None
+    if before_reap is not None:
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        before_reap()
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, rusage_to_dict(rusage)
+
+
+def write(path, timing):
+    with open(path + ".tmp", "wt") as f:
+        f.write(json_utils.dumps(timing.to_dict(), indent=4))
+    os.rename(path + ".tmp", path)
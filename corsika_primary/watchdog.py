@@ -0,0 +1,322 @@
+"""
+Limit and watch the CORSIKA child-process.
+
+The limits are a dict:
+
+wall_clock_timeout_s : float or None
+    CORSIKA is killed when it runs longer.
+stall_timeout_s : float or None
+    CORSIKA is killed when no byte of its Cherenkov-output arrives for
+    longer. When the output is a FIFO, this is timed on the reader's side
+    and only while the reader waits for bytes, see FifoReadClock. So a slow
+    reader does not make CORSIKA stall. When the output is a file, this is
+    timed by the growth of the file, see FileGrowthClock.
+    This includes CORSIKA's initialization before it writes the RUNH.
+max_memory_bytes : int or None
+    The RLIMIT_AS of CORSIKA. Allocations beyond fail.
+cpu_affinity : list of int or None
+    The cpus CORSIKA may run on.
+nice : int or None
+    The increment of CORSIKA's nice-level.
+
+None means no limit.
+"""
+
+import os
+import signal
+import resource
+import threading
+import time
+
+
+def default_limits():
+    return {
+        "wall_clock_timeout_s": None,
+        "stall_timeout_s": None,
+        "max_memory_bytes": None,
+        "cpu_affinity": None,
+        "nice": None,
+    }
+
+
+def assert_limits(limits):
+    assert set(limits.keys()) == set(default_limits().keys())
+    for key in ["wall_clock_timeout_s", "stall_timeout_s"]:
+        if limits[key] is not None:
+            assert limits[key] > 0.0
+    if limits["max_memory_bytes"] is not None:
+        assert limits["max_memory_bytes"] > 0
+    if limits["cpu_affinity"] is not None:
+        assert len(limits["cpu_affinity"]) > 0
+
+
+def make_limits(**kwargs):
+    """
+    Returns the default_limits() updated with kwargs.
+    """
+    limits = default_limits()
+    for key in kwargs:
+        assert key in limits, "Unknown limit '{:s}'.".format(key)
+        limits[key] = kwargs[key]
+    assert_limits(limits)
+    return limits
+
+
+def make_preexec_fn(limits):
+    """
+    Returns a function for subprocess.Popen(preexec_fn=...) which applies
+    the memory-cap, cpu-affinity, and nice-level in the child before it
+    executes CORSIKA. Returns None when there is nothing to apply.
+    """
+    if (
+        limits["max_memory_bytes"] is None
+        and limits["cpu_affinity"] is None
+        and limits["nice"] is None
+    ):
+        return None
+
+    def preexec_fn():
+        # Runs in the forked child. Only make system-calls here, the
+        # threads of the parent are gone and their locks may be held.
+        if limits["max_memory_bytes"] is not None:
+            cap = int(limits["max_memory_bytes"])
+            resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+        if limits["cpu_affinity"] is not None:
+            os.sched_setaffinity(0, limits["cpu_affinity"])
+        if limits["nice"] is not None:
+            os.nice(int(limits["nice"]))
+
+    return preexec_fn
+
+
+def apply_limits(pid, limits):
+    """
+    Applies the memory-cap, cpu-affinity, and nice-level on the running
+    process pid. The process runs without the limits until then. Use
+    make_preexec_fn() for a process which is not spawned yet.
+    """
+    if limits["max_memory_bytes"] is not None:
+        cap = int(limits["max_memory_bytes"])
+        resource.prlimit(pid, resource.RLIMIT_AS, (cap, cap))
+    if limits["cpu_affinity"] is not None:
+        os.sched_setaffinity(pid, limits["cpu_affinity"])
+    if limits["nice"] is not None:
+        niceness = os.getpriority(os.PRIO_PROCESS, pid)
+        os.setpriority(os.PRIO_PROCESS, pid, niceness + int(limits["nice"]))
+
+
+class FifoReadClock:
+    """
+    Times how long the reader of a FIFO waits for bytes. The reader calls
+    begin_wait() before, and end_wait() after each blocking open() and
+    read(). See FifoReader.
+    """
+
+    def __init__(self):
+        self.num_bytes = 0
+        self.waiting_since = None
+
+    def begin_wait(self):
+        self.waiting_since = time.monotonic()
+
+    def end_wait(self, num_bytes):
+        self.num_bytes += num_bytes
+        self.waiting_since = None
+
+    def seconds_without_progress(self, now):
+        waiting_since = self.waiting_since
+        if waiting_since is None:
+            return 0.0
+        return now - waiting_since
+
+
+class FileGrowthClock:
+    """
+    Times how long the file in path did not grow. Only to be polled by one
+    thread, e.g. the Watchdog's.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.num_bytes = None
+        self.last_progress = time.monotonic()
+
+    def seconds_without_progress(self, now):
+        try:
+            num_bytes = os.stat(self.path).st_size
+        except FileNotFoundError:
+            num_bytes = None
+        if num_bytes != self.num_bytes:
+            self.num_bytes = num_bytes
+            self.last_progress = now
+        return now - self.last_progress
+
+
+class FifoReader:
+    def __init__(self, path, clock, chunk_size=2**16):
+        """
+        A file-like reader of a FIFO which reports to clock while it waits
+        for bytes. Opening blocks until the writer opened the FIFO.
+
+        Parameters
+        ----------
+        path : str
+            Path of the FIFO.
+        clock : FifoReadClock
+            Times the waits of this reader.
+        """
+        self.name = str(path)
+        self.clock = clock
+        self.chunk_size = int(chunk_size)
+        self.clock.begin_wait()
+        try:
+            self.fd = os.open(self.name, os.O_RDONLY)
+        finally:
+            self.clock.end_wait(num_bytes=0)
+        self.closed = False
+
+    def read(self, size=-1):
+        """
+        Returns the bytes which are available, at most size. Returns less
+        than size before the end-of-file.
+        """
+        if size is None or size < 0:
+            size = self.chunk_size
+        self.clock.begin_wait()
+        num_bytes = 0
+        try:
+            data = os.read(self.fd, size)
+            num_bytes = len(data)
+        finally:
+            self.clock.end_wait(num_bytes=num_bytes)
+        return data
+
+    def close(self):
+        if not self.closed:
+            os.close(self.fd)
+            self.closed = True
+
+    def __repr__(self):
+        out = "{:s}(path='{:s}')".format(self.__class__.__name__, self.name)
+        return out
+
+
+class Watchdog:
+    def __init__(
+        self,
+        process,
+        limits,
+        stall_clock=None,
+        fifo_paths=None,
+        poll_interval_s=1.0,
+    ):
+        """
+        A background-thread kills the process when it exceeds its
+        wall-clock- or stall-timeout.
+
+        Parameters
+        ----------
+        process : subprocess.Popen
+            The CORSIKA child-process. The watchdog never reaps it. Stop
+            the watchdog before the process is reaped, else a pid which is
+            reused could be killed, see timing.wait(before_reap=...).
+        limits : dict
+            See default_limits().
+        stall_clock : FifoReadClock or FileGrowthClock (default: None)
+            Times how long no byte of CORSIKA's Cherenkov-output arrived.
+            Needed for the stall_timeout_s.
+        fifo_paths : list of str (default: None)
+            The FIFOs CORSIKA should write to. When CORSIKA is killed before
+            it opened them, the readers waiting in open() are released.
+        poll_interval_s : float
+            Time between two checks.
+        """
+        assert_limits(limits)
+        if limits["stall_timeout_s"] is not None:
+            assert stall_clock is not None, "Expected stall_clock."
+        self.process = process
+        self.limits = limits
+        self.stall_clock = stall_clock
+        self.fifo_paths = list(fifo_paths) if fifo_paths else []
+        self.poll_interval_s = float(poll_interval_s)
+        self.reason = None
+        self._stop = threading.Event()
+        self.thread = None
+        if self._has_timeouts():
+            self.thread = threading.Thread(target=self._watch, daemon=True)
+            self.thread.start()
+
+    def _has_timeouts(self):
+        return (
+            self.limits["wall_clock_timeout_s"] is not None
+            or self.limits["stall_timeout_s"] is not None
+        )
+
+    def _watch(self):
+        start = time.monotonic()
+
+        while not self._stop.wait(timeout=self.poll_interval_s):
+            now = time.monotonic()
+
+            wall_clock_timeout_s = self.limits["wall_clock_timeout_s"]
+            if wall_clock_timeout_s is not None:
+                if now - start > wall_clock_timeout_s:
+                    self._kill(
+                        "CORSIKA ran longer than "
+                        "wall_clock_timeout_s={:.1f}s.".format(
+                            wall_clock_timeout_s
+                        )
+                    )
+                    return
+
+            stall_timeout_s = self.limits["stall_timeout_s"]
+            if stall_timeout_s is not None:
+                seconds = self.stall_clock.seconds_without_progress(now)
+                if seconds > stall_timeout_s:
+                    self._kill(
+                        "No byte of CORSIKA's Cherenkov-output arrived, "
+                        "it did stall for longer than "
+                        "stall_timeout_s={:.1f}s.".format(stall_timeout_s)
+                    )
+                    return
+
+    def _kill(self, reason):
+        self.reason = reason
+        if self.process.returncode is None:
+            try:
+                os.kill(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        for fifo_path in self.fifo_paths:
+            release_fifo_readers(fifo_path)
+
+    def stop(self):
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def raise_if_expired(self):
+        """
+        Raises a TimeoutError when the watchdog killed the process.
+        """
+        if self.reason is not None:
+            raise TimeoutError(self.reason)
+
+    def __repr__(self):
+        out = "{:s}(pid={:d})".format(
+            self.__class__.__name__, self.process.pid
+        )
+        return out
+
+
+def release_fifo_readers(fifo_path):
+    """
+    Opens and closes the writing end of the FIFO in fifo_path. A reader
+    blocking in open() returns, and a reader of a FIFO which had no
+    writer yet sees the end-of-file.
+    """
+    try:
+        fd = os.open(fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+        os.close(fd)
+    except OSError:
+        pass
@@ -77,12 +77,21 @@ int event_number;
 
 const char *PRIMARY_PATH = "primaries.x5.float64";
 FILE *primary_file = NULL;
+int primary_file_is_fifo = 0;
 FILE *cerostream = NULL;
 
 char output_path[1024] = "";
 const uint64_t CHERENKOV_BUFFER_SIZE = 1048576;
 struct mliEventTapeWriter taro;
 
+int is_fifo(const char *path) {
+    struct stat st;
+    if (stat(path, &st) != 0) {
+        return 0;
+    }
+    return S_ISFIFO(st.st_mode);
+}
+
 //-------------------- CORSIKA bridge ------------------------------------------
 
 /**
@@ -122,6 +131,7 @@ void telrnh_(cors_real_t runh[273]) {
         mliEventTapeWriter_write_runh(&taro, runh),
         "Can't write RUNH to EventTape."
     );
+    primary_file_is_fifo = is_fifo(PRIMARY_PATH);
     primary_file = fopen(PRIMARY_PATH, "rb");
     chk_msg(primary_file, "Can't open primary_file.");
     return;
@@ -236,11 +246,25 @@ error:
 
 
 /**
- *  End of event.
+ *  End of event. Write the last block of Cherenkov-bunches now.
+ *  When the primaries are streamed into a FIFO, CORSIKA waits for the
+ *  next primary after this. So the EVTE is written, too. It tells the
+ *  reader that the event is complete without waiting for the next EVTH.
+ *
+ *  @param  evte    CORSIKA event end block
 */
 void telend_(cors_real_t evte[273]) {
+    chk_msg(
+        mliEventTapeWriter_end_event(
+            &taro,
+            primary_file_is_fifo ? evte : NULL
+        ),
+        "Can't end event in EventTapeWriter."
+    );
     fflush(taro.tar.stream);
     return;
+error:
+    exit(1);
 }
 
 
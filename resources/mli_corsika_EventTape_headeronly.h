@@ -573,8 +573,8 @@ float mli_chars_to_float(const char *four_char_word);
 
 
 #define MLI_CORSIKA_EVENTTAPE_VERSION_MAYOR 2
-#define MLI_CORSIKA_EVENTTAPE_VERSION_MINOR 1
-#define MLI_CORSIKA_EVENTTAPE_VERSION_PATCH 2
+#define MLI_CORSIKA_EVENTTAPE_VERSION_MINOR 2
+#define MLI_CORSIKA_EVENTTAPE_VERSION_PATCH 0
 
 struct mliEventTapeWriter {
         struct mliTar tar;
@@ -603,6 +603,9 @@ int mliEventTapeWriter_write_cherenkov_bunch(
         const float *bunch);
 int mliEventTapeWriter_flush_cherenkov_bunch_block(
         struct mliEventTapeWriter *tio);
+int mliEventTapeWriter_end_event(
+        struct mliEventTapeWriter *tio,
+        const float *evte);
 
 struct mliEventTapeReader {
         uint64_t run_number;
@@ -1776,8 +1779,11 @@ struct mliEventTapeWriter mliEventTapeWriter_init(void)
 int mliEventTapeWriter_finalize(struct mliEventTapeWriter *tio)
 {
         if (tio->tar.stream) {
-                chk_msg(mliEventTapeWriter_flush_cherenkov_bunch_block(tio),
-                        "Can't finalize cherenkov-bunch-block.");
+                if (tio->event_number > 0) {
+                        chk_msg(mliEventTapeWriter_flush_cherenkov_bunch_block(
+                                        tio),
+                                "Can't finalize cherenkov-bunch-block.");
+                }
                 chk_msg(mliTar_write_finalize(&tio->tar),
                         "Can't finalize tar-file.");
         }
@@ -1903,6 +1909,37 @@ error:
         return 0;
 }
 
+int mliEventTapeWriter_end_event(
+        struct mliEventTapeWriter *tio,
+        const float *evte)
+{
+        /*
+         * Writes the last cherenkov-bunch-block of the event now, and not
+         * only when the next EVTH or the end of the run is written.
+         * If evte is not NULL, the event ends with a member
+         * 'ddddddddd/ddddddddd/EVTE.float32'. A reader of a stream then
+         * knows that the event is complete without waiting for the next
+         * EVTH.
+         */
+        char path[MLI_TAR_NAME_LENGTH] = {'\0'};
+        chk_msg(tio->event_number > 0, "Expected EVTH before end of event.");
+        chk_msg(mliEventTapeWriter_flush_cherenkov_bunch_block(tio),
+                "Can't finalize cherenkov-bunch-block.");
+        if (evte != NULL) {
+                sprintf(path,
+                        "%09d/%09d/EVTE.float32",
+                        tio->run_number,
+                        tio->event_number);
+                chk_msg(mliEventTapeWriter_write_corsika_header(
+                                tio, path, evte),
+                        "Can't write 'EVTE.float32' to event-tape.");
+        }
+        tio->event_number = 0;
+        return 1;
+error:
+        return 0;
+}
+
 int mliEventTapeWriter_write_cherenkov_bunch(
         struct mliEventTapeWriter *tio,
         const float *bunch)
@@ -1999,10 +2036,25 @@ int mliEventTapeReader_read_evth(struct mliEventTapeReader *tio, float *evth)
         uint64_t path_run_number;
         uint64_t evth_run_number;
         char match[MLI_TAR_NAME_LENGTH] = "ddddddddd/ddddddddd/EVTH.float32";
+        char match_evte[MLI_TAR_NAME_LENGTH] =
+                "ddddddddd/ddddddddd/EVTE.float32";
+        float evte[273];
 
         if (!tio->has_tarh) {
                 return 0;
         }
+        if (mli_cstr_match_templeate(tio->tarh.name, match_evte, 'd')) {
+                /* The end of the last event. */
+                chk_msg(tio->tarh.size == MLI_CORSIKA_HEADER_SIZE_BYTES,
+                        "Expected EVTE to have size 273*sizeof(float)");
+                chk_msg(mliTar_read_data(
+                                &tio->tar, (void *)evte, tio->tarh.size),
+                        "Can't read EVTE from tar.");
+                tio->has_tarh = mliTar_read_header(&tio->tar, &tio->tarh);
+                if (!tio->has_tarh) {
+                        return 0;
+                }
+        }
         if (!mli_cstr_match_templeate(tio->tarh.name, match, 'd')) {
                 return 0;
         }
@@ -31,6 +31,11 @@ setuptools.setup(
         "corsika_primary": [
             os.path.join("tests", "resources", "*"),
             os.path.join("scripts", "install.py"),
+            os.path.join("scripts", "server.py"),
+            os.path.join("scripts", "make_toc.py"),
+            os.path.join("scripts", "benchmark_event_tape_writer.py"),
+            os.path.join("scripts", "benchmark_sandbox.py"),
+            os.path.join("scripts", "inventory.py"),
         ]
     },
     install_requires=["spherical_coordinates>=0.1.1"],